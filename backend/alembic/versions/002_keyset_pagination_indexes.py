@@ -0,0 +1,60 @@
+"""Keyset pagination indexes for projects and payments
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; it doesn't block writes
+    with op.get_context().autocommit_block():
+        # (owner_id, created_at, id) serves "WHERE owner_id = ? AND (created_at, id) < (?, ?)
+        # ORDER BY created_at DESC, id DESC" as one range scan
+        op.create_index(
+            'ix_projects_owner_id_created_at_id', 'projects', ['owner_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_payments_user_id_created_at_id', 'payments', ['user_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+        # Prefixes of the new indexes
+        op.drop_index(
+            op.f('ix_projects_owner_id'), table_name='projects',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            op.f('ix_payments_user_id'), table_name='payments',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_payments_user_id'), 'payments', ['user_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            op.f('ix_projects_owner_id'), 'projects', ['owner_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_payments_user_id_created_at_id', table_name='payments',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_projects_owner_id_created_at_id', table_name='projects',
+            postgresql_concurrently=True, if_exists=True
+        )
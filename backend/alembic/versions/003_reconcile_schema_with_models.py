@@ -0,0 +1,192 @@
+"""Reconcile schema with app.models and add hot-path composite indexes
+
+001 drifted from the models: renamed/missing columns and enum values that
+the application writes. This brings every model column and enum value into
+the database without dropping data (legacy columns with no model
+counterpart are left in place), then builds the composite indexes behind
+the routers' queries.
+
+projects(owner_id, created_at) and payments(user_id, created_at) are
+served by the (..., created_at, id) keyset indexes from 002.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (old, new) enum values
+ENUM_RENAMES = {
+    'projectstatus': [('awaiting_approval', 'awaiting_script_approval'), ('awaiting_qc', 'awaiting_final_qc')],
+    'paymentstatus': [('succeeded', 'completed')],
+}
+ENUM_ADDITIONS = {
+    'userrole': ['viewer'],
+    'projectstatus': ['cancelled'],
+    'paymentstatus': ['processing', 'refunded'],
+}
+ENUM_COLUMNS = {
+    'projectstatus': ('projects', 'status'),
+    'paymentstatus': ('payments', 'status'),
+}
+
+# (table, old column, new column)
+COLUMN_RENAMES = [
+    ('projects', 'niche', 'niche_id'),
+    ('projects', 'youtube_video_id', 'published_video_id'),
+    ('projects', 'video_url', 'published_url'),
+    ('scripts', 'generation_method', 'reasoning_path'),
+    ('analytics', 'revenue_usd', 'estimated_revenue'),
+]
+
+
+def _new_columns() -> dict:
+    """Model columns missing from 001, by table (fresh Column objects per call)"""
+    return {
+        'users': [
+            sa.Column('full_name', sa.String(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=True),
+            sa.Column('avatar_url', sa.String(), nullable=True),
+            sa.Column('stripe_onboarded', sa.Boolean(), server_default=sa.false(), nullable=True),
+            sa.Column('last_login_at', sa.DateTime(), nullable=True),
+        ],
+        'projects': [
+            sa.Column('channel_id', sa.String(), nullable=True),
+            sa.Column('target_duration', sa.Integer(), server_default='60', nullable=True),
+            sa.Column('voice_clone_id', sa.String(), nullable=True),
+            sa.Column('channel_dna', sa.JSON(), nullable=True),
+            sa.Column('temporal_run_id', sa.String(), nullable=True),
+            sa.Column('script_id', sa.String(), nullable=True),
+            sa.Column('voiceover_asset_id', sa.String(), nullable=True),
+            sa.Column('video_asset_id', sa.String(), nullable=True),
+            sa.Column('thumbnail_asset_id', sa.String(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+        ],
+        'scripts': [
+            sa.Column('visual_cues', sa.JSON(), nullable=True),
+            sa.Column('approved_at', sa.DateTime(), nullable=True),
+            sa.Column('feedback', sa.String(), nullable=True),
+        ],
+        'payments': [
+            sa.Column('currency', sa.String(), server_default='usd', nullable=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('metadata', sa.JSON(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+        ],
+        'analytics': [
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+        ],
+    }
+
+
+# (name, table, columns, single-column indexes they make redundant)
+INDEXES = [
+    ('ix_projects_owner_id_status', 'projects', ['owner_id', 'status', 'created_at', 'id'], []),
+    ('ix_scripts_project_id_score', 'scripts', ['project_id', sa.text('score DESC'), 'created_at'], ['ix_scripts_project_id']),
+    ('ix_analytics_project_id_recorded_at', 'analytics', ['project_id', 'recorded_at'], ['ix_analytics_project_id']),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if _is_postgresql():
+        # ALTER TYPE ... ADD VALUE can't run in a transaction before PostgreSQL 12
+        with op.get_context().autocommit_block():
+            for enum_name, values in ENUM_ADDITIONS.items():
+                for value in values:
+                    op.execute(f"ALTER TYPE {enum_name} ADD VALUE IF NOT EXISTS '{value}'")
+        for enum_name, renames in ENUM_RENAMES.items():
+            for old, new in renames:
+                op.execute(f"ALTER TYPE {enum_name} RENAME VALUE '{old}' TO '{new}'")
+    else:
+        # Enums are plain strings elsewhere
+        for enum_name, renames in ENUM_RENAMES.items():
+            table, column = ENUM_COLUMNS[enum_name]
+            for old, new in renames:
+                op.execute(f"UPDATE {table} SET {column} = '{new}' WHERE {column} = '{old}'")
+
+    # 'creator' has no model counterpart; creators are clients
+    op.execute("UPDATE users SET role = 'client' WHERE role = 'creator'")
+
+    for table, old, new in COLUMN_RENAMES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(old, new_column_name=new)
+
+    for table, columns in _new_columns().items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.add_column(column)
+
+    # Backfill, then enforce the models' NOT NULL columns
+    op.execute("UPDATE users SET full_name = split_part(email, '@', 1) WHERE full_name IS NULL"
+               if _is_postgresql() else
+               "UPDATE users SET full_name = substr(email, 1, instr(email, '@') - 1) WHERE full_name IS NULL")
+    op.execute("UPDATE projects SET niche_id = 'general' WHERE niche_id IS NULL")
+    op.execute("UPDATE scripts SET reasoning_path = 'creative' WHERE reasoning_path IS NULL")
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('full_name', existing_type=sa.String(), nullable=False)
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.alter_column('niche_id', existing_type=sa.String(), nullable=False)
+    with op.batch_alter_table('scripts') as batch_op:
+        batch_op.alter_column('reasoning_path', existing_type=sa.String(), nullable=False)
+
+    # Payments are no longer tied to a project (downgrade leaves this nullable)
+    with op.batch_alter_table('payments') as batch_op:
+        batch_op.alter_column('project_id', existing_type=sa.String(), nullable=True)
+
+    # CONCURRENTLY can't run inside a transaction; it doesn't block writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, redundant in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False, postgresql_concurrently=True, if_not_exists=True
+            )
+            for old_index in redundant:
+                op.drop_index(old_index, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    # Added enum values stay (PostgreSQL can't drop them); renames are reverted
+    with op.get_context().autocommit_block():
+        for name, table, columns, redundant in reversed(INDEXES):
+            for old_index in redundant:
+                column = old_index[len(f'ix_{table}_'):]
+                op.create_index(
+                    old_index, table, [column],
+                    unique=False, postgresql_concurrently=True, if_not_exists=True
+                )
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('scripts') as batch_op:
+        batch_op.alter_column('reasoning_path', existing_type=sa.String(), nullable=True)
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.alter_column('niche_id', existing_type=sa.String(), nullable=True)
+
+    for table, columns in _new_columns().items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in reversed(columns):
+                batch_op.drop_column(column.name)
+
+    for table, old, new in reversed(COLUMN_RENAMES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(new, new_column_name=old)
+
+    for enum_name, renames in ENUM_RENAMES.items():
+        for old, new in renames:
+            if _is_postgresql():
+                op.execute(f"ALTER TYPE {enum_name} RENAME VALUE '{new}' TO '{old}'")
+            else:
+                table, column = ENUM_COLUMNS[enum_name]
+                op.execute(f"UPDATE {table} SET {column} = '{old}' WHERE {column} = '{new}'")
@@ -0,0 +1,73 @@
+"""Append-only analytics samples with hourly and daily rollups
+
+analytics_samples is range-partitioned by month on PostgreSQL. Partitions
+are created on demand by repositories.ensure_sample_partitions; dropping
+an old month is a DROP TABLE of its partition.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _metric_columns() -> list:
+    return [
+        sa.Column('views', sa.BigInteger(), nullable=True),
+        sa.Column('likes', sa.BigInteger(), nullable=True),
+        sa.Column('comments', sa.BigInteger(), nullable=True),
+        sa.Column('watch_time_hours', sa.Float(), nullable=True),
+        sa.Column('impressions', sa.BigInteger(), nullable=True),
+        sa.Column('clicks', sa.BigInteger(), nullable=True),
+        sa.Column('estimated_revenue', sa.Float(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    # Create analytics_samples (partitioned by month on PostgreSQL)
+    op.create_table(
+        'analytics_samples',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(), nullable=False),
+        sa.Column('project_id', sa.String(), nullable=False),
+        sa.Column('owner_id', sa.String(), nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint('id', 'recorded_at'),
+        postgresql_partition_by='RANGE (recorded_at)'
+    )
+    op.create_index(
+        'ix_analytics_samples_project_id_recorded_at', 'analytics_samples',
+        ['project_id', 'recorded_at'], unique=False
+    )
+
+    # Create rollup tables
+    for table in ('analytics_hourly', 'analytics_daily'):
+        op.create_table(
+            table,
+            sa.Column('project_id', sa.String(), nullable=False),
+            sa.Column('bucket', sa.DateTime(), nullable=False),
+            sa.Column('owner_id', sa.String(), nullable=False),
+            *_metric_columns(),
+            sa.Column('samples', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('project_id', 'bucket')
+        )
+        op.create_index(f'ix_{table}_owner_id_bucket', table, ['owner_id', 'bucket'], unique=False)
+
+
+def downgrade() -> None:
+    for table in ('analytics_daily', 'analytics_hourly'):
+        op.drop_index(f'ix_{table}_owner_id_bucket', table_name=table)
+        op.drop_table(table)
+
+    # Dropping the parent drops its partitions
+    op.drop_index('ix_analytics_samples_project_id_recorded_at', table_name='analytics_samples')
+    op.drop_table('analytics_samples')
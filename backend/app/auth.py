@@ -10,8 +10,12 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 
+from . import repositories
+
 # Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -155,22 +159,35 @@ async def authenticate_user(email: str, password: str):
     # For now, return None (implement in production)
     return None
 
-async def register_user(user_data: UserCreate):
+async def register_user(session: AsyncSession, user_data: UserCreate) -> UserResponse:
     """
     Register a new user
-    In production, this would create a database record
+
+    Args:
+        session: Database session (committed here)
+        user_data: Email, password and display name
+
+    Returns:
+        The new user
+
+    Raises:
+        HTTPException: 409 if the email is already registered
     """
     # Hash the password
     hashed_password = get_password_hash(user_data.password)
 
-    # TODO: Create user in database
-    # For now, return mock user data
-    return {
-        "id": "user-123",
-        "email": user_data.email,
-        "full_name": user_data.full_name,
-        "hashed_password": hashed_password,
-        "role": "client",
-        "is_active": True,
-        "created_at": datetime.utcnow()
-    }
+    try:
+        user = await repositories.create_user(
+            session,
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already registered"
+        )
+    return UserResponse.model_validate(user)
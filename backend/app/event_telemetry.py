@@ -0,0 +1,242 @@
+"""
+Workflow and payment event telemetry
+
+Events are counted in memory by (kind, event, status) and exported as
+app_domain_events_total; a summary record of each window's counts is
+logged every EVENT_SUMMARY_INTERVAL seconds. Only anomalous events are
+forwarded to Sentry:
+- Failures (status in FAILURE_STATUSES)
+- The first occurrence of a (kind, event, status, error_type) key
+
+Forwarding is deduplicated and rate limited per key: at most
+EVENT_ANOMALY_LIMIT events per key every EVENT_ANOMALY_WINDOW seconds,
+with the number suppressed in between reported on the next forwarded one.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from .metrics import registry
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+FAILURE_STATUSES = frozenset({
+    "failed", "error", "timed_out", "terminated", "canceled", "cancelled", "disputed",
+})
+
+EVENTS_TOTAL = registry.counter(
+    "app_domain_events_total",
+    "Workflow and payment events",
+    ("kind", "event", "status"),
+)
+ANOMALIES_FORWARDED = registry.counter(
+    "app_domain_anomalies_forwarded_total",
+    "Anomalous events forwarded to Sentry",
+    ("kind",),
+)
+ANOMALIES_SUPPRESSED = registry.counter(
+    "app_domain_anomalies_suppressed_total",
+    "Anomalous events not forwarded because of deduplication/rate limiting",
+    ("kind",),
+)
+
+EventKey = Tuple[str, str, str]
+
+
+# ==========================================
+# ANOMALY GATE
+# ==========================================
+
+class AnomalyGate:
+    """Per-key dedup and rate limit for anomalies forwarded to Sentry"""
+
+    def __init__(
+        self,
+        limit: int = 1,
+        window: float = 60.0,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limit: Forwarded events allowed per key per window
+            window: Window length (seconds)
+            max_keys: Keys remembered (least recently seen are evicted)
+            clock: Time source, overridable for tests
+        """
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+
+        # key -> [window_start, forwarded_in_window, suppressed_since_last_forward]
+        self._keys: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, key: tuple) -> bool:
+        """Whether the key has been seen (and is still remembered)"""
+        return key in self._keys
+
+    def allow(self, key: tuple) -> Optional[int]:
+        """
+        Record an anomaly for a key
+
+        Args:
+            key: Deduplication key
+
+        Returns:
+            Events suppressed for this key since the last forwarded one if
+            this event should be forwarded, None if it should be suppressed
+        """
+        now = self.clock()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                state = [now, 0, 0]
+                self._keys[key] = state
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            else:
+                self._keys.move_to_end(key)
+                if now - state[0] >= self.window:
+                    state[0] = now
+                    state[1] = 0
+
+            if state[1] >= self.limit:
+                state[2] += 1
+                return None
+
+            state[1] += 1
+            suppressed, state[2] = state[2], 0
+            return suppressed
+
+
+# ==========================================
+# AGGREGATION
+# ==========================================
+
+class EventAggregator:
+    """Counts events per window and decides which ones are anomalous"""
+
+    def __init__(self, gate: Optional[AnomalyGate] = None):
+        self.gate = gate or AnomalyGate()
+        self._counts: Dict[EventKey, int] = {}
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        kind: str,
+        event: str,
+        status: Optional[str],
+        error_type: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Count an event
+
+        Args:
+            kind: Event source ("workflow" or "payment")
+            event: Event name
+            status: Event status
+            error_type: Error class or code, if the event carries one
+
+        Returns:
+            Suppressed-event count (see AnomalyGate.allow) if the event is an
+            anomaly that should go to Sentry, otherwise None
+        """
+        status = status or "unknown"
+        key = (kind, event, status)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+        EVENTS_TOTAL.labels(kind, event, status).inc()
+
+        gate_key = (kind, event, status, error_type)
+        if status not in FAILURE_STATUSES and (error_type is None or self.gate.seen(gate_key)):
+            return None
+
+        suppressed = self.gate.allow(gate_key)
+        if suppressed is None:
+            ANOMALIES_SUPPRESSED.labels(kind).inc()
+        else:
+            ANOMALIES_FORWARDED.labels(kind).inc()
+        return suppressed
+
+    def summary(self, reset: bool = True) -> dict:
+        """
+        Counts for the current window
+
+        Args:
+            reset: Start a new window
+
+        Returns:
+            Dict with window_start, window_seconds and counts
+            ({"kind.event.status": count})
+        """
+        now = time.time()
+        with self._lock:
+            counts = self._counts
+            window_start = self._window_start
+            if reset:
+                self._counts = {}
+                self._window_start = now
+            else:
+                counts = dict(counts)
+
+        return {
+            "window_start": window_start,
+            "window_seconds": round(now - window_start, 3),
+            "counts": {".".join(key): count for key, count in sorted(counts.items())},
+        }
+
+    def emit_summary(self) -> None:
+        """Log the current window's counts and start a new window"""
+        summary = self.summary()
+        if summary["counts"]:
+            logger.info("Event summary", extra=summary)
+
+
+# Global aggregator instance
+event_aggregator = EventAggregator(AnomalyGate(
+    limit=int(os.getenv("EVENT_ANOMALY_LIMIT", "1")),
+    window=float(os.getenv("EVENT_ANOMALY_WINDOW", "60")),
+))
+
+_summary_task: Optional[asyncio.Task] = None
+
+
+async def _summary_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        event_aggregator.emit_summary()
+
+
+def start_event_summaries() -> None:
+    """Periodically log aggregated event counts"""
+    global _summary_task
+
+    if _summary_task is not None and not _summary_task.done():
+        return
+
+    interval = float(os.getenv("EVENT_SUMMARY_INTERVAL", "60"))
+    _summary_task = asyncio.get_running_loop().create_task(_summary_loop(interval))
+
+
+async def stop_event_summaries() -> None:
+    """Stop the summary task and log the final partial window"""
+    global _summary_task
+
+    if _summary_task is not None:
+        _summary_task.cancel()
+        try:
+            await _summary_task
+        except asyncio.CancelledError:
+            pass
+        _summary_task = None
+
+    event_aggregator.emit_summary()
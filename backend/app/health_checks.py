@@ -0,0 +1,135 @@
+"""
+Dependency health check runner
+
+Wraps check coroutines so that:
+- Every check has a timeout (a hung dependency cannot hang the endpoint)
+- Results are cached for a TTL
+- Concurrent callers share one in-flight probe
+- response_time_ms is measured
+- All checks run concurrently
+- Readiness changes only after `rise` consecutive successes or `fall`
+  consecutive failures (hysteresis), so instances don't flap
+"""
+
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+class CachedCheck:
+    """A timeout-bounded, cached, single-flight dependency check"""
+
+    def __init__(
+        self,
+        check: Callable[[], Awaitable[dict]],
+        critical: bool = False,
+        timeout: float = 2.0,
+        ttl: float = 10.0,
+        rise: int = 1,
+        fall: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            check: Coroutine function returning a result dict with "status" and "message"
+            critical: Whether a failure degrades overall health
+            timeout: Seconds before the probe is reported unhealthy
+            ttl: Seconds a result is reused
+            rise: Consecutive healthy probes needed to become ready again
+            fall: Consecutive failed probes needed to become not ready
+            clock: Time source, overridable for tests
+        """
+        self.check = check
+        self.critical = critical
+        self.timeout = timeout
+        self.ttl = ttl
+        self.rise = rise
+        self.fall = fall
+        self.clock = clock
+
+        # None until the first probe, which sets the initial state directly
+        self.ready: Optional[bool] = None
+        self._successes = 0
+        self._failures = 0
+
+        self._result: Optional[dict] = None
+        self._expires = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def run(self) -> dict:
+        """Return a fresh cached result, or probe (joining an in-flight probe)"""
+        if self._result is not None and self.clock() < self._expires:
+            return dict(self._result)
+
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(self._probe())
+            self._inflight.add_done_callback(self._clear_inflight)
+
+        # Shielded so a cancelled request does not cancel the shared probe
+        return dict(await asyncio.shield(self._inflight))
+
+    def _clear_inflight(self, task: asyncio.Task) -> None:
+        if self._inflight is task:
+            self._inflight = None
+
+    async def _probe(self) -> dict:
+        start = time.perf_counter()
+        try:
+            result = dict(await asyncio.wait_for(self.check(), self.timeout))
+        except asyncio.TimeoutError:
+            result = {
+                "status": "unhealthy",
+                "message": f"Check timed out after {self.timeout}s",
+            }
+        except Exception as e:
+            logger.warning(f"Health check {getattr(self.check, '__name__', self.check)} failed: {str(e)}")
+            result = {
+                "status": "unhealthy",
+                "message": f"Check failed: {str(e)}",
+            }
+
+        result["critical"] = self.critical
+        result["response_time_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["ready"] = self._update_ready(result["status"] == "healthy")
+
+        self._result = result
+        self._expires = self.clock() + self.ttl
+        return result
+
+    def _update_ready(self, healthy: bool) -> bool:
+        if healthy:
+            self._successes += 1
+            self._failures = 0
+        else:
+            self._failures += 1
+            self._successes = 0
+
+        if self.ready is None:
+            self.ready = healthy
+        elif self.ready and self._failures >= self.fall:
+            self.ready = False
+        elif not self.ready and self._successes >= self.rise:
+            self.ready = True
+        return self.ready
+
+    def invalidate(self) -> None:
+        """Drop the cached result"""
+        self._result = None
+
+
+async def run_checks(checks: Dict[str, CachedCheck]) -> Dict[str, dict]:
+    """
+    Run checks concurrently
+
+    Args:
+        checks: Checks by service name
+
+    Returns:
+        Results by service name
+    """
+    results = await asyncio.gather(*(check.run() for check in checks.values()))
+    return dict(zip(checks.keys(), results))
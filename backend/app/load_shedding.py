@@ -0,0 +1,186 @@
+"""
+Adaptive load shedding
+
+Under overload, rejecting some requests early keeps latency acceptable
+for the rest. The middleware watches event loop lag and in-flight
+requests and sheds by priority:
+
+- critical: never shed (checkout, Stripe webhooks, liveness/readiness probes)
+- low: shed first (detailed health, listing endpoints, docs, anonymous traffic)
+- normal: shed only under severe overload
+
+Shed requests get 503 with Retry-After and are counted in /api/metrics.
+"""
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+import os
+
+from .loop_monitor import LoopLagMonitor, loop_monitor
+from .metrics import registry
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+
+# Never shed: checkout and Stripe webhooks (prefix match)
+CRITICAL_PREFIXES = ("/api/payments/",)
+
+# Never shed: load balancer and Kubernetes probes (exact match)
+CRITICAL_PATHS = {
+    "/health",
+    "/api/health",
+    "/api/health/live",
+    "/api/health/ready",
+}
+
+# Shed first: (method, path) with trailing slashes stripped
+LOW_PRIORITY_ROUTES = {
+    ("GET", "/api/health/detailed"),
+    ("GET", "/api/projects"),
+    ("GET", "/docs"),
+    ("GET", "/redoc"),
+    ("GET", "/openapi.json"),
+}
+
+LOAD_SHED_REQUESTS = registry.counter(
+    "app_load_shed_requests_total",
+    "Requests rejected by load shedding",
+    ("priority",),
+)
+
+
+def classify_request(request: Request) -> str:
+    """
+    Assign a shedding priority to a request
+
+    Returns:
+        "critical", "normal" or "low"
+    """
+    path = request.url.path.rstrip("/") or "/"
+    if path in CRITICAL_PATHS or (path + "/").startswith(CRITICAL_PREFIXES):
+        return "critical"
+
+    if (request.method, path) in LOW_PRIORITY_ROUTES:
+        return "low"
+
+    # Anonymous traffic yields to signed-in users
+    if "authorization" not in request.headers:
+        return "low"
+
+    return "normal"
+
+
+# ==========================================
+# LOAD SHEDDER
+# ==========================================
+
+class LoadShedder:
+    """
+    Decides whether to admit a request given current load
+
+    Level 0: admit everything
+    Level 1 (lag >= lag_low or in-flight >= inflight_low): shed low priority
+    Level 2 (lag >= lag_high or in-flight >= inflight_high): shed low and normal
+    """
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        lag_low: float = 0.1,
+        lag_high: float = 0.5,
+        inflight_low: int = 200,
+        inflight_high: int = 500,
+        retry_after: int = 2,
+    ):
+        """
+        Args:
+            monitor: Event loop lag source
+            lag_low: Lag in seconds that starts shedding low priority traffic
+            lag_high: Lag in seconds that also sheds normal traffic
+            inflight_low: In-flight requests that start shedding low priority traffic
+            inflight_high: In-flight requests that also shed normal traffic
+            retry_after: Base Retry-After seconds (doubled at level 2)
+        """
+        self.monitor = monitor
+        self.lag_low = lag_low
+        self.lag_high = lag_high
+        self.inflight_low = inflight_low
+        self.inflight_high = inflight_high
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+
+    @property
+    def level(self) -> int:
+        """Current overload level (0, 1 or 2)"""
+        lag = self.monitor.lag
+        if lag >= self.lag_high or self.in_flight >= self.inflight_high:
+            return 2
+        if lag >= self.lag_low or self.in_flight >= self.inflight_low:
+            return 1
+        return 0
+
+    def should_shed(self, priority: str) -> bool:
+        """Decide whether to shed a request of the given priority (rejections are counted)"""
+        if priority == "critical":
+            shed = False
+        else:
+            level = self.level
+            shed = level >= 2 or (level == 1 and priority == "low")
+
+        if shed:
+            LOAD_SHED_REQUESTS.labels(priority).inc()
+        return shed
+
+
+# Global load shedder instance
+load_shedder = LoadShedder(
+    loop_monitor,
+    lag_low=float(os.getenv("SHED_LAG_LOW_MS", "100")) / 1000,
+    lag_high=float(os.getenv("SHED_LAG_HIGH_MS", "500")) / 1000,
+    inflight_low=int(os.getenv("SHED_INFLIGHT_LOW", "200")),
+    inflight_high=int(os.getenv("SHED_INFLIGHT_HIGH", "500")),
+)
+
+# Gauges read the global instance at scrape time
+registry.gauge(
+    "app_load_shed_level",
+    "Current load shedding level (0 = none, 2 = severe)",
+    multiprocess_mode="max",
+).set_function(lambda: load_shedder.level)
+registry.gauge(
+    "app_event_loop_lag_seconds",
+    "Event loop scheduling lag",
+).set_function(lambda: load_shedder.monitor.lag)
+
+
+# ==========================================
+# MIDDLEWARE (Add to FastAPI app)
+# ==========================================
+
+async def load_shedding_middleware(request: Request, call_next):
+    """
+    Middleware to reject low-priority requests while the instance is overloaded
+    Register it last so it runs before all other middleware.
+    """
+    shedder = load_shedder
+    priority = classify_request(request)
+
+    if shedder.should_shed(priority):
+        retry_after = shedder.retry_after * shedder.level
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "error": "overloaded",
+                "message": f"Server is busy. Try again in {retry_after} seconds.",
+                "retry_after": retry_after,
+            },
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    shedder.in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        shedder.in_flight -= 1
@@ -0,0 +1,306 @@
+"""
+Asynchronous logging pipeline
+
+Request handlers only put records on a bounded queue (QueueHandler). A
+listener thread drains the queue in batches, serialises records to JSON
+lines, writes each batch with a single write, and forwards records marked
+for Sentry (see StructuredLogger) off the request path.
+
+Backpressure when the queue is full (LOG_QUEUE_POLICY):
+- drop_oldest: discard the oldest queued record (never blocks a request)
+- block: wait up to LOG_BLOCK_TIMEOUT seconds, then drop the new record
+
+Started and flushed in the FastAPI lifespan.
+"""
+
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Callable, List, Optional, TextIO
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+from .metrics import registry
+
+# Attribute marking records to forward to Sentry (value: Sentry level)
+SENTRY_LEVEL_ATTR = "sentry_level"
+
+QUEUE_POLICIES = ("drop_oldest", "block")
+
+# Standard LogRecord attributes (anything else came from `extra`)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "app_log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+
+_STOP = object()
+
+
+def record_extras(record: logging.LogRecord) -> dict:
+    """Fields passed via `extra` (excluding the Sentry marker)"""
+    return {
+        key: value for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS and key != SENTRY_LEVEL_ATTR
+    }
+
+
+# ==========================================
+# FORMATTING
+# ==========================================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(record_extras(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# ==========================================
+# QUEUE HANDLER
+# ==========================================
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler with drop-oldest or bounded-block backpressure"""
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop_oldest", block_timeout: float = 1.0):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Invalid log queue policy: {policy}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message now (args may be mutated later); tracebacks are
+        # formatted on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy == "block":
+                LOG_RECORDS_DROPPED.inc()
+                return
+
+        # drop_oldest: make room by discarding the head of the queue (may be
+        # the stop sentinel; the listener also checks the pipeline's stop event)
+        try:
+            dropped = self.queue.get_nowait()
+            self.queue.task_done()
+            if dropped is not _STOP:
+                LOG_RECORDS_DROPPED.inc()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+# ==========================================
+# PIPELINE
+# ==========================================
+
+class LogPipeline:
+    """Bounded queue + batching listener thread"""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        formatter: Optional[logging.Formatter] = None,
+        queue_size: int = 10_000,
+        policy: str = "drop_oldest",
+        block_timeout: float = 1.0,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        """
+        Args:
+            stream: Output stream (defaults to sys.stderr at write time)
+            formatter: Record formatter (defaults to JsonFormatter)
+            queue_size: Maximum queued records
+            policy: "drop_oldest" or "block" when the queue is full
+            block_timeout: Seconds to wait for room under the "block" policy
+            batch_size: Maximum records per write
+            flush_interval: Seconds the listener waits for records before re-checking for stop
+        """
+        self.stream = stream
+        self.formatter = formatter or JsonFormatter()
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue, policy, block_timeout)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Called on the listener thread for records carrying SENTRY_LEVEL_ATTR
+        self.forward: Optional[Callable[[logging.LogRecord], None]] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._logger: Optional[logging.Logger] = None
+        self._previous_handlers: List[logging.Handler] = []
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, logger: Optional[logging.Logger] = None, level: Optional[int] = None) -> None:
+        """
+        Route a logger (default: root) through the queue and start the listener
+
+        Args:
+            logger: Logger whose handlers are replaced by the queue handler
+            level: Optional level to set on the logger
+        """
+        if self.running:
+            return
+
+        self._logger = logger or logging.getLogger()
+        self._previous_handlers = list(self._logger.handlers)
+        self._logger.handlers = [self.handler]
+        if level is not None:
+            self._logger.setLevel(level)
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="log-pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued records, stop the listener and restore the logger's handlers"""
+        if self._thread is None:
+            return
+
+        # The sentinel only wakes the listener early: drop_oldest may discard
+        # it, so the listener also checks the event between batches
+        self._stopping.set()
+        try:
+            self.queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+        if self._logger is not None:
+            self._logger.handlers = self._previous_handlers
+            self._logger = None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every queued record has been written
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self.running:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            batch = []
+            stop = record is _STOP
+            if not stop:
+                batch.append(record)
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                else:
+                    batch.append(record)
+
+            self._write(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self.queue.task_done()
+
+            if stop or self._stopping.is_set():
+                # Drain anything logged while stopping
+                remaining = []
+                while True:
+                    try:
+                        remaining.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write([r for r in remaining if r is not _STOP])
+                for _ in remaining:
+                    self.queue.task_done()
+                return
+
+    def _write(self, batch: List[logging.LogRecord]) -> None:
+        if not batch:
+            return
+
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception as e:
+                lines.append(json.dumps({"level": "ERROR", "message": f"Unformattable log record: {str(e)}"}))
+
+        stream = self.stream or sys.stderr
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            pass
+
+        if self.forward is not None:
+            for record in batch:
+                if getattr(record, SENTRY_LEVEL_ATTR, None):
+                    try:
+                        self.forward(record)
+                    except Exception:
+                        pass
+
+
+def _formatter_from_env() -> logging.Formatter:
+    if os.getenv("LOG_FORMAT", "json") == "text":
+        return logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return JsonFormatter()
+
+
+# Global pipeline instance (started in the app lifespan)
+log_pipeline = LogPipeline(
+    formatter=_formatter_from_env(),
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+    policy=os.getenv("LOG_QUEUE_POLICY", "drop_oldest"),
+    block_timeout=float(os.getenv("LOG_BLOCK_TIMEOUT", "1")),
+    batch_size=int(os.getenv("LOG_BATCH_SIZE", "256")),
+    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "0.5")),
+)
+
+# Gauge reads the global instance at scrape time
+registry.gauge("app_log_queue_depth", "Log records waiting to be written").set_function(
+    lambda: log_pipeline.queue.qsize())
@@ -0,0 +1,211 @@
+"""
+Event loop lag monitoring
+
+A background task sleeps for a fixed interval and measures how late it
+wakes up. The overshoot is the time other callbacks held the loop, i.e.
+how long any request would currently wait before being scheduled.
+
+Slow callback detection (a production-safe stand-in for asyncio debug
+mode's slow_callback_duration logging): a watchdog thread notices when the
+sampling task has not run for longer than the threshold and captures the
+loop thread's current stack via sys._current_frames(), i.e. the code
+that is blocking the loop *while* it blocks, not just how long it took.
+"""
+
+from collections import deque
+from typing import Deque, List, Optional
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from .metrics import registry
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = registry.histogram(
+    "app_event_loop_scheduling_lag_seconds",
+    "Event loop scheduling lag samples",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SLOW_CALLBACKS = registry.counter(
+    "app_event_loop_slow_callbacks_total",
+    "Callbacks that blocked the event loop longer than the slow callback threshold",
+)
+
+# Frames kept per captured stack (innermost)
+STACK_LIMIT = 30
+
+
+class LoopLagMonitor:
+    """
+    Continuously samples event loop scheduling lag
+
+    `lag` holds the latest spike and decays geometrically afterwards, so a
+    single long stall is visible for several samples without latching.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        decay: float = 0.8,
+        slow_callback: float = 0.1,
+        history: int = 50,
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            decay: Factor applied to the previous lag on each sample
+            slow_callback: Seconds the loop may be blocked before its stack is captured (0 disables)
+            history: Slow callback captures kept
+        """
+        self.interval = interval
+        self.decay = decay
+        self.slow_callback = slow_callback
+        self.lag = 0.0          # Seconds, peak-hold with decay
+        self.last_lag = 0.0     # Seconds, most recent raw sample
+        self.max_lag = 0.0      # Seconds, worst since start
+        self.slow_callbacks: Deque[dict] = deque(maxlen=history)
+
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._open_stall: Optional[dict] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling on the running event loop (and the slow callback watchdog)"""
+        if self._task is not None and not self._task.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = self._loop.create_task(self._run())
+
+        if self.slow_callback > 0:
+            if self._loop.get_debug():
+                # Keep asyncio's own debug logging on the same threshold
+                self._loop.slow_callback_duration = self.slow_callback
+            self._stop_event.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        self._stop_event.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - start - self.interval)
+
+    def record(self, lag: float) -> None:
+        """Record one lag sample in seconds"""
+        lag = max(0.0, lag)
+        self.last_lag = lag
+        self.lag = max(lag, self.lag * self.decay)
+        self.max_lag = max(self.max_lag, lag)
+        LOOP_LAG.observe(lag)
+
+        stall = self._open_stall
+        if stall is not None:
+            # The stall the watchdog captured has ended
+            stall["duration_ms"] = round(lag * 1000, 1)
+            self._open_stall = None
+
+    # ==========================================
+    # SLOW CALLBACK WATCHDOG
+    # ==========================================
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.slow_callback / 2)
+        captured_beat = None
+        while not self._stop_event.wait(poll):
+            beat = self._heartbeat
+            # Blocked = the sampler missed its wake-up by more than the threshold
+            if beat != captured_beat and time.monotonic() - beat - self.interval > self.slow_callback:
+                captured_beat = beat
+                self.capture_stall(time.monotonic() - beat - self.interval)
+
+    def capture_stall(self, blocked_for: float) -> Optional[dict]:
+        """
+        Record the loop thread's current stack
+
+        Args:
+            blocked_for: Seconds the loop has been blocked so far
+
+        Returns:
+            The capture, or None if the loop thread is not running
+        """
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        stack = _format_stack(frame)
+        stall = {
+            "timestamp": time.time(),
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "duration_ms": None,    # Filled in when the loop resumes
+            "task": task.get_name() if task is not None else None,
+            "coroutine": _coroutine_name(task),
+            "stack": stack,
+        }
+        self.slow_callbacks.append(stall)
+        self._open_stall = stall
+        SLOW_CALLBACKS.inc()
+
+        logger.warning(
+            f"Event loop blocked for over {stall['blocked_ms']}ms in "
+            f"{stall['coroutine'] or 'a callback'} at {stack[-1] if stack else 'unknown'}",
+            extra={"slow_callback": stall},
+        )
+        return stall
+
+    def recent_slow_callbacks(self) -> List[dict]:
+        """Slow callback captures, newest first"""
+        return list(reversed(self.slow_callbacks))
+
+
+def _format_stack(frame) -> List[str]:
+    """Stack as "file:line in function" entries, outermost first"""
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=STACK_LIMIT)
+    ]
+
+
+def _coroutine_name(task: Optional[asyncio.Task]) -> Optional[str]:
+    if task is None:
+        return None
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or repr(coro)
+
+
+# Global monitor instance (started in the app lifespan)
+loop_monitor = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05")),
+    slow_callback=float(os.getenv("LOOP_SLOW_CALLBACK_MS", "100")) / 1000,
+    history=int(os.getenv("LOOP_SLOW_CALLBACK_HISTORY", "50")),
+)
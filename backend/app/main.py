@@ -15,16 +15,57 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
+from contextlib import asynccontextmanager
 from datetime import datetime
+import logging
 import os
 
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import DB_POOL_TIMEOUTS, init_database, close_database
+from app.rate_limiter import init_rate_limiter, close_rate_limiter, rate_limit_middleware
+from app.temporal_client import close_temporal_client
+from app.loop_monitor import loop_monitor
+from app.load_shedding import load_shedding_middleware
+from app.log_pipeline import log_pipeline
+from app.monitoring import init_sentry
+from app.event_telemetry import start_event_summaries, stop_event_summaries
+from app.metrics import MetricsMiddleware, start_metrics_flusher, stop_metrics_flusher
+from app.system_metrics import system_sampler
+
+# Error monitoring (no-op unless SENTRY_DSN is set)
+init_sentry(environment=os.getenv("ENVIRONMENT", "development"))
+
+# Startup / shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients on startup and release them on shutdown"""
+    log_pipeline.start(level=logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper()))
+    init_database()
+    await init_rate_limiter()
+    loop_monitor.start()
+    system_sampler.start()
+    start_metrics_flusher()
+    start_event_summaries()
+    yield
+    await stop_event_summaries()
+    await stop_metrics_flusher()
+    system_sampler.stop()
+    await loop_monitor.stop()
+    await close_rate_limiter()
+    close_temporal_client()
+    await close_database()
+    # Flush queued log records last so shutdown messages are written
+    log_pipeline.stop()
+
 # App initialization
 app = FastAPI(
     title="Faceless Automation Platform API",
     description="Backend API for YouTube content automation",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware for Next.js frontend
@@ -39,6 +80,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# X-RateLimit-* headers on responses
+app.middleware("http")(rate_limit_middleware)
+
+# Per-route request count and latency for /api/metrics
+app.add_middleware(MetricsMiddleware)
+
+# Shed low-priority traffic under overload (registered last, so it runs first)
+app.middleware("http")(load_shedding_middleware)
+
+# Connection pool exhausted: ask clients to retry instead of a bare 500
+@app.exception_handler(PoolTimeoutError)
+async def database_pool_timeout_handler(request, exc):
+    DB_POOL_TIMEOUTS.inc()
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -66,13 +126,15 @@ if os.path.exists(uploads_dir):
     app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 
 # Import routers
-from app.routers import projects, workflows, payments, health, users
+from app.routers import projects, workflows, payments, health, users, admin, analytics
 
 app.include_router(health.router, prefix="/api", tags=["Health"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app.include_router(workflows.router, prefix="/api/workflows", tags=["Workflows"])
 app.include_router(payments.router, prefix="/api/payments", tags=["Payments"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 if __name__ == "__main__":
     uvicorn.run(
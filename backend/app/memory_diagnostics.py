@@ -0,0 +1,203 @@
+"""
+Memory diagnostics
+
+- Process RSS and garbage collector statistics (always available)
+- tracemalloc control: start/stop tracing, take snapshots, and diff two
+  snapshots grouped by file:line to find what is growing
+
+tracemalloc slows allocation-heavy code noticeably while tracing, so it is
+off until an operator starts it (or PYTHONTRACEMALLOC is set). Snapshots
+are held in memory; only the most recent few are kept.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List
+import gc
+import os
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+# Allocations made by tracemalloc itself and the import system are noise
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+# ==========================================
+# PROCESS / GC STATS
+# ==========================================
+
+def process_memory() -> dict:
+    """
+    Process memory, GC and tracemalloc status
+
+    Returns:
+        Dict with rss/vms bytes, per-generation GC stats and tracing status
+    """
+    memory = psutil.Process().memory_info()
+    generations = [
+        {"generation": index, "pending": pending, "threshold": threshold, **stats}
+        for index, (pending, threshold, stats) in enumerate(
+            zip(gc.get_count(), gc.get_threshold(), gc.get_stats())
+        )
+    ]
+
+    tracing = tracemalloc.is_tracing()
+    traced_current, traced_peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+
+    return {
+        "rss_bytes": memory.rss,
+        "vms_bytes": memory.vms,
+        "gc": {
+            "enabled": gc.isenabled(),
+            "uncollectable": len(gc.garbage),
+            "generations": generations,
+        },
+        "tracemalloc": {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": traced_current,
+            "traced_peak_bytes": traced_peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+        },
+        "snapshots": snapshot_store.list(),
+    }
+
+
+# ==========================================
+# TRACEMALLOC SNAPSHOTS
+# ==========================================
+
+class SnapshotStore:
+    """Bounded set of tracemalloc snapshots by id"""
+
+    def __init__(self, max_snapshots: int = 5):
+        """
+        Args:
+            max_snapshots: Snapshots kept (oldest are dropped)
+        """
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self) -> dict:
+        """
+        Take a snapshot of current allocations
+
+        Returns:
+            Snapshot summary (id, timestamp, traced bytes)
+
+        Raises:
+            RuntimeError: If tracemalloc is not tracing
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        taken_at = time.time()
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (snapshot, taken_at, traced)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        return {"id": snapshot_id, "timestamp": taken_at, "traced_bytes": traced}
+
+    def get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        """
+        Raises:
+            KeyError: If the snapshot does not exist (or was dropped)
+        """
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                raise KeyError(f"Snapshot {snapshot_id} not found")
+            return self._snapshots[snapshot_id][0]
+
+    def list(self) -> List[dict]:
+        """Kept snapshots, oldest first"""
+        with self._lock:
+            return [
+                {"id": snapshot_id, "timestamp": taken_at, "traced_bytes": traced}
+                for snapshot_id, (_, taken_at, traced) in self._snapshots.items()
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def top(self, snapshot_id: int, limit: int = 20) -> List[dict]:
+        """
+        Largest allocation sites in one snapshot
+
+        Args:
+            snapshot_id: Snapshot id
+            limit: Entries returned
+
+        Returns:
+            Entries with file, line, size_bytes and count
+        """
+        return [
+            {**_location(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in self.get(snapshot_id).statistics("lineno")[:limit]
+        ]
+
+    def diff(self, base_id: int, target_id: int, limit: int = 20) -> List[dict]:
+        """
+        Allocation growth between two snapshots, grouped by file:line
+
+        Args:
+            base_id: Earlier snapshot id
+            target_id: Later snapshot id
+            limit: Entries returned (largest absolute change first)
+
+        Returns:
+            Entries with file, line, size_diff_bytes, size_bytes, count_diff and count
+        """
+        base = self.get(base_id)
+        target = self.get(target_id)
+        return [
+            {
+                **_location(stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in target.compare_to(base, "lineno")[:limit]
+        ]
+
+
+def _location(traceback: tracemalloc.Traceback) -> Dict[str, object]:
+    frame = traceback[0]
+    return {"file": frame.filename, "line": frame.lineno}
+
+
+def start_tracing(frames: int = 1) -> None:
+    """
+    Start tracemalloc (no-op if already tracing)
+
+    Args:
+        frames: Frames stored per allocation (more = more memory and CPU)
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    """Stop tracemalloc and drop its traces and our snapshots"""
+    tracemalloc.stop()
+    snapshot_store.clear()
+
+
+# Global snapshot store
+snapshot_store = SnapshotStore(max_snapshots=int(os.getenv("TRACEMALLOC_SNAPSHOTS", "5")))
@@ -0,0 +1,761 @@
+"""
+Prometheus metrics
+
+Provides:
+- Counters, gauges and fixed-bucket histograms with labels
+- Latency summaries backed by HDR-style log-linear histograms (exact
+  quantiles within ~1.6%, mergeable across workers)
+- ASGI middleware recording per-route latency and status
+- Prometheus text exposition (format 0.0.4)
+- Multi-process aggregation for several uvicorn workers
+
+Updates are a dict lookup plus an add (under an uncontended lock for
+counters, gauges and histograms), so they are safe to call on every request.
+Latency summaries buffer raw observations, which are bucketed when a
+snapshot is taken and every METRICS_FLUSH_INTERVAL seconds by the flusher.
+
+Multi-process mode:
+Set PROMETHEUS_MULTIPROC_DIR to a directory shared by all workers (and
+empty it before starting the server). Each worker writes its values to
+metrics_<pid>.json every METRICS_FLUSH_INTERVAL seconds and on shutdown;
+a scrape served by any worker merges all files. Counters and histograms
+are summed over every file, so counts from restarted workers are kept.
+Gauges only include live workers and are merged per `multiprocess_mode`:
+"all" (one series per pid), "sum", "max" or "min".
+"""
+
+from bisect import bisect_left
+from itertools import repeat
+from operator import floordiv
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import collections
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GAUGE_MODES = ("all", "sum", "max", "min")
+
+# Quantiles exported for latency summaries
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# HDR-style histogram geometry: values in microseconds, 2^HDR_BITS linear
+# sub-buckets per power of two (relative error <= 1 / 2^(HDR_BITS - 1))
+HDR_BITS = 7
+_HDR_HALF = 1 << (HDR_BITS - 1)
+
+# ==========================================
+# METRIC VALUES
+# ==========================================
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment by a non-negative amount"""
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        with self._lock:
+            self.value += amount
+
+    def get(self) -> float:
+        return self.value
+
+
+class _GaugeValue:
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from `function` at collection time"""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            return float(self.function())
+        return self.value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # Last bucket is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def get(self) -> Tuple[List[int], float]:
+        """(per-bucket counts, sum)"""
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+def hdr_index(microseconds: int) -> int:
+    """Log-linear bucket index for a non-negative integer value"""
+    shift = microseconds.bit_length() - HDR_BITS
+    if shift <= 0:
+        return microseconds
+    return shift * _HDR_HALF + (microseconds >> shift)
+
+
+def hdr_value(index: int) -> float:
+    """Midpoint (in microseconds) of the values mapped to a bucket index"""
+    if index < 2 * _HDR_HALF:
+        return float(index)
+    shift = index // _HDR_HALF - 1
+    mantissa = index - shift * _HDR_HALF
+    return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) / 2
+
+
+def hdr_quantiles(counts: List[List[int]], quantiles: Sequence[float]) -> List[float]:
+    """
+    Quantiles in seconds from sparse HDR bucket counts
+
+    Args:
+        counts: [index, count] pairs
+        quantiles: Quantiles between 0 and 1
+
+    Returns:
+        One value per quantile (NaN when there are no observations)
+    """
+    buckets = sorted(counts)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return [math.nan for _ in quantiles]
+
+    results = []
+    for quantile in quantiles:
+        rank = max(1, math.ceil(quantile * total))
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen >= rank:
+                results.append(hdr_value(index) / 1_000_000)
+                break
+    return results
+
+
+# Raw observations buffered per series before they are bucketed
+LATENCY_BUFFER = 4096
+
+
+class _LatencyValue:
+    """
+    HDR-style latency histogram
+
+    Observations are appended raw to `buffer` and bucketed in bulk by
+    fold() when the buffer fills, a snapshot is taken or the metrics
+    flusher runs. @monitor_performance appends to the buffer directly,
+    without the fill check, and relies on the flusher to bound it.
+
+    Not locked: under the GIL a concurrent update from another thread can
+    at worst drop a single observation, which latency statistics tolerate.
+    """
+
+    __slots__ = ("buffer", "counts", "sum", "max")
+
+    def __init__(self):
+        # Always the same list object, so callers may bind buffer.append
+        self.buffer: List[int] = []
+        self.counts: Dict[int, int] = {}
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe_ns(self, nanoseconds: int) -> None:
+        """Record one non-negative duration in nanoseconds"""
+        buffer = self.buffer
+        buffer.append(nanoseconds)
+        if len(buffer) >= LATENCY_BUFFER:
+            self.fold()
+
+    def observe(self, seconds: float) -> None:
+        """Record one non-negative duration in seconds"""
+        self.observe_ns(int(seconds * 1_000_000_000))
+
+    def fold(self) -> None:
+        """Move buffered durations into the HDR buckets"""
+        # Copy, then remove only what was copied: appends racing with the
+        # fold stay buffered
+        pending = self.buffer[:]
+        if not pending:
+            return
+        del self.buffer[:len(pending)]
+
+        counts = self.counts
+        for microseconds, count in collections.Counter(map(floordiv, pending, repeat(1000))).items():
+            index = hdr_index(microseconds)
+            counts[index] = counts.get(index, 0) + count
+        self.sum += sum(pending) / 1_000_000_000
+        self.max = max(self.max, max(pending) / 1_000_000_000)
+
+    def get(self) -> dict:
+        """Sparse counts, sum and max (JSON serialisable)"""
+        self.fold()
+        # list() copies the dict atomically under the GIL
+        return {"counts": [list(item) for item in list(self.counts.items())], "sum": self.sum, "max": self.max}
+
+
+# ==========================================
+# METRIC FAMILIES
+# ==========================================
+
+class _Metric:
+    """A named metric with zero or more labels"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get (or create) the series for the given label values (strings)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            values = tuple(str(value) for value in values)
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_value()
+        return child
+
+    def fold(self) -> None:
+        """Bucket buffered observations (latency summaries only)"""
+
+    def collect(self) -> dict:
+        """Snapshot of this metric (JSON serialisable)"""
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(key), child.get()] for key, child in list(self._children.items())],
+        }
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def _new_value(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment an unlabelled counter"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "all"):
+        if multiprocess_mode not in GAUGE_MODES:
+            raise ValueError(f"Invalid multiprocess_mode for {name}: {multiprocess_mode}")
+        super().__init__(name, documentation, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+
+    def _new_value(self):
+        return _GaugeValue()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.labels().set_function(function)
+
+    def collect(self) -> dict:
+        snapshot = super().collect()
+        snapshot["mode"] = self.multiprocess_mode
+        return snapshot
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def collect(self) -> dict:
+        snapshot = super().collect()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class LatencySummary(_Metric):
+    """
+    Latency distribution exported as a Prometheus summary
+
+    Unlike client-side summaries, quantiles come from a mergeable HDR-style
+    histogram, so they stay exact when workers are aggregated.
+    """
+
+    type = "summary"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        super().__init__(name, documentation, labelnames)
+        self.quantiles = tuple(quantiles)
+
+    def _new_value(self):
+        return _LatencyValue()
+
+    def observe(self, seconds: float) -> None:
+        self.labels().observe(seconds)
+
+    def fold(self) -> None:
+        for child in list(self._children.values()):
+            child.fold()
+
+    def collect(self) -> dict:
+        snapshot = super().collect()
+        snapshot["quantiles"] = list(self.quantiles)
+        return snapshot
+
+
+# ==========================================
+# REGISTRY
+# ==========================================
+
+class MetricsRegistry:
+    """Process-wide collection of metrics"""
+
+    def __init__(self, multiprocess_dir: Optional[str] = None, pid: Optional[int] = None):
+        """
+        Args:
+            multiprocess_dir: Shared directory for per-worker snapshots (None = single process)
+            pid: Process ID used for this worker's snapshot (defaults to os.getpid())
+        """
+        self.multiprocess_dir = multiprocess_dir
+        self._pid = pid
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self) -> int:
+        # Resolved lazily so forked workers get their own snapshot file
+        return self._pid or os.getpid()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "all") -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, documentation, labelnames, multiprocess_mode)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def summary(self, name: str, documentation: str, labelnames: Sequence[str] = (), quantiles: Sequence[float] = DEFAULT_QUANTILES) -> LatencySummary:
+        """Get or create a latency summary"""
+        return self._register(LatencySummary, name, documentation, labelnames, quantiles)
+
+    def fold(self) -> None:
+        """Bucket the raw observations buffered by latency summaries"""
+        for metric in list(self._metrics.values()):
+            metric.fold()
+
+    def collect(self) -> Dict[str, dict]:
+        """Snapshot of all metrics in this process"""
+        snapshot = {}
+        for name, metric in list(self._metrics.items()):
+            try:
+                snapshot[name] = metric.collect()
+            except Exception as e:
+                # A failing gauge callback must not break the whole scrape
+                logger.warning(f"Failed to collect metric {name}: {str(e)}")
+        return snapshot
+
+    # ------------------------------------------
+    # Multi-process
+    # ------------------------------------------
+
+    def write_snapshot(self) -> None:
+        """Write this worker's values to the shared directory"""
+        if not self.multiprocess_dir:
+            return
+
+        path = os.path.join(self.multiprocess_dir, f"metrics_{self.pid}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pid": self.pid, "time": time.time(), "metrics": self.collect()}, f)
+        os.replace(tmp_path, path)
+
+    def _read_snapshots(self) -> List[dict]:
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiprocess_dir, "metrics_*.json")):
+            try:
+                with open(path, "r") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {path}: {str(e)}")
+        return snapshots
+
+    def collect_all(self) -> Dict[str, dict]:
+        """Metrics merged across all workers (or this process only)"""
+        if not self.multiprocess_dir:
+            return self.collect()
+
+        self.write_snapshot()
+        return merge_snapshots(self._read_snapshots())
+
+    def render(self) -> str:
+        """Prometheus text exposition of all metrics"""
+        return render_metrics(self.collect_all())
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: List[dict]) -> Dict[str, dict]:
+    """
+    Merge per-worker snapshots into one
+
+    Args:
+        snapshots: Parsed metrics_<pid>.json files
+
+    Returns:
+        Metrics dict in MetricsRegistry.collect() format
+    """
+    merged: Dict[str, dict] = {}
+    values: Dict[str, Dict[tuple, object]] = {}
+
+    for snapshot in snapshots:
+        pid = snapshot["pid"]
+        alive = None
+
+        for name, metric in snapshot["metrics"].items():
+            family = merged.get(name)
+            if family is None:
+                family = merged[name] = {key: value for key, value in metric.items() if key != "values"}
+                if metric["type"] == "gauge" and metric.get("mode", "all") == "all":
+                    family["labelnames"] = metric["labelnames"] + ["pid"]
+                values[name] = {}
+            series = values[name]
+
+            if metric["type"] == "gauge":
+                if alive is None:
+                    alive = _pid_alive(pid)
+                if not alive:
+                    continue
+                mode = family.get("mode", "all")
+                for labels, value in metric["values"]:
+                    if mode == "all":
+                        series[tuple(labels) + (str(pid),)] = value
+                        continue
+                    key = tuple(labels)
+                    if key not in series:
+                        series[key] = value
+                    elif mode == "sum":
+                        series[key] += value
+                    elif mode == "max":
+                        series[key] = max(series[key], value)
+                    else:
+                        series[key] = min(series[key], value)
+
+            elif metric["type"] == "histogram":
+                for labels, (counts, total) in metric["values"]:
+                    key = tuple(labels)
+                    if key in series:
+                        current_counts, current_total = series[key]
+                        series[key] = ([a + b for a, b in zip(current_counts, counts)], current_total + total)
+                    else:
+                        series[key] = (list(counts), total)
+
+            elif metric["type"] == "summary":
+                for labels, value in metric["values"]:
+                    key = tuple(labels)
+                    if key in series:
+                        series[key] = merge_latency(series[key], value)
+                    else:
+                        series[key] = value
+
+            else:
+                for labels, value in metric["values"]:
+                    key = tuple(labels)
+                    series[key] = series.get(key, 0.0) + value
+
+    for name, family in merged.items():
+        family["values"] = [[list(key), value] for key, value in values[name].items()]
+    return merged
+
+
+def merge_latency(a: dict, b: dict) -> dict:
+    """Merge two latency summary values"""
+    counts: Dict[int, int] = {}
+    for index, count in a["counts"] + b["counts"]:
+        counts[index] = counts.get(index, 0) + count
+    return {
+        "counts": [[index, count] for index, count in counts.items()],
+        "sum": a["sum"] + b["sum"],
+        "max": max(a["max"], b["max"]),
+    }
+
+
+# ==========================================
+# EXPOSITION
+# ==========================================
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_metrics(metrics: Dict[str, dict]) -> str:
+    """
+    Render metrics in Prometheus text format
+
+    Args:
+        metrics: Metrics dict in MetricsRegistry.collect() format
+
+    Returns:
+        Exposition text
+    """
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        labelnames = metric["labelnames"]
+        documentation = metric["help"].replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+
+        for labels, value in sorted(metric["values"], key=lambda item: item[0]):
+            if metric["type"] == "histogram":
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + [math.inf], counts):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+            elif metric["type"] == "summary":
+                quantiles = metric["quantiles"]
+                for quantile, result in zip(quantiles, hdr_quantiles(value["counts"], quantiles)):
+                    q = f'quantile="{_format_value(quantile)}"'
+                    lines.append(f"{name}{_format_labels(labelnames, labels, q)} {_format_value(result)}")
+                count = sum(count for _, count in value["counts"])
+                lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labels)} {count}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+registry = MetricsRegistry(multiprocess_dir=os.getenv("PROMETHEUS_MULTIPROC_DIR") or None)
+
+# ==========================================
+# HTTP METRICS
+# ==========================================
+
+HTTP_REQUESTS = registry.counter(
+    "app_http_requests_total",
+    "HTTP requests by route template and status code",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "app_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "app_http_requests_in_progress",
+    "HTTP requests currently being handled",
+    multiprocess_mode="sum",
+)
+
+# Label for requests that matched no route (keeps 404 scans from adding series)
+UNMATCHED_ROUTE = "unmatched"
+
+# Scopes of requests in flight, by id (read by the profiler to attribute stacks)
+active_requests: Dict[int, dict] = {}
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, status and latency per route template
+    Add with app.add_middleware(MetricsMiddleware).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        active_requests[id(scope)] = scope
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            active_requests.pop(id(scope), None)
+
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, template).observe(duration)
+
+
+# ==========================================
+# FLUSH TASK
+# ==========================================
+
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def _flush_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        registry.fold()
+        try:
+            registry.write_snapshot()
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {str(e)}")
+
+
+def start_metrics_flusher() -> None:
+    """
+    Periodically bucket buffered latencies and, in multi-process mode,
+    publish this worker's metrics
+    """
+    global _flush_task
+
+    if _flush_task is not None and not _flush_task.done():
+        return
+
+    if registry.multiprocess_dir:
+        os.makedirs(registry.multiprocess_dir, exist_ok=True)
+    interval = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    _flush_task = asyncio.get_running_loop().create_task(_flush_loop(interval))
+
+
+async def stop_metrics_flusher() -> None:
+    """Stop the flush task and publish final values"""
+    global _flush_task
+
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+
+    if registry.multiprocess_dir:
+        registry.write_snapshot()
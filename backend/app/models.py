@@ -3,9 +3,8 @@ Database models for the Faceless Automation Platform
 Using SQLAlchemy ORM
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Boolean, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum
+from sqlalchemy.orm import declarative_base, declared_attr, relationship
 from datetime import datetime
 import enum
 
@@ -39,6 +38,11 @@ class PaymentStatus(str, enum.Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
+
+def _enum_values(enum_class) -> list:
+    """Store enum values ("draft"), not member names ("DRAFT"), matching the migrations"""
+    return [member.value for member in enum_class]
+
 # ==========================================
 # MODELS
 # ==========================================
@@ -51,7 +55,7 @@ class User(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.CLIENT)
+    role = Column(SQLEnum(UserRole, values_callable=_enum_values), default=UserRole.CLIENT)
     is_active = Column(Boolean, default=True)
 
     # Profile
@@ -82,7 +86,7 @@ class Project(Base):
     title = Column(String, nullable=False)
     niche_id = Column(String, nullable=False)
     channel_id = Column(String, nullable=True)
-    status = Column(SQLEnum(ProjectStatus), default=ProjectStatus.DRAFT)
+    status = Column(SQLEnum(ProjectStatus, values_callable=_enum_values), default=ProjectStatus.DRAFT)
 
     # Content configuration
     target_duration = Column(Integer, default=60)  # seconds
@@ -114,6 +118,13 @@ class Project(Base):
     scripts = relationship("Script", back_populates="project")
     analytics = relationship("Analytics", back_populates="project", uselist=False)
 
+    __table_args__ = (
+        # Keyset pagination of a user's projects (see app.pagination)
+        Index("ix_projects_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # A user's projects in one status, newest first (status filter, workflow queues)
+        Index("ix_projects_owner_id_status", "owner_id", "status", "created_at", "id"),
+    )
+
 
 class Script(Base):
     """Generated script candidates"""
@@ -143,6 +154,11 @@ class Script(Base):
     # Relationships
     project = relationship("Project", back_populates="scripts")
 
+    __table_args__ = (
+        # A project's candidates best first (repositories.list_scripts)
+        Index("ix_scripts_project_id_score", "project_id", score.desc(), "created_at"),
+    )
+
 
 class Analytics(Base):
     """Video performance analytics"""
@@ -163,11 +179,84 @@ class Analytics(Base):
     estimated_revenue = Column(Float, default=0.0)
 
     # Timestamps
+    recorded_at = Column(DateTime, default=datetime.utcnow)  # When the metrics were measured
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     project = relationship("Project", back_populates="analytics")
 
+    __table_args__ = (
+        # Latest metrics for a project
+        Index("ix_analytics_project_id_recorded_at", "project_id", "recorded_at"),
+    )
+
+
+# ==========================================
+# ANALYTICS TIME SERIES
+# ==========================================
+# Samples are appended as they are synced and never updated; rollups hold
+# their per-hour/per-day sums and are maintained on ingestion
+# (repositories.ingest_analytics_samples). No foreign keys: these tables
+# take bulk appends, and delete_project clears them explicitly.
+
+class AnalyticsSample(Base):
+    """Metrics accrued by a project's video over one sync interval (append-only)"""
+    __tablename__ = "analytics_samples"
+
+    # The partition key must be part of the primary key on PostgreSQL
+    id = Column(String, primary_key=True)
+    recorded_at = Column(DateTime, primary_key=True)  # End of the interval (UTC)
+
+    project_id = Column(String, nullable=False)
+    owner_id = Column(String, nullable=False)
+
+    # Increments since the previous sample, not running totals
+    views = Column(BigInteger, default=0)
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    watch_time_hours = Column(Float, default=0.0)
+    impressions = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)  # CTR = clicks / impressions
+    estimated_revenue = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index("ix_analytics_samples_project_id_recorded_at", "project_id", "recorded_at"),
+        # Monthly partitions, created on demand by repositories.ensure_sample_partitions
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+
+class AnalyticsRollupMixin:
+    """Sums of a project's samples per time bucket"""
+
+    project_id = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)  # Start of the hour/day (UTC)
+    owner_id = Column(String, nullable=False)
+
+    views = Column(BigInteger, default=0)
+    likes = Column(BigInteger, default=0)
+    comments = Column(BigInteger, default=0)
+    watch_time_hours = Column(Float, default=0.0)
+    impressions = Column(BigInteger, default=0)
+    clicks = Column(BigInteger, default=0)
+    estimated_revenue = Column(Float, default=0.0)
+    samples = Column(Integer, default=0)
+
+    @declared_attr
+    def __table_args__(cls):
+        # Per-owner series (summed across the owner's projects)
+        return (Index(f"ix_{cls.__tablename__}_owner_id_bucket", "owner_id", "bucket"),)
+
+
+class AnalyticsHourly(AnalyticsRollupMixin, Base):
+    """Hourly analytics rollup"""
+    __tablename__ = "analytics_hourly"
+
+
+class AnalyticsDaily(AnalyticsRollupMixin, Base):
+    """Daily analytics rollup"""
+    __tablename__ = "analytics_daily"
+
 
 class Payment(Base):
     """Payment transactions (Stripe)"""
@@ -183,7 +272,7 @@ class Payment(Base):
     # Payment info
     amount = Column(Integer, nullable=False)  # Amount in cents
     currency = Column(String, default="usd")
-    status = Column(SQLEnum(PaymentStatus), default=PaymentStatus.PENDING)
+    status = Column(SQLEnum(PaymentStatus, values_callable=_enum_values), default=PaymentStatus.PENDING)
 
     # Revenue sharing
     platform_fee = Column(Integer, default=0)  # Amount in cents
@@ -191,7 +280,8 @@ class Payment(Base):
 
     # Metadata
     description = Column(String, nullable=True)
-    metadata = Column(JSON, nullable=True)
+    # "metadata" is reserved on declarative models; the column keeps its name
+    payment_metadata = Column("metadata", JSON, nullable=True)
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -199,3 +289,8 @@ class Payment(Base):
 
     # Relationships
     user = relationship("User", back_populates="payments")
+
+    __table_args__ = (
+        # Keyset pagination of a user's transactions (see app.pagination)
+        Index("ix_payments_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
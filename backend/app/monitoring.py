@@ -7,16 +7,44 @@ Provides:
 - Custom event tracking
 - User context
 - Release tracking
+
+The Sentry backend is resolved once in init_sentry. Until then (or when
+SENTRY_DSN is unset or sentry-sdk is missing) every helper takes a no-op
+or logging fast path without importing anything.
+
+@monitor_performance also records every call in a local latency summary
+(independent of Sentry trace sampling), exported in /api/metrics and
+/api/admin/spans.
+
+Workflow and payment events are aggregated locally (see event_telemetry);
+only anomalies reach Sentry.
 """
 
 import os
+import inspect
 import logging
-from typing import Optional, Dict, Any
+from time import perf_counter_ns
+from typing import List, Optional, Dict, Any
 from functools import wraps
 
+from .event_telemetry import FAILURE_STATUSES, event_aggregator
+from .log_pipeline import SENTRY_LEVEL_ATTR, log_pipeline, record_extras
+from .metrics import hdr_quantiles, registry
+from .trace_sampling import trace_sampler_from_env
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# sentry_sdk module once init_sentry succeeded, None while monitoring is off
+_sentry = None
+
+# Every @monitor_performance call, whether or not Sentry samples it
+SPAN_DURATION = registry.summary(
+    "app_span_duration_seconds",
+    "Duration of @monitor_performance functions",
+    ("operation", "function"),
+)
+
 # ==========================================
 # SENTRY CONFIGURATION
 # ==========================================
@@ -29,6 +57,9 @@ def init_sentry(dsn: Optional[str] = None, environment: str = "development"):
         dsn: Sentry DSN (Data Source Name)
         environment: Environment name (development, staging, production)
     """
+    global _sentry
+    _sentry = None
+
     try:
         import sentry_sdk
         from sentry_sdk.integrations.fastapi import FastApiIntegration
@@ -42,11 +73,15 @@ def init_sentry(dsn: Optional[str] = None, environment: str = "development"):
             logger.warning("SENTRY_DSN not set - error monitoring disabled")
             return
 
+        # Per-route head sampling, or tail sampling of slow/errored traces
+        trace_sampler = trace_sampler_from_env(environment)
+
         sentry_sdk.init(
             dsn=dsn,
             environment=environment,
             # Performance monitoring
-            traces_sample_rate=1.0 if environment == "development" else 0.1,
+            traces_sampler=trace_sampler,
+            before_send_transaction=trace_sampler.before_send_transaction,
             # Error sampling
             sample_rate=1.0,
             # Integrations
@@ -63,6 +98,7 @@ def init_sentry(dsn: Optional[str] = None, environment: str = "development"):
             before_breadcrumb=before_breadcrumb_filter,
         )
 
+        _sentry = sentry_sdk
         logger.info(f"Sentry initialized for environment: {environment}")
 
     except ImportError:
@@ -124,10 +160,25 @@ def before_breadcrumb_filter(crumb: dict, hint: dict) -> Optional[dict]:
     return crumb
 
 
+def is_enabled() -> bool:
+    """Whether events are sent to Sentry"""
+    return _sentry is not None
+
+
 # ==========================================
 # CUSTOM EVENT TRACKING
 # ==========================================
 
+# Sentry level names to logging levels (fallback when Sentry is off)
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "fatal": logging.CRITICAL,
+}
+
+
 def capture_message(message: str, level: str = "info", **kwargs):
     """
     Capture a custom message in Sentry
@@ -137,11 +188,10 @@ def capture_message(message: str, level: str = "info", **kwargs):
         level: Log level (debug, info, warning, error, fatal)
         **kwargs: Additional context
     """
-    try:
-        import sentry_sdk
-        sentry_sdk.capture_message(message, level=level, **kwargs)
-    except ImportError:
-        logger.log(getattr(logging, level.upper(), logging.INFO), message)
+    if _sentry is None:
+        logger.log(_LOG_LEVELS.get(level, logging.INFO), message)
+        return
+    _sentry.capture_message(message, level=level, **kwargs)
 
 
 def capture_exception(exception: Exception, **kwargs):
@@ -152,11 +202,10 @@ def capture_exception(exception: Exception, **kwargs):
         exception: Exception to capture
         **kwargs: Additional context
     """
-    try:
-        import sentry_sdk
-        sentry_sdk.capture_exception(exception, **kwargs)
-    except ImportError:
+    if _sentry is None:
         logger.exception("Exception occurred", exc_info=exception)
+        return
+    _sentry.capture_exception(exception, **kwargs)
 
 
 def set_user_context(user_id: str, email: Optional[str] = None, **kwargs):
@@ -168,15 +217,13 @@ def set_user_context(user_id: str, email: Optional[str] = None, **kwargs):
         email: User email
         **kwargs: Additional user context
     """
-    try:
-        import sentry_sdk
-        sentry_sdk.set_user({
-            "id": user_id,
-            "email": email,
-            **kwargs
-        })
-    except ImportError:
-        pass
+    if _sentry is None:
+        return
+    _sentry.set_user({
+        "id": user_id,
+        "email": email,
+        **kwargs
+    })
 
 
 def set_tag(key: str, value: str):
@@ -187,11 +234,9 @@ def set_tag(key: str, value: str):
         key: Tag key
         value: Tag value
     """
-    try:
-        import sentry_sdk
-        sentry_sdk.set_tag(key, value)
-    except ImportError:
-        pass
+    if _sentry is None:
+        return
+    _sentry.set_tag(key, value)
 
 
 def set_context(name: str, context: Dict[str, Any]):
@@ -202,11 +247,9 @@ def set_context(name: str, context: Dict[str, Any]):
         name: Context name
         context: Context data dict
     """
-    try:
-        import sentry_sdk
-        sentry_sdk.set_context(name, context)
-    except ImportError:
-        pass
+    if _sentry is None:
+        return
+    _sentry.set_context(name, context)
 
 
 # ==========================================
@@ -224,11 +267,9 @@ def start_transaction(name: str, op: str = "http.server"):
     Returns:
         Transaction object or None
     """
-    try:
-        import sentry_sdk
-        return sentry_sdk.start_transaction(name=name, op=op)
-    except ImportError:
+    if _sentry is None:
         return None
+    return _sentry.start_transaction(name=name, op=op)
 
 
 def start_span(description: str, op: str = "function"):
@@ -242,11 +283,9 @@ def start_span(description: str, op: str = "function"):
     Returns:
         Span object or None
     """
-    try:
-        import sentry_sdk
-        return sentry_sdk.start_span(description=description, op=op)
-    except ImportError:
+    if _sentry is None:
         return None
+    return _sentry.start_span(description=description, op=op)
 
 
 # ==========================================
@@ -256,6 +295,8 @@ def start_span(description: str, op: str = "function"):
 def monitor_performance(operation: str = "function"):
     """
     Decorator to monitor function performance
+    Every call is timed into the local span summary; a Sentry span is
+    added as well when Sentry is on.
 
     Args:
         operation: Operation type
@@ -266,27 +307,36 @@ def monitor_performance(operation: str = "function"):
             ...
     """
     def decorator(func):
+        description = func.__name__
+        stats = SPAN_DURATION.labels(operation, func.__qualname__)
+        # Only the raw duration is appended here; the metrics flusher and
+        # snapshots bucket it (see _LatencyValue)
+        record = stats.buffer.append
+
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            span = start_span(description=func.__name__, op=operation)
-            if span:
-                with span:
+            start = perf_counter_ns()
+            try:
+                if _sentry is None:
                     return await func(*args, **kwargs)
-            else:
-                return await func(*args, **kwargs)
+                with _sentry.start_span(description=description, op=operation):
+                    return await func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            span = start_span(description=func.__name__, op=operation)
-            if span:
-                with span:
+            start = perf_counter_ns()
+            try:
+                if _sentry is None:
                     return func(*args, **kwargs)
-            else:
-                return func(*args, **kwargs)
+                with _sentry.start_span(description=description, op=operation):
+                    return func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
 
         # Return appropriate wrapper based on function type
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
+        if inspect.iscoroutinefunction(func):
             return async_wrapper
         else:
             return sync_wrapper
@@ -294,6 +344,41 @@ def monitor_performance(operation: str = "function"):
     return decorator
 
 
+def get_span_stats() -> List[Dict[str, Any]]:
+    """
+    Latency statistics for @monitor_performance functions
+
+    Aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set.
+
+    Returns:
+        One dict per (operation, function), slowest total time first
+    """
+    summary = registry.collect_all().get(SPAN_DURATION.name)
+    if not summary:
+        return []
+
+    stats = []
+    for (operation, function), value in summary["values"]:
+        count = sum(count for _, count in value["counts"])
+        if not count:
+            continue
+        p50, p90, p99 = hdr_quantiles(value["counts"], (0.5, 0.9, 0.99))
+        stats.append({
+            "operation": operation,
+            "function": function,
+            "count": count,
+            "total_ms": value["sum"] * 1000,
+            "mean_ms": value["sum"] / count * 1000,
+            "p50_ms": p50 * 1000,
+            "p90_ms": p90 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": value["max"] * 1000,
+        })
+
+    stats.sort(key=lambda stat: stat["total_ms"], reverse=True)
+    return stats
+
+
 def monitor_errors(reraise: bool = True):
     """
     Decorator to automatically capture exceptions
@@ -326,8 +411,7 @@ def monitor_errors(reraise: bool = True):
                     raise
 
         # Return appropriate wrapper
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
+        if inspect.iscoroutinefunction(func):
             return async_wrapper
         else:
             return sync_wrapper
@@ -347,26 +431,34 @@ def track_workflow_event(
     **metadata
 ):
     """
-    Track workflow events in Sentry
+    Track workflow events
+
+    Every event is counted (see event_telemetry); only failures and
+    first-seen error types are sent to Sentry, rate limited per key.
 
     Args:
         workflow_id: Temporal workflow ID
         event: Event name (started, completed, failed, etc.)
         project_id: Project ID
         status: Workflow status
-        **metadata: Additional metadata
+        **metadata: Additional metadata (error_type marks a distinct error)
     """
+    suppressed = event_aggregator.record("workflow", event, status, metadata.get("error_type"))
+    if suppressed is None or _sentry is None:
+        return
+
     set_context("workflow", {
         "workflow_id": workflow_id,
         "event": event,
         "project_id": project_id,
         "status": status,
+        "suppressed_since_last": suppressed,
         **metadata
     })
 
     capture_message(
         f"Workflow {event}: {workflow_id}",
-        level="info" if status != "failed" else "error"
+        level="error" if status in FAILURE_STATUSES else "warning"
     )
 
 
@@ -379,7 +471,10 @@ def track_payment_event(
     **metadata
 ):
     """
-    Track payment events in Sentry
+    Track payment events
+
+    Every event is counted (see event_telemetry); only failures and
+    first-seen error types are sent to Sentry, rate limited per key.
 
     Args:
         payment_id: Payment ID
@@ -387,8 +482,12 @@ def track_payment_event(
         amount: Payment amount in cents
         user_id: User ID
         status: Payment status
-        **metadata: Additional metadata
+        **metadata: Additional metadata (error_type marks a distinct error)
     """
+    suppressed = event_aggregator.record("payment", event, status, metadata.get("error_type"))
+    if suppressed is None or _sentry is None:
+        return
+
     set_context("payment", {
         "payment_id": payment_id,
         "event": event,
@@ -396,6 +495,7 @@ def track_payment_event(
         "amount_dollars": amount / 100,
         "user_id": user_id,
         "status": status,
+        "suppressed_since_last": suppressed,
         **metadata
     })
 
@@ -405,7 +505,7 @@ def track_payment_event(
 
     capture_message(
         f"Payment {event}: ${amount/100:.2f} - {status}",
-        level="info" if status == "succeeded" else "warning"
+        level="warning"
     )
 
 
@@ -416,6 +516,10 @@ def track_payment_event(
 class StructuredLogger:
     """
     Structured logger that sends to both console and Sentry
+    (console only while Sentry is off, so messages are not logged twice)
+
+    While the logging pipeline runs, warnings and errors are sent to Sentry
+    from its listener thread instead of the request path.
     """
 
     def __init__(self, name: str):
@@ -426,29 +530,48 @@ class StructuredLogger:
 
     def info(self, message: str, **context):
         self.logger.info(message, extra=context)
+        if _sentry is None or log_pipeline.running:
+            return
         set_context("log", context)
 
     def warning(self, message: str, **context):
-        self.logger.warning(message, extra=context)
-        set_context("log", context)
-        capture_message(message, level="warning")
+        self._log(logging.WARNING, "warning", message, None, context)
 
     def error(self, message: str, exception: Optional[Exception] = None, **context):
-        self.logger.error(message, extra=context, exc_info=exception)
-        set_context("log", context)
-        if exception:
-            capture_exception(exception)
-        else:
-            capture_message(message, level="error")
+        self._log(logging.ERROR, "error", message, exception, context)
 
     def critical(self, message: str, exception: Optional[Exception] = None, **context):
-        self.logger.critical(message, extra=context, exc_info=exception)
+        self._log(logging.CRITICAL, "fatal", message, exception, context)
+
+    def _log(self, level: int, sentry_level: str, message: str, exception: Optional[Exception], context: dict):
+        if _sentry is not None and log_pipeline.running:
+            # Marked for _forward_log_record on the listener thread
+            self.logger.log(level, message, extra={**context, SENTRY_LEVEL_ATTR: sentry_level}, exc_info=exception)
+            return
+
+        self.logger.log(level, message, extra=context, exc_info=exception)
+        if _sentry is None:
+            return
         set_context("log", context)
         if exception:
             capture_exception(exception)
         else:
-            capture_message(message, level="fatal")
+            capture_message(message, level=sentry_level)
+
+
+def _forward_log_record(record: logging.LogRecord) -> None:
+    """Send a StructuredLogger record to Sentry (runs on the log pipeline thread)"""
+    if _sentry is None:
+        return
+
+    contexts = {"log": record_extras(record)}
+    if record.exc_info:
+        _sentry.capture_exception(record.exc_info[1], contexts=contexts)
+    else:
+        _sentry.capture_message(record.getMessage(), level=getattr(record, SENTRY_LEVEL_ATTR), contexts=contexts)
+
 
+log_pipeline.forward = _forward_log_record
 
 # Create default logger
 app_logger = StructuredLogger("faceless-automation")
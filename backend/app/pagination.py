@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination
+
+List endpoints order rows by (created_at, id) descending. A cursor encodes
+the sort key of the last row on a page; the next page is the rows strictly
+after it, which an index on (<filter column>, created_at, id) serves with a
+single index range scan however deep the client pages, unlike OFFSET which
+reads and discards every skipped row.
+
+Cursors are opaque to clients (URL-safe base64 of JSON) and stable under
+inserts: new rows land before the first page instead of shifting later
+pages.
+
+Every keyset-paginated endpoint takes `cursor` and `limit` query
+parameters and returns a Page body: the rows under `items` and the cursor
+for the next page under `next_cursor` (null on the last page). Clients
+pass `next_cursor` back as `cursor` until it is null.
+"""
+
+from datetime import datetime
+from typing import Generic, List, Optional, Sequence, Tuple, TypeVar
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+Row = TypeVar("Row")
+Item = TypeVar("Item")
+
+# (created_at, id) of the last row already returned
+Cursor = Tuple[datetime, str]
+
+
+class Page(BaseModel, Generic[Item]):
+    """One page of a keyset-paginated list"""
+    items: List[Item]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Encode a row's sort key as an opaque cursor
+
+    Args:
+        created_at: Row creation time
+        row_id: Row primary key (tie-breaker for equal timestamps)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor from a request
+
+    Args:
+        cursor: Value of the `cursor` query parameter
+
+    Returns:
+        (created_at, id) to continue after
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, str):
+            raise ValueError("cursor id must be a string")
+        return datetime.fromisoformat(created_at), row_id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(rows: Sequence[Row], limit: int) -> Tuple[List[Row], Optional[str]]:
+    """
+    Split a `limit + 1` fetch into a page and the cursor for the next one
+
+    Args:
+        rows: Rows fetched with limit + 1, in (created_at, id) descending order
+        limit: Page size
+
+    Returns:
+        (page, next_cursor), next_cursor is None on the last page
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,200 @@
+"""
+On-demand statistical CPU profiler
+
+A background thread samples every thread's stack via sys._current_frames()
+at a fixed interval and aggregates them into collapsed stacks
+("frame;frame;frame count"), the input format of flamegraph.pl and
+speedscope.
+
+Stacks on the event loop thread that handle a request MetricsMiddleware
+is tracking are rooted at the request's route ("GET
+/api/projects/{project_id}"), so time is attributed per route. The
+request is found by its ASGI scope, which every layer passes down, so
+handlers that run in a separate task (BaseHTTPMiddleware's call_next) are
+attributed too. Other threads are rooted at "thread:<name>".
+
+Overhead is bounded by the sampling interval (the sampler sleeps between
+samples and reports the share of wall time it spent sampling), a maximum
+duration, a maximum stack depth, and a single session at a time.
+"""
+
+from collections import Counter
+from typing import Dict, Optional
+import os
+import sys
+import threading
+import time
+
+from .metrics import active_requests
+
+MAX_DURATION = 60.0
+MIN_INTERVAL = 0.005
+MAX_DEPTH = 64
+
+# Innermost frames that mean a thread is waiting, not using CPU
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# Held for the duration of a profiling session
+_session_lock = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profiling session is already running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _request_scope(frame) -> Optional[dict]:
+    """Scope of the in-flight request a frame is handling, if any"""
+    if "scope" not in frame.f_code.co_varnames:
+        return None
+    scope = frame.f_locals.get("scope")
+    if scope is None or active_requests.get(id(scope)) is not scope:
+        return None
+    return scope
+
+
+def _route_label(scope: dict) -> str:
+    """Route of a request ("METHOD /template", or the raw path before routing)"""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "?")
+    return f"{scope.get('method', '?')} {path}"
+
+
+def collapse_stack(frame, thread_name: str, max_depth: int = MAX_DEPTH) -> Optional[str]:
+    """
+    Collapse one thread's stack
+
+    Args:
+        frame: Innermost frame
+        thread_name: Root label for unattributed stacks
+        max_depth: Frames kept (innermost)
+
+    Returns:
+        "root;outer;...;inner", or None if the thread is idle
+    """
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+        return None
+
+    # Cut the stack at the outermost frame of a tracked request
+    labels = []
+    kept = 0
+    root = f"thread:{thread_name}"
+    while frame is not None:
+        if len(labels) < max_depth:
+            labels.append(_frame_label(frame))
+        scope = _request_scope(frame)
+        if scope is not None:
+            root = _route_label(scope)
+            kept = len(labels)
+        frame = frame.f_back
+
+    if kept:
+        labels = labels[:kept]
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples all thread stacks until a duration elapses"""
+
+    def __init__(self, interval: float = 0.01, max_depth: int = MAX_DEPTH):
+        """
+        Args:
+            interval: Seconds between samples
+            max_depth: Frames kept per stack
+        """
+        self.interval = max(MIN_INTERVAL, interval)
+        self.max_depth = max_depth
+
+    def run(self, duration: float) -> dict:
+        """
+        Sample for a duration (blocks the calling thread)
+
+        Args:
+            duration: Seconds to sample (capped at MAX_DURATION)
+
+        Returns:
+            Dict with stacks (collapsed stack -> samples), samples, duration
+            and overhead (share of wall time spent sampling)
+        """
+        duration = min(duration, MAX_DURATION)
+        own_ident = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        sampling_time = 0.0
+
+        start = time.perf_counter()
+        deadline = start + duration
+        while True:
+            tick = time.perf_counter()
+            if tick >= deadline:
+                break
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = collapse_stack(frame, names.get(ident, str(ident)), self.max_depth)
+                if stack is not None:
+                    stacks[stack] += 1
+            frame = None    # Don't keep other threads' frames alive while sleeping
+            samples += 1
+
+            elapsed = time.perf_counter() - tick
+            sampling_time += elapsed
+            time.sleep(max(0.0, self.interval - elapsed))
+
+        wall = time.perf_counter() - start
+        return {
+            "stacks": dict(stacks),
+            "samples": samples,
+            "interval_ms": self.interval * 1000,
+            "duration_seconds": round(wall, 3),
+            "overhead": round(sampling_time / wall, 4) if wall else 0.0,
+        }
+
+
+def profile(duration: float, interval: float = 0.01) -> dict:
+    """
+    Run one profiling session
+
+    Args:
+        duration: Seconds to sample
+        interval: Seconds between samples
+
+    Returns:
+        StackSampler.run result
+
+    Raises:
+        ProfilerBusyError: If another session is running
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profiling session is already running")
+    try:
+        return StackSampler(interval).run(duration)
+    finally:
+        _session_lock.release()
+
+
+def render_collapsed(stacks: Dict[str, int]) -> str:
+    """Collapsed stack text, heaviest first"""
+    lines = [f"{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda item: -item[1])]
+    return "\n".join(lines) + "\n"
+
+
+def route_totals(stacks: Dict[str, int]) -> Dict[str, int]:
+    """Samples per root (route or thread), heaviest first"""
+    totals: Counter = Counter()
+    for stack, count in stacks.items():
+        totals[stack.split(";", 1)[0]] += count
+    return dict(totals.most_common())
@@ -0,0 +1,283 @@
+"""
+Rate limit rule engine
+
+Compiles RATE_LIMITS into a method + path-template trie so that:
+- Parameterised routes get their own limits
+  ("POST /api/workflows/{workflow_id}/approve-script")
+- Prefix rules apply to whole subtrees ("* /api/payments/*")
+- Several limits stack on one request (per-user, per-route, global)
+- Lookup cost does not grow with the number of rules
+
+Rule keys:
+- Role names ("anonymous", "authenticated", "admin"): per-user default limits
+- "<METHOD> <path>": route limits. METHOD may be "*". Path segments may be
+  literals, "{param}" (any single segment) or a trailing "*" (any suffix)
+
+Rule options:
+- requests: Maximum requests allowed in window
+- window: Time window in seconds
+- scope: "user" (default, counted per user/IP) or "global" (one shared budget)
+- weighted: if true, each request consumes its cost (e.g. video minutes)
+  instead of 1
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ==========================================
+# RULES
+# ==========================================
+
+class RateLimitRule:
+    """A single compiled limit"""
+
+    __slots__ = ("key", "requests", "window", "scope", "weighted", "_prefix")
+
+    def __init__(
+        self,
+        key: str,
+        requests: int,
+        window: int,
+        scope: str = "user",
+        weighted: bool = False,
+        is_role: bool = False,
+    ):
+        if scope not in ("user", "global"):
+            raise ValueError(f"Invalid rate limit scope for {key!r}: {scope}")
+
+        self.key = key
+        self.requests = int(requests)
+        self.window = int(window)
+        self.scope = scope
+        self.weighted = bool(weighted)
+
+        # Role rules keep the bare identifier so existing counters carry over
+        if scope == "global":
+            self._prefix = f"global:{key}"
+        elif is_role:
+            self._prefix = None
+        else:
+            self._prefix = key
+
+    def cost_for(self, cost: int) -> int:
+        """Budget units a request of the given cost consumes under this rule"""
+        return cost if self.weighted else 1
+
+    def identifier_for(self, identifier: str) -> str:
+        """Counter key for this rule and a user/IP identifier"""
+        if self.scope == "global":
+            return self._prefix
+        if self._prefix is None:
+            return identifier
+        return f"{identifier}|{self._prefix}"
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimitRule({self.key!r}, requests={self.requests}, window={self.window}, "
+            f"scope={self.scope!r}, weighted={self.weighted})"
+        )
+
+
+class _Node:
+    """Path trie node"""
+
+    __slots__ = ("children", "param", "wildcard", "rules")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.wildcard: List[Any] = []
+        self.rules: List[Any] = []
+
+
+def _segments(path: str) -> List[str]:
+    """Split a path into segments, ignoring leading/trailing slashes"""
+    return [segment for segment in path.split("/") if segment]
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+# ==========================================
+# ROUTE TRIE
+# ==========================================
+
+class RouteTrie:
+    """
+    Rules keyed by "<METHOD> <path>", matched against requests
+
+    Shared by rate limiting and trace sampling so both read rule keys the
+    same way. Matches are returned most specific first: the request's
+    method before "*", then literal segments before "{param}" (left to
+    right), then exact paths before the trailing "*" prefixes containing
+    them.
+
+    Match results are memoised per (method, route template); the number of
+    templates is bounded by the app's routes, so the cache stays small.
+    Raw (unrouted) paths are matched against the trie without caching.
+    """
+
+    def __init__(self, kind: str = "route", order: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            kind: Rule kind named in error messages ("rate limit", ...)
+            order: Sort key applied to matches (stable, so specificity order
+                is kept among equal keys)
+        """
+        self.kind = kind
+        self.order = order
+        self.methods: Dict[str, _Node] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
+
+    def add(self, key: str, rule: Any) -> None:
+        """
+        Add a rule
+
+        Args:
+            key: "<METHOD> <path>"
+            rule: Value returned by match()
+
+        Raises:
+            ValueError: If the key has no path or "*" is not its last segment
+        """
+        method, _, path = key.partition(" ")
+        if not path:
+            raise ValueError(f"{self.kind.capitalize()} rule must be '<METHOD> <path>': {key!r}")
+
+        node = self.methods.setdefault(method.upper(), _Node())
+        segments = _segments(path)
+
+        for index, segment in enumerate(segments):
+            if segment == "*":
+                if index != len(segments) - 1:
+                    raise ValueError(f"'*' must be the last path segment in {self.kind} rule {key!r}")
+                node.wildcard.append(rule)
+                break
+            if _is_param(segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, _Node())
+        else:
+            node.rules.append(rule)
+
+        self._cache.clear()
+
+    def match(self, method: str, path: str, template: bool = False) -> Tuple[Any, ...]:
+        """
+        Find all rules that apply to a request
+
+        Args:
+            method: HTTP method
+            path: Route template (e.g. "/api/projects/{project_id}") or raw path
+            template: Whether path is a route template (enables caching)
+
+        Returns:
+            Matching rules, most specific first (then sorted by order)
+        """
+        if template:
+            cache_key = (method, path)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        segments = _segments(path)
+        matched: List[Any] = []
+        for method_key in (method, "*"):
+            root = self.methods.get(method_key)
+            if root is not None:
+                self._collect(root, segments, 0, template, matched)
+
+        result = tuple(sorted(matched, key=self.order) if self.order else matched)
+        if template:
+            self._cache[cache_key] = result
+        return result
+
+    def _collect(
+        self,
+        node: _Node,
+        segments: List[str],
+        index: int,
+        template: bool,
+        matched: List[Any],
+    ) -> None:
+        """Depth-first walk; exact matches are appended before wildcard ones"""
+        if index == len(segments):
+            matched.extend(node.rules)
+        else:
+            segment = segments[index]
+            # A template's "{param}" segment only matches "{param}" rules
+            if not (template and _is_param(segment)):
+                child = node.children.get(segment)
+                if child is not None:
+                    self._collect(child, segments, index + 1, template, matched)
+            if node.param is not None:
+                self._collect(node.param, segments, index + 1, template, matched)
+
+        matched.extend(node.wildcard)
+
+
+# ==========================================
+# RULE SET
+# ==========================================
+
+class RuleSet:
+    """Immutable compiled view of a RATE_LIMITS mapping"""
+
+    def __init__(self, rules: Dict[str, dict]):
+        self.roles: Dict[str, RateLimitRule] = {}
+        # Global budgets are checked first
+        self.routes = RouteTrie("rate limit", order=lambda rule: rule.scope != "global")
+        self.size = 0
+
+        for key, config in rules.items():
+            self._add(key, config)
+
+    def _add(self, key: str, config: dict) -> None:
+        scope = config.get("scope", "user")
+        weighted = config.get("weighted", False)
+
+        if " " not in key:
+            self.roles[key] = RateLimitRule(key, config["requests"], config["window"], scope, weighted, is_role=True)
+        else:
+            self.routes.add(key, RateLimitRule(key, config["requests"], config["window"], scope, weighted))
+        self.size += 1
+
+    def for_role(self, role: str) -> RateLimitRule:
+        """Per-user default limit for a role"""
+        return self.roles.get(role) or self.roles["anonymous"]
+
+    def match(self, method: str, path: str, template: bool = False) -> Tuple[RateLimitRule, ...]:
+        """
+        Find all route rules that apply to a request
+
+        Args:
+            method: HTTP method
+            path: Route template (e.g. "/api/projects/{project_id}") or raw path
+            template: Whether path is a route template (enables caching)
+
+        Returns:
+            Matching rules: global-scope first, then most specific first
+        """
+        return self.routes.match(method, path, template)
+
+
+def load_rules_file(path: str) -> Dict[str, dict]:
+    """
+    Load rate limit rules from a JSON file
+
+    Args:
+        path: Path to a JSON object in RATE_LIMITS format
+
+    Returns:
+        Rules dict
+    """
+    with open(path, "r") as f:
+        rules = json.load(f)
+
+    if not isinstance(rules, dict):
+        raise ValueError(f"Rate limit rules file must contain a JSON object: {path}")
+
+    return rules
@@ -11,9 +11,21 @@ Implements:
 
 from fastapi import Request, HTTPException, status
 from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set, Tuple
+import asyncio
+import inspect
+import logging
+import math
 import time
+import os
+import uuid
+
+from .metrics import registry
+from .rate_limit_rules import RuleSet, load_rules_file
+
+# Setup logger
+logger = logging.getLogger(__name__)
 
 # ==========================================
 # CONFIGURATION
@@ -42,8 +54,9 @@ RATE_LIMITS = {
         "window": 3600,  # 10 projects per hour
     },
     "POST /api/workflows/start": {
-        "requests": 20,
-        "window": 3600,  # 20 workflow starts per hour
+        "requests": 120,
+        "window": 3600,  # 120 minutes of video per hour
+        "weighted": True,  # cost = target_duration in started minutes
     },
     "POST /api/payments/charge": {
         "requests": 50,
@@ -51,21 +64,115 @@ RATE_LIMITS = {
     },
 }
 
+# Optional JSON file with extra/overriding rules (same format as RATE_LIMITS).
+# It is re-read when modified, checked at most once per interval.
+RATE_LIMIT_RULES_FILE = os.getenv("RATE_LIMIT_RULES_FILE")
+RATE_LIMIT_RULES_CHECK_INTERVAL = float(os.getenv("RATE_LIMIT_RULES_CHECK_INTERVAL", "5"))
+
+# Compiled rules (see app/rate_limit_rules.py)
+rate_limit_rules = RuleSet(RATE_LIMITS)
+_rules_file_mtime: Optional[float] = None
+_rules_checked_at = 0.0
+
+
+def reload_rate_limits(rules: Optional[dict] = None) -> RuleSet:
+    """
+    Recompile rate limit rules without restarting
+
+    Args:
+        rules: Rules in RATE_LIMITS format (defaults to RATE_LIMITS plus
+            RATE_LIMIT_RULES_FILE if configured)
+
+    Returns:
+        The new rule set
+    """
+    global rate_limit_rules
+
+    if rules is None:
+        rules = dict(RATE_LIMITS)
+        if RATE_LIMIT_RULES_FILE:
+            rules.update(load_rules_file(RATE_LIMIT_RULES_FILE))
+
+    # Compile fully before swapping so requests never see a partial rule set
+    rate_limit_rules = RuleSet(rules)
+    return rate_limit_rules
+
+
+def get_rate_limit_rules() -> RuleSet:
+    """Current rule set, reloading RATE_LIMIT_RULES_FILE if it changed"""
+    global _rules_file_mtime, _rules_checked_at
+
+    if RATE_LIMIT_RULES_FILE:
+        now = time.monotonic()
+        if now - _rules_checked_at >= RATE_LIMIT_RULES_CHECK_INTERVAL:
+            _rules_checked_at = now
+            try:
+                mtime = os.stat(RATE_LIMIT_RULES_FILE).st_mtime
+                if mtime != _rules_file_mtime:
+                    reload_rate_limits()
+                    _rules_file_mtime = mtime
+                    logger.info(f"Rate limit rules loaded from {RATE_LIMIT_RULES_FILE}")
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving with the previous rules
+                logger.error(f"Failed to reload rate limit rules: {e}")
+
+    return rate_limit_rules
+
 # ==========================================
 # IN-MEMORY RATE LIMITER (Development)
 # ==========================================
 
+class _WindowState:
+    """
+    Per-identifier sliding window counter state
+
+    Requests are counted in a fixed ring of buckets covering one window,
+    so memory and per-call work do not grow with the request limit.
+    """
+
+    __slots__ = ("counts", "total", "head", "first", "last_seen")
+
+    def __init__(self, buckets: int, head: int):
+        self.counts = [0] * buckets
+        self.total = 0
+        self.head = head        # Absolute index of the most recent bucket
+        self.first = None       # Absolute index of the oldest non-empty bucket
+        self.last_seen = 0.0
+
+
 class InMemoryRateLimiter:
     """
-    Simple in-memory rate limiter using sliding window
+    In-memory rate limiter using bucketed sliding window counters
     NOT suitable for distributed systems (production should use Redis)
+
+    Each window is split into `buckets_per_window` buckets, so a check costs
+    O(1) amortized regardless of the limit. Idle identifiers are evicted
+    once their window has passed, and the least recently used identifier is
+    evicted when `max_identifiers` is reached.
     """
 
-    def __init__(self):
-        # {identifier: [(timestamp, count), ...]}
-        self.requests: Dict[str, list[Tuple[float, int]]] = defaultdict(list)
+    def __init__(
+        self,
+        buckets_per_window: int = 60,
+        max_identifiers: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            buckets_per_window: Window resolution (higher = more precise reset times)
+            max_identifiers: Maximum number of tracked identifiers (memory cap)
+            clock: Time source, overridable for tests
+        """
+        self.buckets_per_window = buckets_per_window
+        self.max_identifiers = max_identifiers
+        self.clock = clock
+        # {(identifier, window): _WindowState}, ordered least -> most recently used
+        self.requests: "OrderedDict[Tuple[str, int], _WindowState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.requests)
 
-    def is_allowed(self, identifier: str, limit: int, window: int) -> Tuple[bool, dict]:
+    def is_allowed(self, identifier: str, limit: int, window: int, cost: int = 1) -> Tuple[bool, dict]:
         """
         Check if request is allowed
 
@@ -73,33 +180,47 @@ class InMemoryRateLimiter:
             identifier: Unique identifier (user ID or IP)
             limit: Maximum requests allowed in window
             window: Time window in seconds
+            cost: Budget units this request consumes
 
         Returns:
             (is_allowed, rate_limit_info)
         """
-        current_time = time.time()
-        window_start = current_time - window
+        current_time = self.clock()
+        buckets = self.buckets_per_window
+        bucket_width = window / buckets
+        now_bucket = int(current_time // bucket_width)
 
-        # Clean old requests
-        self.requests[identifier] = [
-            (ts, count) for ts, count in self.requests[identifier]
-            if ts > window_start
-        ]
+        self._evict_idle(current_time)
+
+        key = (identifier, window)
+        state = self.requests.get(key)
+        if state is None:
+            state = _WindowState(buckets, now_bucket)
+            self.requests[key] = state
+            if len(self.requests) > self.max_identifiers:
+                self.requests.popitem(last=False)
+        else:
+            self.requests.move_to_end(key)
+            self._advance(state, now_bucket)
+
+        state.last_seen = current_time
 
         # Count total requests in current window
-        total_requests = sum(count for _, count in self.requests[identifier])
+        total_requests = state.total
 
         # Check if limit exceeded
-        is_allowed = total_requests < limit
+        is_allowed = total_requests + cost <= limit
 
         # Add current request if allowed
         if is_allowed:
-            self.requests[identifier].append((current_time, 1))
+            state.counts[state.head % buckets] += cost
+            state.total += cost
+            if state.first is None:
+                state.first = state.head
 
         # Calculate time until reset
-        if self.requests[identifier]:
-            oldest_request = min(ts for ts, _ in self.requests[identifier])
-            reset_time = oldest_request + window
+        if state.first is not None:
+            reset_time = state.first * bucket_width + window
             retry_after = max(0, int(reset_time - current_time))
         else:
             reset_time = current_time + window
@@ -107,16 +228,88 @@ class InMemoryRateLimiter:
 
         rate_limit_info = {
             "limit": limit,
-            "remaining": max(0, limit - total_requests - 1),
+            "remaining": max(0, limit - total_requests - (cost if is_allowed else 0)),
             "reset": int(reset_time),
             "retry_after": retry_after if not is_allowed else None,
         }
 
         return is_allowed, rate_limit_info
 
+    def refund(self, identifier: str, window: int, cost: int = 1) -> None:
+        """
+        Give back budget an allowed request consumed (newest buckets first)
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            window: Time window in seconds
+            cost: Budget units to return
+        """
+        state = self.requests.get((identifier, window))
+        if state is None:
+            return
+
+        buckets = self.buckets_per_window
+        bucket = state.head
+        while cost > 0 and state.first is not None and bucket >= state.first:
+            index = bucket % buckets
+            taken = min(cost, state.counts[index])
+            state.counts[index] -= taken
+            state.total -= taken
+            cost -= taken
+            bucket -= 1
+        if state.total == 0:
+            state.first = None
+
+    def _advance(self, state: _WindowState, now_bucket: int) -> None:
+        """Expire buckets that have slid out of the window"""
+        buckets = self.buckets_per_window
+        elapsed = now_bucket - state.head
+        if elapsed <= 0:
+            return
+
+        if elapsed >= buckets:
+            state.counts = [0] * buckets
+            state.total = 0
+            state.first = None
+        else:
+            counts = state.counts
+            for bucket in range(state.head + 1, now_bucket + 1):
+                index = bucket % buckets
+                state.total -= counts[index]
+                counts[index] = 0
+
+            # Move the oldest pointer forward past expired/empty buckets
+            if state.first is not None and state.first <= now_bucket - buckets:
+                state.first = None
+                for bucket in range(now_bucket - buckets + 1, now_bucket + 1):
+                    if counts[bucket % buckets]:
+                        state.first = bucket
+                        break
+
+        state.head = now_bucket
+
+    def _evict_idle(self, current_time: float) -> None:
+        """Drop least recently used identifiers whose window has fully passed"""
+        for _ in range(2):
+            if not self.requests:
+                return
+            (_, window), state = next(iter(self.requests.items()))
+            if state.last_seen + window > current_time:
+                return
+            self.requests.popitem(last=False)
+
+
+# Rejections by rule key (role name, route rule or "concurrency:<resource>")
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "app_rate_limit_rejections_total",
+    "Requests rejected by rate or concurrency limits",
+    ("rule",),
+)
 
 # Global rate limiter instance
-rate_limiter = InMemoryRateLimiter()
+rate_limiter = InMemoryRateLimiter(
+    max_identifiers=int(os.getenv("RATE_LIMIT_MAX_IDENTIFIERS", "100000"))
+)
 
 
 # ==========================================
@@ -126,7 +319,8 @@ rate_limiter = InMemoryRateLimiter()
 async def check_rate_limit(
     request: Request,
     user_id: str = None,
-    user_role: str = "anonymous"
+    user_role: str = "anonymous",
+    cost: int = 1
 ) -> dict:
     """
     Check if request should be rate-limited
@@ -135,6 +329,7 @@ async def check_rate_limit(
         request: FastAPI request object
         user_id: User ID if authenticated
         user_role: User role (anonymous, authenticated, admin)
+        cost: Request cost, consumed by rules marked "weighted"
 
     Returns:
         Rate limit info dict
@@ -152,25 +347,60 @@ async def check_rate_limit(
         identifier = f"ip:{client_ip}"
         role = "anonymous"
 
-    # Get endpoint-specific rate limit if exists
-    endpoint_key = f"{request.method} {request.url.path}"
-    if endpoint_key in RATE_LIMITS:
-        limit_config = RATE_LIMITS[endpoint_key]
+    rules = get_rate_limit_rules()
+    if user_id and role not in rules.roles:
+        # App roles (client, viewer) share the generic authenticated limit
+        role = "authenticated"
+
+    # Match on the route template once routing has happened (dependencies),
+    # otherwise on the raw path (middleware)
+    route = request.scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        route_rules = rules.match(request.method, route.path, template=True)
     else:
-        # Use role-based rate limit
-        limit_config = RATE_LIMITS.get(role, RATE_LIMITS["anonymous"])
+        route_rules = rules.match(request.method, request.url.path)
+
+    # Global and per-route limits stack on top of the role-based limit;
+    # stop at the first one exceeded so later budgets are not spent
+    rate_limit_info = None
+    consumed = []
+    for rule in (*route_rules, rules.for_role(role)):
+        # Check rate limit (async backends are awaited, sync ones return directly)
+        result = rate_limiter.is_allowed(
+            identifier=rule.identifier_for(identifier),
+            limit=rule.requests,
+            window=rule.window,
+            cost=rule.cost_for(cost)
+        )
+        if inspect.isawaitable(result):
+            result = await result
+        is_allowed, info = result
 
-    # Check rate limit
-    is_allowed, rate_limit_info = rate_limiter.is_allowed(
-        identifier=identifier,
-        limit=limit_config["requests"],
-        window=limit_config["window"]
-    )
+        # Report the most restrictive limit in headers
+        if rate_limit_info is None or not is_allowed or info["remaining"] < rate_limit_info["remaining"]:
+            rate_limit_info = info
+        if not is_allowed:
+            break
+        consumed.append(rule)
 
     # Add rate limit headers to response
     request.state.rate_limit_info = rate_limit_info
 
     if not is_allowed:
+        # A rejected request must not spend the budgets checked before it
+        for charged in consumed:
+            try:
+                refunded = rate_limiter.refund(
+                    identifier=charged.identifier_for(identifier),
+                    window=charged.window,
+                    cost=charged.cost_for(cost)
+                )
+                if inspect.isawaitable(refunded):
+                    await refunded
+            except Exception as e:
+                logger.warning(f"Failed to refund rate limit {charged.key}: {e}")
+
+        RATE_LIMIT_REJECTIONS.labels(rule.key).inc()
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
@@ -214,26 +444,211 @@ async def rate_limit_middleware(request: Request, call_next):
 # REDIS RATE LIMITER (Production)
 # ==========================================
 
+# Redis layout per identifier:
+#   rate_limit:<id>        sorted set, score = timestamp, member = "<unique>:<weight>"
+#   rate_limit:<id>:total  sum of weights currently in the window
+# Weighted members let one entry stand for a whole block of leased tokens.
+
+# Shared prelude: expire old entries and load the window total.
+# KEYS[1] = sorted set, KEYS[2] = total
+# ARGV[1..3] = now, window, limit
+_SCRIPT_PRELUDE = """
+local key = KEYS[1]
+local total_key = KEYS[2]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+-- The total only means something while the sorted set exists
+local count = 0
+if redis.call('EXISTS', key) == 1 then
+    count = tonumber(redis.call('GET', total_key) or '0')
+else
+    redis.call('DEL', total_key)
+end
+
+local expired = redis.call('ZRANGEBYSCORE', key, '-inf', now - window)
+if #expired > 0 then
+    for _, member in ipairs(expired) do
+        count = count - tonumber(string.match(member, ':(%d+)$'))
+    end
+    if count < 0 then count = 0 end
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('EXISTS', key) == 1 then
+        -- KEEPTTL: a plain SET would leave the total without an expiry
+        redis.call('SET', total_key, count, 'KEEPTTL')
+    else
+        count = 0
+        redis.call('DEL', total_key)
+    end
+end
+"""
+
+# Shared epilogue: record `granted` tokens and reply.
+# Returns {granted, count before this request, oldest timestamp or ""}
+_SCRIPT_EPILOGUE = """
+if granted > 0 then
+    redis.call('ZADD', key, now, ARGV[4] .. ':' .. granted)
+    redis.call('INCRBY', total_key, granted)
+    redis.call('EXPIRE', key, math.ceil(window))
+    redis.call('EXPIRE', total_key, math.ceil(window))
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {granted, count, oldest[2] or ''}
+"""
+
+# Sliding window decision in a single atomic round trip.
+# ARGV[4..5] = member, cost
+SLIDING_WINDOW_SCRIPT = _SCRIPT_PRELUDE + """
+local cost = tonumber(ARGV[5])
+local granted = 0
+if count + cost <= limit then
+    granted = cost
+end
+""" + _SCRIPT_EPILOGUE
+
+# Reserve a block of tokens for a local lease: `fraction` of what is left
+# in the window, at least 1 and at most `max_lease`.
+# ARGV[4..6] = member, fraction, max_lease
+LEASE_SCRIPT = _SCRIPT_PRELUDE + """
+local available = limit - count
+local granted = 0
+if available > 0 then
+    granted = math.floor(available * tonumber(ARGV[5]))
+    granted = math.max(1, math.min(granted, tonumber(ARGV[6]), available))
+end
+""" + _SCRIPT_EPILOGUE
+
+# Give back unused tokens from a lease entry.
+# ARGV[1..2] = full member ("<unique>:<weight>"), unused tokens
+RELEASE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return 0
+end
+
+local base, weight = string.match(ARGV[1], '^(.*):(%d+)$')
+local unused = math.min(tonumber(ARGV[2]), tonumber(weight))
+redis.call('ZREM', KEYS[1], ARGV[1])
+if tonumber(weight) > unused then
+    redis.call('ZADD', KEYS[1], score, base .. ':' .. (tonumber(weight) - unused))
+end
+
+-- DECRBY on a missing total would create it without an expiry
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    local total = tonumber(redis.call('DECRBY', KEYS[2], unused))
+    if total < 0 then
+        redis.call('SET', KEYS[2], 0, 'KEEPTTL')
+    end
+end
+return unused
+"""
+
+
+# Take back tokens from the newest entries (a rejected request's refund).
+# ARGV[1] = tokens
+REFUND_SCRIPT = """
+local remaining = tonumber(ARGV[1])
+local refunded = 0
+while remaining > 0 do
+    local newest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+    if #newest == 0 then
+        break
+    end
+    local base, weight = string.match(newest[1], '^(.*):(%d+)$')
+    weight = tonumber(weight)
+    local taken = math.min(remaining, weight)
+    redis.call('ZREM', KEYS[1], newest[1])
+    if weight > taken then
+        redis.call('ZADD', KEYS[1], newest[2], base .. ':' .. (weight - taken))
+    end
+    remaining = remaining - taken
+    refunded = refunded + taken
+end
+
+-- DECRBY on a missing total would create it without an expiry
+if refunded > 0 and redis.call('EXISTS', KEYS[2]) == 1 then
+    local total = tonumber(redis.call('DECRBY', KEYS[2], refunded))
+    if total < 0 then
+        redis.call('SET', KEYS[2], 0, 'KEEPTTL')
+    end
+end
+return refunded
+"""
+
+
+def _redis_keys(identifier: str) -> list:
+    """Sorted set and total keys for an identifier"""
+    key = f"rate_limit:{identifier}"
+    return [key, f"{key}:total"]
+
+
+def _redis_member(current_time: float) -> str:
+    """Unique member so concurrent requests with equal timestamps all count"""
+    return f"{current_time}:{uuid.uuid4().hex}"
+
+
+def _build_redis_info(
+    allowed: int,
+    request_count: int,
+    oldest: str,
+    limit: int,
+    window: int,
+    current_time: float,
+    cost: int = 1,
+) -> Tuple[bool, dict]:
+    """Convert a SLIDING_WINDOW_SCRIPT reply into (is_allowed, rate_limit_info)"""
+    is_allowed = bool(allowed)
+
+    if oldest:
+        reset_time = float(oldest) + window
+        retry_after = max(0, int(reset_time - current_time))
+    else:
+        reset_time = current_time + window
+        retry_after = 0
+
+    rate_limit_info = {
+        "limit": limit,
+        "remaining": max(0, limit - request_count - (cost if is_allowed else 0)),
+        "reset": int(reset_time),
+        "retry_after": retry_after if not is_allowed else None,
+    }
+
+    return is_allowed, rate_limit_info
+
+
 class RedisRateLimiter:
     """
     Redis-based distributed rate limiter
     Use in production for multi-instance deployments
+
+    The whole check runs as one server-side Lua script (EVALSHA), so each
+    request costs a single round trip and concurrent API instances cannot
+    race between counting and recording a request. The script SHA is cached
+    by redis-py and reloaded automatically on NOSCRIPT.
     """
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", client=None):
         """
         Initialize Redis connection
 
         Args:
             redis_url: Redis connection URL
+            client: Existing Redis client (overrides redis_url)
         """
-        try:
-            import redis
-            self.redis = redis.from_url(redis_url, decode_responses=True)
-        except ImportError:
-            raise ImportError("redis package not installed. Run: pip install redis")
+        if client is None:
+            try:
+                import redis
+                client = redis.from_url(redis_url, decode_responses=True)
+            except ImportError:
+                raise ImportError("redis package not installed. Run: pip install redis")
+
+        self.redis = client
+        self.script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self.refund_script = self.redis.register_script(REFUND_SCRIPT)
 
-    def is_allowed(self, identifier: str, limit: int, window: int) -> Tuple[bool, dict]:
+    def is_allowed(self, identifier: str, limit: int, window: int, cost: int = 1) -> Tuple[bool, dict]:
         """
         Check if request is allowed using Redis
 
@@ -241,47 +656,628 @@ class RedisRateLimiter:
             identifier: Unique identifier (user ID or IP)
             limit: Maximum requests allowed in window
             window: Time window in seconds
+            cost: Budget units this request consumes
 
         Returns:
             (is_allowed, rate_limit_info)
         """
-        key = f"rate_limit:{identifier}"
         current_time = time.time()
 
-        # Use Redis sorted set with timestamp scores
-        # Remove old entries
-        self.redis.zremrangebyscore(key, 0, current_time - window)
+        allowed, request_count, oldest = self.script(
+            keys=_redis_keys(identifier),
+            args=[current_time, window, limit, _redis_member(current_time), cost],
+        )
 
-        # Count current requests
-        request_count = self.redis.zcard(key)
+        return _build_redis_info(allowed, int(request_count), oldest, limit, window, current_time, cost)
 
-        # Check if limit exceeded
-        is_allowed = request_count < limit
+    def refund(self, identifier: str, window: int, cost: int = 1) -> None:
+        """
+        Give back budget an allowed request consumed (newest entries first)
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            window: Time window in seconds
+            cost: Budget units to return
+        """
+        self.refund_script(keys=_redis_keys(identifier), args=[cost])
+
+
+class AsyncRedisRateLimiter:
+    """
+    Non-blocking Redis rate limiter built on redis.asyncio
+    Same atomic script as RedisRateLimiter, but awaits the round trip so
+    the event loop keeps serving other requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        max_connections: int = 50,
+        pool_timeout: float = 5.0,
+        client=None,
+    ):
+        """
+        Initialize the shared connection pool
+
+        Args:
+            redis_url: Redis connection URL
+            max_connections: Connection pool size shared by all requests
+            pool_timeout: Seconds to wait for a free connection
+            client: Existing redis.asyncio client (overrides redis_url)
+        """
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                raise ImportError("redis package not installed. Run: pip install redis")
+
+            pool = aioredis.BlockingConnectionPool.from_url(
+                redis_url,
+                max_connections=max_connections,
+                timeout=pool_timeout,
+                decode_responses=True,
+            )
+            client = aioredis.Redis(connection_pool=pool)
+
+        self.redis = client
+        self.script = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self.refund_script = self.redis.register_script(REFUND_SCRIPT)
+
+    async def is_allowed(self, identifier: str, limit: int, window: int, cost: int = 1) -> Tuple[bool, dict]:
+        """
+        Check if request is allowed using Redis
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            limit: Maximum requests allowed in window
+            window: Time window in seconds
+            cost: Budget units this request consumes
+
+        Returns:
+            (is_allowed, rate_limit_info)
+        """
+        current_time = time.time()
+
+        allowed, request_count, oldest = await self.script(
+            keys=_redis_keys(identifier),
+            args=[current_time, window, limit, _redis_member(current_time), cost],
+        )
+
+        return _build_redis_info(allowed, int(request_count), oldest, limit, window, current_time, cost)
+
+    async def refund(self, identifier: str, window: int, cost: int = 1) -> None:
+        """
+        Give back budget an allowed request consumed (newest entries first)
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            window: Time window in seconds
+            cost: Budget units to return
+        """
+        await self.refund_script(keys=_redis_keys(identifier), args=[cost])
+
+    async def close(self):
+        """Close the client and disconnect all pooled connections"""
+        await self.redis.aclose()
+        await self.redis.connection_pool.disconnect()
+
+
+# ==========================================
+# LEASED RATE LIMITER (Production, high volume)
+# ==========================================
+
+class _Lease:
+    """A block of tokens reserved in Redis and spent locally"""
+
+    __slots__ = ("member", "granted", "tokens", "shared_remaining", "reset", "expires_at")
+
+    def __init__(self, member: str, granted: int, shared_remaining: int, reset: float, expires_at: float):
+        self.member = member                      # Redis member holding the reservation
+        self.granted = granted                    # Tokens reserved (0 = cached denial)
+        self.tokens = granted                     # Tokens not yet spent
+        self.shared_remaining = shared_remaining  # Budget left in Redis after the grant
+        self.reset = reset
+        self.expires_at = expires_at
+
+
+class LeasedRateLimiter(AsyncRedisRateLimiter):
+    """
+    Two-tier rate limiter: quota is leased from Redis in blocks, then
+    spent from process memory without a network hop per request
+
+    Accuracy bounds (per process, per identifier):
+    - At most `max_lease` tokens are reserved but unspent, so other
+      processes may be refused early by up to that many requests.
+    - Tokens are recorded in Redis at lease time and a lease lives at most
+      `lease_ttl` seconds, so a spent token may leave the window up to
+      `lease_ttl` seconds early.
+    - A refused identifier is answered locally for at most `lease_ttl`
+      seconds before Redis is asked again.
+
+    Leases are refreshed in the background once fewer than
+    `refresh_watermark` of their tokens are left, and unused tokens are
+    returned to Redis asynchronously when a lease expires. If Redis is
+    unreachable, checks fall back to a per-process InMemoryRateLimiter.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        lease_fraction: float = 0.1,
+        max_lease: int = 100,
+        lease_ttl: float = 5.0,
+        refresh_watermark: float = 0.2,
+        max_identifiers: int = 100_000,
+        max_connections: int = 50,
+        pool_timeout: float = 5.0,
+        client=None,
+    ):
+        """
+        Args:
+            redis_url: Redis connection URL
+            lease_fraction: Share of the remaining window budget leased at once
+            max_lease: Upper bound on tokens per lease (accuracy bound)
+            lease_ttl: Maximum lease lifetime in seconds (staleness bound)
+            refresh_watermark: Fraction of a lease left when the next one is fetched
+            max_identifiers: Maximum number of identifiers holding leases
+            max_connections: Connection pool size shared by all requests
+            pool_timeout: Seconds to wait for a free connection
+            client: Existing redis.asyncio client (overrides redis_url)
+        """
+        super().__init__(redis_url, max_connections, pool_timeout, client)
+        self.lease_script = self.redis.register_script(LEASE_SCRIPT)
+        self.release_script = self.redis.register_script(RELEASE_SCRIPT)
+
+        self.lease_fraction = lease_fraction
+        self.max_lease = max_lease
+        self.lease_ttl = lease_ttl
+        self.refresh_watermark = refresh_watermark
+        self.max_identifiers = max_identifiers
 
+        # {(identifier, window): _Lease}, ordered least -> most recently used
+        self.leases: "OrderedDict[Tuple[str, int], _Lease]" = OrderedDict()
+        # Leases fetched ahead of time by background refreshes
+        self.pending: Dict[Tuple[str, int], _Lease] = {}
+        self.refreshing: Set[Tuple[str, int]] = set()
+        self.acquiring: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.fallback = InMemoryRateLimiter(max_identifiers=max_identifiers)
+
+    async def is_allowed(self, identifier: str, limit: int, window: int, cost: int = 1) -> Tuple[bool, dict]:
+        """
+        Check if request is allowed, using a local lease when possible
+        Weighted requests (cost > 1) go straight to Redis.
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            limit: Maximum requests allowed in window
+            window: Time window in seconds
+            cost: Budget units this request consumes
+
+        Returns:
+            (is_allowed, rate_limit_info)
+        """
+        if cost != 1:
+            return await super().is_allowed(identifier, limit, window, cost)
+
+        key = (identifier, window)
+        current_time = time.time()
+        lease = self.leases.get(key)
+
+        # Concurrent requests share one in-flight acquisition per identifier.
+        # A burst can drain a fresh lease before every waiter gets a token;
+        # keep leasing until a token is left or Redis grants none (each
+        # lease spends real budget, so this ends once the window is full).
+        while lease is None or not self._usable(lease, current_time):
+            task = self.acquiring.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._next_lease(key, limit))
+                self.acquiring[key] = task
+                task.add_done_callback(lambda _: self.acquiring.pop(key, None))
+
+            try:
+                lease = await asyncio.shield(task)
+            except Exception as e:
+                logger.warning(f"Rate limit lease failed, using local limiter: {e}")
+                return self.fallback.is_allowed(identifier, limit, window)
+
+        if key in self.leases:
+            self.leases.move_to_end(key)
+
+        # Only a lease Redis granted nothing on means the window is exhausted
+        is_allowed = lease.granted > 0
         if is_allowed:
-            # Add current request
-            self.redis.zadd(key, {str(current_time): current_time})
-            # Set expiry on key
-            self.redis.expire(key, window)
-
-        # Calculate reset time
-        oldest_timestamp = self.redis.zrange(key, 0, 0, withscores=True)
-        if oldest_timestamp:
-            reset_time = oldest_timestamp[0][1] + window
-            retry_after = max(0, int(reset_time - current_time))
+            lease.tokens -= 1
+            if lease.tokens < lease.granted * self.refresh_watermark:
+                self._refresh(key, limit)
+            retry_after = None
         else:
-            reset_time = current_time + window
-            retry_after = 0
+            retry_after = max(0, int(lease.reset - current_time))
 
         rate_limit_info = {
             "limit": limit,
-            "remaining": max(0, limit - request_count - 1),
-            "reset": int(reset_time),
-            "retry_after": retry_after if not is_allowed else None,
+            "remaining": max(0, lease.shared_remaining + lease.tokens),
+            "reset": int(lease.reset),
+            "retry_after": retry_after,
         }
 
         return is_allowed, rate_limit_info
 
+    async def refund(self, identifier: str, window: int, cost: int = 1) -> None:
+        """
+        Give back budget an allowed request consumed
+        A single token goes back into the local lease it came from.
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            window: Time window in seconds
+            cost: Budget units to return
+        """
+        lease = self.leases.get((identifier, window))
+        if cost == 1 and lease is not None and lease.tokens < lease.granted:
+            lease.tokens += 1
+            return
+        await super().refund(identifier, window, cost)
+
+    async def _next_lease(self, key: Tuple[str, int], limit: int) -> _Lease:
+        """Retire the current lease and install a prefetched or new one"""
+        identifier, window = key
+
+        old = self.leases.pop(key, None)
+        if old is not None:
+            self._release(identifier, old)
+
+        lease = self.pending.pop(key, None)
+        if lease is None or not self._usable(lease, time.time()):
+            if lease is not None:
+                self._release(identifier, lease)
+            lease = await self._acquire(identifier, limit, window)
+
+        self.leases[key] = lease
+        if len(self.leases) > self.max_identifiers:
+            (evicted_identifier, _), evicted = self.leases.popitem(last=False)
+            self._release(evicted_identifier, evicted)
+
+        return lease
+
+    @staticmethod
+    def _usable(lease: _Lease, current_time: float) -> bool:
+        """A lease is usable until it expires or (if it granted tokens) runs dry"""
+        if lease.expires_at <= current_time:
+            return False
+        return lease.granted == 0 or lease.tokens > 0
+
+    async def _acquire(self, identifier: str, limit: int, window: int) -> _Lease:
+        """Reserve a block of tokens in Redis (one round trip)"""
+        current_time = time.time()
+        member = _redis_member(current_time)
+
+        granted, request_count, oldest = await self.lease_script(
+            keys=_redis_keys(identifier),
+            args=[current_time, window, limit, member, self.lease_fraction, self.max_lease],
+        )
+        granted = int(granted)
+        request_count = int(request_count)
+
+        reset = float(oldest) + window if oldest else current_time + window
+        expires_at = current_time + self.lease_ttl
+        if not granted:
+            # Cache the denial, but never past the point a slot frees up
+            expires_at = min(expires_at, reset)
+
+        return _Lease(
+            member=f"{member}:{granted}",
+            granted=granted,
+            shared_remaining=max(0, limit - request_count - granted),
+            reset=reset,
+            expires_at=expires_at,
+        )
+
+    def _refresh(self, key: Tuple[str, int], limit: int) -> None:
+        """Fetch the next lease in the background before this one runs out"""
+        if key in self.refreshing or key in self.pending:
+            return
+
+        async def refresh():
+            try:
+                self.pending[key] = await self._acquire(key[0], limit, key[1])
+            except Exception as e:
+                logger.warning(f"Rate limit lease refresh failed: {e}")
+            finally:
+                self.refreshing.discard(key)
+
+        self.refreshing.add(key)
+        self._spawn(refresh())
+
+    def _release(self, identifier: str, lease: _Lease) -> None:
+        """Return unspent tokens of a retired lease in the background"""
+        if lease.tokens <= 0:
+            return
+
+        async def release():
+            try:
+                await self.release_script(
+                    keys=_redis_keys(identifier),
+                    args=[lease.member, lease.tokens],
+                )
+            except Exception as e:
+                logger.warning(f"Rate limit lease release failed: {e}")
+
+        self._spawn(release())
+
+    def _spawn(self, coro) -> None:
+        """Run a background coroutine, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def close(self):
+        """Return all outstanding leases, then close the connection pool"""
+        for (identifier, _), lease in list(self.leases.items()) + list(self.pending.items()):
+            self._release(identifier, lease)
+        self.leases.clear()
+        self.pending.clear()
+
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        await super().close()
+
+
+# ==========================================
+# CONCURRENCY LIMITS (In-flight work)
+# ==========================================
+
+# Maximum concurrently running items per user. Slots are reclaimed after
+# `ttl` seconds in case a release is missed (crashed worker, lost signal).
+CONCURRENCY_LIMITS = {
+    "workflows": {
+        "limit": 3,
+        "ttl": 6 * 3600,  # Longest expected workflow run
+    },
+}
+
+# Acquire an in-flight slot.
+# KEYS[1] = sorted set, score = slot expiry, member = slot ID
+# ARGV = now, slot_id, limit, ttl
+# Returns {acquired (0/1), slots held after this call}
+CONCURRENCY_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[4])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local held = redis.call('ZCARD', KEYS[1])
+local existing = redis.call('ZSCORE', KEYS[1], ARGV[2])
+
+if not existing and held >= tonumber(ARGV[3]) then
+    return {0, held}
+end
+
+if not existing then
+    held = held + 1
+end
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[2])
+redis.call('EXPIRE', KEYS[1], math.ceil(ttl))
+return {1, held}
+"""
+
+
+def cost_for_duration(seconds: int, unit: int = 60) -> int:
+    """Weighted request cost: one unit per started `unit` seconds of output"""
+    return max(1, math.ceil(seconds / unit))
+
+
+def _concurrency_info(acquired: bool, held: int, limit: int) -> Tuple[bool, dict]:
+    return acquired, {
+        "limit": limit,
+        "in_flight": held,
+        "remaining": max(0, limit - held),
+    }
+
+
+class ConcurrencyLimiter:
+    """
+    In-memory in-flight slot tracker
+    Slots are keyed by ID (e.g. workflow ID), so acquire and release are
+    idempotent. NOT shared between processes (production should use Redis).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        # {identifier: {slot_id: expires_at}}
+        self.slots: Dict[str, Dict[str, float]] = {}
+
+    def acquire(self, identifier: str, slot_id: str, limit: int, ttl: float) -> Tuple[bool, dict]:
+        """
+        Take an in-flight slot if fewer than `limit` are held
+
+        Args:
+            identifier: Owner of the slots (e.g. "workflows:user:123")
+            slot_id: Unique ID of the work item
+            limit: Maximum concurrent slots
+            ttl: Seconds until the slot is reclaimed automatically
+
+        Returns:
+            (acquired, concurrency_info)
+        """
+        current_time = self.clock()
+        held = self.slots.setdefault(identifier, {})
+
+        for expired in [key for key, expires_at in held.items() if expires_at <= current_time]:
+            del held[expired]
+
+        acquired = slot_id in held or len(held) < limit
+        if acquired:
+            held[slot_id] = current_time + ttl
+        elif not held:
+            del self.slots[identifier]
+
+        return _concurrency_info(acquired, len(held), limit)
+
+    def release(self, identifier: str, slot_id: str) -> bool:
+        """
+        Free a slot
+
+        Returns:
+            Whether the slot was held
+        """
+        held = self.slots.get(identifier)
+        if not held:
+            return False
+
+        released = held.pop(slot_id, None) is not None
+        if not held:
+            del self.slots[identifier]
+        return released
+
+
+class AsyncRedisConcurrencyLimiter:
+    """
+    Redis-backed in-flight slot tracker shared by all API instances
+    Reuses the rate limiter's redis.asyncio client and connection pool.
+    """
+
+    def __init__(self, client):
+        self.redis = client
+        self.acquire_script = self.redis.register_script(CONCURRENCY_ACQUIRE_SCRIPT)
+
+    async def acquire(self, identifier: str, slot_id: str, limit: int, ttl: float) -> Tuple[bool, dict]:
+        """Take an in-flight slot if fewer than `limit` are held (see ConcurrencyLimiter)"""
+        acquired, held = await self.acquire_script(
+            keys=[f"concurrency:{identifier}"],
+            args=[time.time(), slot_id, limit, ttl],
+        )
+        return _concurrency_info(bool(acquired), int(held), limit)
+
+    async def release(self, identifier: str, slot_id: str) -> bool:
+        """Free a slot; returns whether it was held"""
+        return bool(await self.redis.zrem(f"concurrency:{identifier}", slot_id))
+
+
+# Global concurrency limiter instance
+concurrency_limiter = ConcurrencyLimiter()
+
+
+async def acquire_concurrency_slot(resource: str, user_id: str, slot_id: str) -> dict:
+    """
+    Reserve an in-flight slot for a user
+
+    Args:
+        resource: Key in CONCURRENCY_LIMITS (e.g. "workflows")
+        user_id: Owning user ID
+        slot_id: Unique ID of the work item (e.g. workflow ID)
+
+    Returns:
+        Concurrency info dict
+
+    Raises:
+        HTTPException: If the user already has `limit` items in flight
+    """
+    config = CONCURRENCY_LIMITS[resource]
+
+    result = concurrency_limiter.acquire(f"{resource}:user:{user_id}", slot_id, config["limit"], config["ttl"])
+    if inspect.isawaitable(result):
+        result = await result
+    acquired, info = result
+
+    if not acquired:
+        RATE_LIMIT_REJECTIONS.labels(f"concurrency:{resource}").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "concurrency_limit_exceeded",
+                "message": f"Too many {resource} in progress (max {info['limit']}). "
+                           f"Wait for one to finish or cancel it.",
+                "limit": info["limit"],
+                "in_flight": info["in_flight"],
+            },
+        )
+
+    return info
+
+
+async def release_concurrency_slot(resource: str, user_id: str, slot_id: str) -> bool:
+    """
+    Free a user's in-flight slot (safe to call more than once)
+
+    Returns:
+        Whether the slot was held
+    """
+    result = concurrency_limiter.release(f"{resource}:user:{user_id}", slot_id)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+# ==========================================
+# BACKEND SELECTION (App startup)
+# ==========================================
+
+async def init_rate_limiter(redis_url: Optional[str] = None):
+    """
+    Select the rate limiter backend at app startup
+
+    RATE_LIMIT_BACKEND selects the backend:
+    - memory: per-process InMemoryRateLimiter (default without Redis)
+    - redis: AsyncRedisRateLimiter, one round trip per check (default with Redis)
+    - leased: LeasedRateLimiter, quota leased from Redis in blocks
+    - shared: SharedMemoryRateLimiter, one budget for all workers on this host
+
+    With a Redis backend, concurrency limits are tracked in Redis as well.
+
+    Args:
+        redis_url: Redis connection URL (defaults to REDIS_URL env var)
+
+    Returns:
+        The active rate limiter
+
+    Raises:
+        ValueError: If RATE_LIMIT_BACKEND is unknown, or names a Redis
+            backend without a Redis URL (rather than silently limiting per
+            process)
+    """
+    global rate_limiter, concurrency_limiter
+
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    backend = os.getenv("RATE_LIMIT_BACKEND") or ("redis" if redis_url else "memory")
+    max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+    if backend not in ("memory", "redis", "leased", "shared"):
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r} (expected memory, redis, leased or shared)")
+    if backend in ("redis", "leased") and not redis_url:
+        raise ValueError(f"RATE_LIMIT_BACKEND={backend} requires REDIS_URL")
+
+    if backend == "redis":
+        rate_limiter = AsyncRedisRateLimiter(redis_url, max_connections=max_connections)
+    elif backend == "leased":
+        rate_limiter = LeasedRateLimiter(
+            redis_url,
+            lease_fraction=float(os.getenv("RATE_LIMIT_LEASE_FRACTION", "0.1")),
+            max_lease=int(os.getenv("RATE_LIMIT_MAX_LEASE", "100")),
+            lease_ttl=float(os.getenv("RATE_LIMIT_LEASE_TTL", "5")),
+            max_connections=max_connections,
+        )
+    elif backend == "shared":
+        from .shared_rate_limiter import SharedMemoryRateLimiter
+        rate_limiter = SharedMemoryRateLimiter(
+            path=os.getenv("RATE_LIMIT_SHM_PATH"),
+            slots=int(os.getenv("RATE_LIMIT_SHM_SLOTS", "16384")),
+        )
+
+    # In-flight limits share the Redis pool when one is configured
+    if isinstance(rate_limiter, AsyncRedisRateLimiter):
+        concurrency_limiter = AsyncRedisConcurrencyLimiter(rate_limiter.redis)
+
+    return rate_limiter
+
+
+async def close_rate_limiter():
+    """Release backend resources at app shutdown"""
+    close = getattr(rate_limiter, "close", None)
+    if close is not None:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
 
 # ==========================================
 # USAGE EXAMPLE
@@ -0,0 +1,694 @@
+"""
+Data access for the API routers
+
+Async repository functions over app.models, one section per entity. They
+take the request's AsyncSession, flush writes (so generated values and
+constraint errors surface immediately) and leave committing to the caller.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import uuid
+
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import (
+    Analytics,
+    AnalyticsDaily,
+    AnalyticsHourly,
+    AnalyticsSample,
+    Payment,
+    PaymentStatus,
+    Project,
+    ProjectStatus,
+    Script,
+    User,
+    UserRole,
+)
+
+
+def new_id() -> str:
+    """Primary key for new rows"""
+    return str(uuid.uuid4())
+
+
+def _upsert(session: AsyncSession, table):
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table)
+
+
+# ==========================================
+# USERS
+# ==========================================
+
+async def get_user(session: AsyncSession, user_id: str) -> Optional[User]:
+    return await session.get(User, user_id)
+
+
+async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
+    result = await session.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
+async def create_user(session: AsyncSession, email: str, hashed_password: str, full_name: str, **fields) -> User:
+    """
+    Create a user
+
+    Args:
+        session: Database session
+        email: Unique email address
+        hashed_password: Password hash (see auth.get_password_hash)
+        full_name: Display name
+        **fields: Other User columns (role, avatar_url, ...)
+
+    Returns:
+        New user
+    """
+    user = User(
+        id=fields.pop("id", None) or new_id(),
+        email=email,
+        hashed_password=hashed_password,
+        full_name=full_name,
+        **fields,
+    )
+    session.add(user)
+    await session.flush()
+    return user
+
+
+async def ensure_user(session: AsyncSession, user_id: str, email: Optional[str], role: Optional[str] = None) -> None:
+    """
+    Create the record of an authenticated user that has none yet
+
+    Tokens identify users by id; rows referencing users.id need the user
+    to exist. The new record has no password (it cannot log in with one)
+    and existing records, or one already holding the email, are left as is.
+
+    Args:
+        session: Database session
+        user_id: Token subject
+        email: Token email (the user id stands in if the token has none)
+        role: Token role (unknown roles become client)
+    """
+    roles = {member.value for member in UserRole}
+    email = email or user_id
+    now = datetime.utcnow()
+    await session.execute(
+        _upsert(session, User).values(
+            id=user_id,
+            email=email,
+            hashed_password="",
+            full_name=email.split("@", 1)[0],
+            role=UserRole(role) if role in roles else UserRole.CLIENT,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        ).on_conflict_do_nothing()
+    )
+
+
+async def update_user(session: AsyncSession, user: User, **fields) -> User:
+    """Set columns on a user (None values are ignored)"""
+    for key, value in fields.items():
+        if value is not None:
+            setattr(user, key, value)
+    await session.flush()
+    return user
+
+
+# ==========================================
+# PROJECTS
+# ==========================================
+
+async def list_projects(
+    session: AsyncSession,
+    owner_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, str]] = None,
+    status: Optional[ProjectStatus] = None,
+) -> List[Project]:
+    """
+    Projects owned by a user, newest first
+
+    Args:
+        session: Database session
+        owner_id: Owning user ID
+        skip: Rows to skip (offset pagination)
+        limit: Rows returned
+        after: (created_at, id) of the last row seen (keyset pagination, see app.pagination)
+        status: Only projects in this status
+
+    Returns:
+        Projects ordered by (created_at, id) descending
+    """
+    query = select(Project).where(Project.owner_id == owner_id)
+    if status is not None:
+        query = query.where(Project.status == status)
+    if after is not None:
+        query = query.where(tuple_(Project.created_at, Project.id) < tuple_(*after))
+    result = await session.execute(
+        query
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def get_project(session: AsyncSession, project_id: str, owner_id: Optional[str] = None) -> Optional[Project]:
+    """
+    Get a project
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        owner_id: If given, only return the project when this user owns it
+
+    Returns:
+        Project or None
+    """
+    query = select(Project).where(Project.id == project_id)
+    if owner_id is not None:
+        query = query.where(Project.owner_id == owner_id)
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def get_project_by_workflow(
+    session: AsyncSession,
+    workflow_id: str,
+    owner_id: Optional[str] = None,
+) -> Optional[Project]:
+    """Project running a Temporal workflow (optionally restricted to an owner)"""
+    query = select(Project).where(Project.temporal_workflow_id == workflow_id)
+    if owner_id is not None:
+        query = query.where(Project.owner_id == owner_id)
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def create_project(session: AsyncSession, owner_id: str, title: str, niche_id: str, **fields) -> Project:
+    """
+    Create a project in draft status
+
+    Args:
+        session: Database session
+        owner_id: Owning user ID
+        title: Project title
+        niche_id: Content niche
+        **fields: Other Project columns (channel_id, target_duration, ...)
+
+    Returns:
+        New project
+    """
+    now = datetime.utcnow()
+    project = Project(
+        id=fields.pop("id", None) or new_id(),
+        owner_id=owner_id,
+        title=title,
+        niche_id=niche_id,
+        status=fields.pop("status", ProjectStatus.DRAFT),
+        created_at=fields.pop("created_at", now),
+        updated_at=now,
+        **fields,
+    )
+    session.add(project)
+    await session.flush()
+    return project
+
+
+async def update_project(session: AsyncSession, project: Project, **fields) -> Project:
+    """Set columns on a project (None values are ignored)"""
+    for key, value in fields.items():
+        if value is not None:
+            setattr(project, key, value)
+    project.updated_at = datetime.utcnow()
+    await session.flush()
+    return project
+
+
+async def delete_project(session: AsyncSession, project: Project) -> None:
+    """Delete a project with its scripts and analytics"""
+    await session.execute(delete(Script).where(Script.project_id == project.id))
+    await session.execute(delete(Analytics).where(Analytics.project_id == project.id))
+    for model in (AnalyticsSample, AnalyticsHourly, AnalyticsDaily):
+        await session.execute(delete(model).where(model.project_id == project.id))
+    await session.delete(project)
+    await session.flush()
+
+
+# ==========================================
+# SCRIPTS
+# ==========================================
+
+async def list_scripts(session: AsyncSession, project_id: str) -> List[Script]:
+    """Script candidates for a project, best first"""
+    result = await session.execute(
+        select(Script)
+        .where(Script.project_id == project_id)
+        .order_by(Script.score.desc(), Script.created_at)
+    )
+    return list(result.scalars())
+
+
+async def get_script(session: AsyncSession, script_id: str, project_id: Optional[str] = None) -> Optional[Script]:
+    query = select(Script).where(Script.id == script_id)
+    if project_id is not None:
+        query = query.where(Script.project_id == project_id)
+    result = await session.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def create_script(
+    session: AsyncSession,
+    project_id: str,
+    content: str,
+    word_count: int,
+    estimated_duration: int,
+    reasoning_path: str,
+    **fields,
+) -> Script:
+    """
+    Create a script candidate
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        content: Script text
+        word_count: Words in the script
+        estimated_duration: Spoken duration in seconds
+        reasoning_path: "creative" or "analytical"
+        **fields: Other Script columns (score, visual_cues, ...)
+
+    Returns:
+        New script
+    """
+    script = Script(
+        id=fields.pop("id", None) or new_id(),
+        project_id=project_id,
+        content=content,
+        word_count=word_count,
+        estimated_duration=estimated_duration,
+        reasoning_path=reasoning_path,
+        created_at=fields.pop("created_at", datetime.utcnow()),
+        **fields,
+    )
+    session.add(script)
+    await session.flush()
+    return script
+
+
+async def bulk_create_scripts(
+    session: AsyncSession,
+    project_id: str,
+    candidates: List[dict],
+    project_status: Optional[ProjectStatus] = None,
+) -> List[str]:
+    """
+    Insert a batch of script candidates with one executemany INSERT
+
+    Skips per-object ORM bookkeeping (rows are not added to the session).
+    The project's status update runs in the same transaction, so a failed
+    batch leaves both untouched once the caller rolls back.
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        candidates: Dicts with content, word_count, estimated_duration and
+            optionally id, score, reasoning_path and visual_cues
+        project_status: If given, set the project to this status
+
+    Returns:
+        IDs of the inserted scripts, in input order
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": candidate.get("id") or new_id(),
+            "project_id": project_id,
+            "content": candidate["content"],
+            "word_count": candidate["word_count"],
+            "estimated_duration": candidate["estimated_duration"],
+            "score": candidate.get("score") or 0.0,
+            "reasoning_path": candidate.get("reasoning_path") or "creative",
+            "visual_cues": candidate.get("visual_cues"),
+            "is_approved": False,
+            "created_at": now,
+        }
+        for candidate in candidates
+    ]
+    if rows:
+        await session.execute(insert(Script), rows)
+
+    if project_status is not None:
+        await session.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(status=project_status, updated_at=now)
+        )
+    return [row["id"] for row in rows]
+
+
+async def approve_script(session: AsyncSession, script: Script, feedback: Optional[str] = None) -> Script:
+    """Mark a script approved and make it the project's script"""
+    script.is_approved = True
+    script.approved_at = datetime.utcnow()
+    if feedback is not None:
+        script.feedback = feedback
+
+    project = await session.get(Project, script.project_id)
+    if project is not None:
+        project.script_id = script.id
+        project.updated_at = datetime.utcnow()
+
+    await session.flush()
+    return script
+
+
+# ==========================================
+# PAYMENTS
+# ==========================================
+
+async def create_payment(
+    session: AsyncSession,
+    user_id: str,
+    amount: int,
+    stripe_payment_intent_id: str,
+    **fields,
+) -> Payment:
+    """
+    Record a payment
+
+    Args:
+        session: Database session
+        user_id: Paying/receiving user ID
+        amount: Amount in cents
+        stripe_payment_intent_id: Stripe PaymentIntent ID
+        **fields: Other Payment columns (currency, status, platform_fee, ...)
+
+    Returns:
+        New payment
+    """
+    payment = Payment(
+        id=fields.pop("id", None) or new_id(),
+        user_id=user_id,
+        amount=amount,
+        stripe_payment_intent_id=stripe_payment_intent_id,
+        status=fields.pop("status", PaymentStatus.PENDING),
+        created_at=fields.pop("created_at", datetime.utcnow()),
+        **fields,
+    )
+    session.add(payment)
+    await session.flush()
+    return payment
+
+
+async def list_payments(
+    session: AsyncSession,
+    user_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, str]] = None,
+    count: bool = True,
+) -> Tuple[List[Payment], Optional[int]]:
+    """
+    A user's payments, newest first
+
+    Args:
+        session: Database session
+        user_id: Paying/receiving user ID
+        skip: Rows to skip (offset pagination)
+        limit: Rows returned
+        after: (created_at, id) of the last row seen (keyset pagination, see app.pagination)
+        count: Also count all of the user's payments (a scan of every row)
+
+    Returns:
+        (page of payments, total count or None if not counted)
+    """
+    query = select(Payment).where(Payment.user_id == user_id)
+    if after is not None:
+        query = query.where(tuple_(Payment.created_at, Payment.id) < tuple_(*after))
+    result = await session.execute(
+        query
+        .order_by(Payment.created_at.desc(), Payment.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    payments = list(result.scalars())
+
+    if not count:
+        return payments, None
+    total = await session.scalar(select(func.count()).select_from(Payment).where(Payment.user_id == user_id))
+    return payments, total or 0
+
+
+async def get_payment_by_intent(session: AsyncSession, stripe_payment_intent_id: str) -> Optional[Payment]:
+    result = await session.execute(
+        select(Payment).where(Payment.stripe_payment_intent_id == stripe_payment_intent_id)
+    )
+    return result.scalar_one_or_none()
+
+
+# ==========================================
+# ANALYTICS
+# ==========================================
+
+async def get_analytics(session: AsyncSession, project_id: str) -> Optional[Analytics]:
+    """A project's most recently recorded analytics"""
+    result = await session.execute(
+        select(Analytics)
+        .where(Analytics.project_id == project_id)
+        .order_by(Analytics.recorded_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def upsert_analytics(session: AsyncSession, project_id: str, **metrics) -> Analytics:
+    """
+    Create or update a project's analytics row
+
+    Args:
+        session: Database session
+        project_id: Project ID
+        **metrics: Analytics columns (views, likes, ctr, ...); recorded_at defaults to now
+
+    Returns:
+        Analytics row
+    """
+    analytics = await get_analytics(session, project_id)
+    if analytics is None:
+        analytics = Analytics(id=new_id(), project_id=project_id)
+        session.add(analytics)
+
+    now = datetime.utcnow()
+    analytics.recorded_at = metrics.pop("recorded_at", None) or now
+    for key, value in metrics.items():
+        setattr(analytics, key, value)
+    analytics.last_updated = now
+
+    await session.flush()
+    return analytics
+
+
+# ==========================================
+# ANALYTICS TIME SERIES
+# ==========================================
+
+# Additive metrics carried by samples and rollups
+ANALYTICS_METRICS = (
+    "views", "likes", "comments", "watch_time_hours", "impressions", "clicks", "estimated_revenue",
+)
+
+ANALYTICS_ROLLUPS = {"hour": AnalyticsHourly, "day": AnalyticsDaily}
+
+# Sample partitions known to exist (PostgreSQL); entries are dropped when
+# an insert fails, e.g. after a month's partition was dropped for retention
+_sample_partitions: Set[str] = set()
+
+
+def to_utc(moment: datetime) -> datetime:
+    """Naive UTC, the convention of every DateTime column"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def analytics_bucket(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour or day containing a moment"""
+    moment = to_utc(moment).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def sample_partition(moment: datetime) -> Tuple[str, datetime, datetime]:
+    """
+    Monthly analytics_samples partition holding a moment
+
+    Returns:
+        (table name, first instant, first instant of the next month)
+    """
+    start = to_utc(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return f"analytics_samples_y{start.year}m{start.month:02d}", start, end
+
+
+async def ensure_sample_partitions(session: AsyncSession, moments: Iterable[datetime]) -> None:
+    """
+    Create the monthly partitions for some sample times (PostgreSQL only)
+
+    Runs in its own short transaction so the ingest transaction does not
+    hold the parent table's DDL lock.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+
+    missing = {}
+    for moment in moments:
+        name, start, end = sample_partition(moment)
+        if name not in _sample_partitions:
+            missing[name] = (start, end)
+    if not missing:
+        return
+
+    async with session.bind.begin() as connection:
+        for name, (start, end) in sorted(missing.items()):
+            await connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF analytics_samples "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+    _sample_partitions.update(missing)
+
+
+async def ingest_analytics_samples(session: AsyncSession, samples: List[dict]) -> int:
+    """
+    Append analytics samples and add them to the hourly and daily rollups
+
+    Samples are increments (metrics accrued since the previous sample), so
+    rollups stay correct by adding each new sample once. A sample whose
+    (id, recorded_at) already exists, or repeats an earlier one in the
+    batch, is skipped, which makes retried batches idempotent. Each table is written with one executemany
+    statement; rollup rows are upserted in key order so concurrent batches
+    cannot deadlock.
+
+    Args:
+        session: Database session
+        samples: Dicts with project_id, owner_id, recorded_at, optionally id
+            and any of ANALYTICS_METRICS (missing metrics are 0)
+
+    Returns:
+        Samples inserted (duplicates excluded)
+    """
+    rows = [
+        {
+            "id": sample.get("id") or new_id(),
+            "recorded_at": to_utc(sample["recorded_at"]),
+            "project_id": sample["project_id"],
+            "owner_id": sample["owner_id"],
+            **{metric: sample.get(metric) or 0 for metric in ANALYTICS_METRICS},
+        }
+        for sample in samples
+    ]
+    if not rows:
+        return 0
+
+    # A key repeated within the batch is one sample (the first copy wins);
+    # it would otherwise be inserted once but added to the rollups twice
+    unique: Dict[Tuple[str, datetime], dict] = {}
+    for row in rows:
+        unique.setdefault((row["id"], row["recorded_at"]), row)
+    rows = list(unique.values())
+
+    await ensure_sample_partitions(session, (row["recorded_at"] for row in rows))
+
+    table = AnalyticsSample.__table__
+    try:
+        result = await session.execute(
+            _upsert(session, table).on_conflict_do_nothing().returning(table.c.id, table.c.recorded_at),
+            rows,
+        )
+    except IntegrityError:
+        # A missing partition fails the insert; check again on the retry
+        _sample_partitions.difference_update(sample_partition(row["recorded_at"])[0] for row in rows)
+        raise
+    inserted = set(result.all())
+    rows = [row for row in rows if (row["id"], row["recorded_at"]) in inserted]
+
+    for granularity, model in ANALYTICS_ROLLUPS.items():
+        sums: Dict[Tuple[str, datetime], dict] = {}
+        for row in rows:
+            bucket = analytics_bucket(row["recorded_at"], granularity)
+            entry = sums.get((row["project_id"], bucket))
+            if entry is None:
+                entry = sums[(row["project_id"], bucket)] = {
+                    "project_id": row["project_id"],
+                    "bucket": bucket,
+                    "owner_id": row["owner_id"],
+                    "samples": 0,
+                    **{metric: 0 for metric in ANALYTICS_METRICS},
+                }
+            entry["samples"] += 1
+            for metric in ANALYTICS_METRICS:
+                entry[metric] += row[metric]
+        if not sums:
+            continue
+
+        rollup = model.__table__
+        statement = _upsert(session, rollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollup.c.project_id, rollup.c.bucket],
+            set_={
+                column: rollup.c[column] + statement.excluded[column]
+                for column in ANALYTICS_METRICS + ("samples",)
+            },
+        )
+        await session.execute(statement, [sums[key] for key in sorted(sums)])
+
+    return len(rows)
+
+
+async def analytics_series(
+    session: AsyncSession,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    project_id: Optional[str] = None,
+    owner_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Time-bucketed analytics from the rollups
+
+    Reads one rollup row per project and bucket in the range, so cost
+    depends on the range, not on how much history exists.
+
+    Args:
+        session: Database session
+        granularity: "hour" or "day"
+        start: First bucket (inclusive)
+        end: End of the range (exclusive)
+        project_id: Only this project
+        owner_id: Only this owner's projects (summed per bucket)
+
+    Returns:
+        Buckets with data, oldest first: bucket, ANALYTICS_METRICS and ctr
+    """
+    model = ANALYTICS_ROLLUPS[granularity]
+    query = (
+        select(model.bucket, *(func.sum(getattr(model, metric)).label(metric) for metric in ANALYTICS_METRICS))
+        .where(model.bucket >= to_utc(start), model.bucket < to_utc(end))
+    )
+    if project_id is not None:
+        query = query.where(model.project_id == project_id)
+    if owner_id is not None:
+        query = query.where(model.owner_id == owner_id)
+
+    result = await session.execute(query.group_by(model.bucket).order_by(model.bucket))
+    series = []
+    for row in result:
+        point = row._asdict()
+        point["ctr"] = point["clicks"] / point["impressions"] if point["impressions"] else 0.0
+        series.append(point)
+    return series
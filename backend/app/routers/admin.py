@@ -0,0 +1,138 @@
+"""
+Admin diagnostics router
+Runtime performance data for operators (admin role only)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+import asyncio
+import tracemalloc
+
+from ..auth import require_role
+from ..event_telemetry import event_aggregator
+from ..loop_monitor import loop_monitor
+from ..memory_diagnostics import process_memory, snapshot_store, start_tracing, stop_tracing
+from ..monitoring import get_span_stats
+from ..profiler import MAX_DURATION, ProfilerBusyError, profile, render_collapsed, route_totals
+
+router = APIRouter(dependencies=[Depends(require_role("admin"))])
+
+# ==========================================
+# PERFORMANCE
+# ==========================================
+
+@router.get("/spans")
+async def span_stats():
+    """
+    Latency of @monitor_performance functions
+
+    Every call is recorded (not just Sentry-sampled traces), so p50/p99
+    are full fidelity. Sorted by total time spent.
+    """
+    return {"spans": get_span_stats()}
+
+
+@router.get("/loop")
+async def event_loop_stats():
+    """
+    Event loop lag and recent slow callbacks
+
+    Each slow callback carries the loop thread's stack captured while the
+    loop was blocked (newest first).
+    """
+    return {
+        "lag_ms": round(loop_monitor.lag * 1000, 2),
+        "max_lag_ms": round(loop_monitor.max_lag * 1000, 2),
+        "slow_callback_threshold_ms": loop_monitor.slow_callback * 1000,
+        "slow_callbacks": loop_monitor.recent_slow_callbacks(),
+    }
+
+
+@router.post("/profile")
+async def cpu_profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_DURATION),
+    interval_ms: float = Query(10.0, ge=5, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """
+    Sample this worker's stacks for a number of seconds
+
+    Returns collapsed stacks (flamegraph.pl / speedscope input) by default,
+    or JSON with per-route sample totals. Only one session runs at a time.
+    """
+    try:
+        result = await asyncio.to_thread(profile, seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(render_collapsed(result["stacks"]))
+
+    return {**result, "routes": route_totals(result["stacks"])}
+
+
+# ==========================================
+# MEMORY
+# ==========================================
+
+@router.get("/memory")
+async def memory_stats():
+    """Process RSS, GC generation stats and tracemalloc status"""
+    return await asyncio.to_thread(process_memory)
+
+
+@router.post("/memory/tracemalloc/start")
+async def tracemalloc_start(frames: int = Query(1, ge=1, le=25)):
+    """Start tracing allocations (slows allocation-heavy code while on)"""
+    start_tracing(frames)
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+
+@router.post("/memory/tracemalloc/stop")
+async def tracemalloc_stop():
+    """Stop tracing and discard snapshots"""
+    stop_tracing()
+    return {"tracing": False}
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot():
+    """Snapshot current allocations (only the most recent few are kept)"""
+    try:
+        return await asyncio.to_thread(snapshot_store.take)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def memory_snapshot_top(snapshot_id: int, limit: int = Query(20, ge=1, le=500)):
+    """Largest allocation sites in a snapshot, by file:line"""
+    try:
+        top = await asyncio.to_thread(snapshot_store.top, snapshot_id, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return {"snapshot": snapshot_id, "top": top}
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    base: int,
+    target: int,
+    limit: int = Query(20, ge=1, le=500),
+):
+    """Allocation growth from snapshot `base` to `target`, by file:line (largest change first)"""
+    try:
+        diff = await asyncio.to_thread(snapshot_store.diff, base, target, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return {"base": base, "target": target, "diff": diff}
+
+
+# ==========================================
+# EVENTS
+# ==========================================
+
+@router.get("/events")
+async def event_counts():
+    """Workflow and payment event counts in the current summary window"""
+    return event_aggregator.summary(reset=False)
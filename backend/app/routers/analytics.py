@@ -0,0 +1,204 @@
+"""
+Video analytics API router
+Ingest time-series samples and query hourly/daily rollups
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, timedelta
+from ..auth import get_current_active_user, TokenData
+from ..database import get_session
+from ..models import Project
+from .. import repositories
+
+router = APIRouter()
+
+# Samples accepted per ingestion request
+MAX_SAMPLE_BATCH = 5000
+
+# Buckets one query may span (bounds the rollup rows read)
+MAX_SERIES_BUCKETS = 2000
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# ==========================================
+# SCHEMAS
+# ==========================================
+
+class AnalyticsSampleIn(BaseModel):
+    project_id: str
+    recorded_at: datetime
+    id: Optional[str] = None
+    views: int = 0
+    likes: int = 0
+    comments: int = 0
+    watch_time_hours: float = 0.0
+    impressions: int = 0
+    clicks: int = 0
+    estimated_revenue: float = 0.0
+
+class AnalyticsSampleBatch(BaseModel):
+    samples: List[AnalyticsSampleIn]
+
+class AnalyticsPoint(BaseModel):
+    bucket: datetime
+    views: int
+    likes: int
+    comments: int
+    watch_time_hours: float
+    impressions: int
+    clicks: int
+    ctr: float
+    estimated_revenue: float
+
+class AnalyticsSeriesResponse(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    points: List[AnalyticsPoint]
+
+# ==========================================
+# HELPERS
+# ==========================================
+
+def validate_range(granularity: str, start: Optional[datetime], end: Optional[datetime]) -> tuple:
+    """
+    Resolve a series range (default: the last 48 hours or 30 days)
+
+    Returns:
+        (start, end) aligned to bucket boundaries
+
+    Raises:
+        HTTPException: 400 for an unknown granularity or an invalid/too large range
+    """
+    if granularity not in BUCKET_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Granularity must be 'hour' or 'day'"
+        )
+    size = BUCKET_SIZES[granularity]
+
+    # End is exclusive; round it up so its partial bucket is included
+    end = end or datetime.utcnow()
+    aligned = repositories.analytics_bucket(end, granularity)
+    end = aligned if aligned == repositories.to_utc(end) else aligned + size
+
+    if start is None:
+        start = end - size * (48 if granularity == "hour" else 30)
+    start = repositories.analytics_bucket(start, granularity)
+
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    if (end - start) / size > MAX_SERIES_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large (maximum {MAX_SERIES_BUCKETS} {granularity} buckets)"
+        )
+    return start, end
+
+# ==========================================
+# ENDPOINTS
+# ==========================================
+
+@router.post("/samples", status_code=status.HTTP_201_CREATED)
+async def ingest_samples(
+    batch: AnalyticsSampleBatch,
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Append analytics samples (YouTube sync output)
+
+    Each sample holds the metrics accrued since the previous one for that
+    project. Samples with an id already stored are skipped, so a failed
+    sync can be retried. Hourly and daily rollups are updated in the same
+    transaction.
+    """
+    if not batch.samples:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No samples"
+        )
+    if len(batch.samples) > MAX_SAMPLE_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many samples (maximum {MAX_SAMPLE_BATCH})"
+        )
+
+    # Owners of every referenced project, in one query
+    project_ids = {sample.project_id for sample in batch.samples}
+    query = select(Project.id, Project.owner_id).where(Project.id.in_(project_ids))
+    if current_user.role != "admin":
+        query = query.where(Project.owner_id == current_user.user_id)
+    owners = dict((await session.execute(query)).all())
+
+    unknown = project_ids - owners.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project not found: {sorted(unknown)[0]}"
+        )
+
+    inserted = await repositories.ingest_analytics_samples(
+        session,
+        [{**sample.model_dump(), "owner_id": owners[sample.project_id]} for sample in batch.samples],
+    )
+    await session.commit()
+    return {"received": len(batch.samples), "inserted": inserted}
+
+@router.get("/projects/{project_id}", response_model=AnalyticsSeriesResponse)
+async def project_series(
+    project_id: str,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Views, watch time, CTR and revenue of a project per hour or day
+    """
+    start, end = validate_range(granularity, start, end)
+
+    owner_id = None if current_user.role == "admin" else current_user.user_id
+    if await repositories.get_project(session, project_id, owner_id=owner_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    points = await repositories.analytics_series(session, granularity, start, end, project_id=project_id)
+    return {"granularity": granularity, "start": start, "end": end, "points": points}
+
+@router.get("/owners/{owner_id}", response_model=AnalyticsSeriesResponse)
+async def owner_series(
+    owner_id: str,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Views, watch time, CTR and revenue across an owner's projects per hour or day
+
+    Use "me" for the current user; other owners are admin only.
+    """
+    start, end = validate_range(granularity, start, end)
+
+    if owner_id == "me":
+        owner_id = current_user.user_id
+    if owner_id != current_user.user_id and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    points = await repositories.analytics_series(session, granularity, start, end, owner_id=owner_id)
+    return {"granularity": granularity, "start": start, "end": end, "points": points}
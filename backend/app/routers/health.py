@@ -9,19 +9,55 @@ Provides:
 - Performance metrics
 """
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Response, status
 from pydantic import BaseModel
 from typing import Dict, Optional
 from datetime import datetime
+from functools import partial
+from sqlalchemy import text
+from temporalio.api.workflowservice.v1 import DescribeNamespaceRequest
+from redis.asyncio import Redis as AsyncRedis
+import asyncio
 import time
-import psutil
 import os
 
+from .. import database
+from .. import rate_limiter as rate_limiter_module
+from ..database import pool_status
+from ..health_checks import CachedCheck, run_checks
+from ..metrics import CONTENT_TYPE_LATEST, registry
+from ..system_metrics import system_sampler
+from ..temporal_client import get_temporal_client
+
 router = APIRouter()
 
 # Track startup time
 STARTUP_TIME = time.time()
 
+# Readiness probes: strict timeout, short cache, hysteresis
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "1"))
+READINESS_TTL = float(os.getenv("READINESS_TTL", "2"))
+READINESS_RISE = int(os.getenv("READINESS_RISE", "2"))
+READINESS_FALL = int(os.getenv("READINESS_FALL", "3"))
+# Report not ready once this share of a connection pool is checked out
+READINESS_POOL_SATURATION = float(os.getenv("READINESS_POOL_SATURATION", "0.9"))
+
+# Process and host gauges (host-wide values are the same in every worker)
+UPTIME = registry.gauge("app_uptime_seconds", "Application uptime in seconds", multiprocess_mode="max")
+UPTIME.set_function(lambda: time.time() - STARTUP_TIME)
+registry.gauge("app_cpu_usage_percent", "CPU usage percentage", multiprocess_mode="max").set_function(
+    lambda: system_sampler.latest.cpu_percent)
+registry.gauge("app_memory_usage_percent", "Memory usage percentage", multiprocess_mode="max").set_function(
+    lambda: system_sampler.latest.memory_percent)
+registry.gauge("app_memory_available_bytes", "Available memory in bytes", multiprocess_mode="min").set_function(
+    lambda: system_sampler.latest.memory_available_bytes)
+registry.gauge("app_disk_usage_percent", "Disk usage percentage", multiprocess_mode="max").set_function(
+    lambda: system_sampler.latest.disk_percent)
+registry.gauge("app_process_open_fds", "Open file descriptors of this worker").set_function(
+    lambda: system_sampler.latest.open_fds)
+registry.gauge("app_process_resident_memory_bytes", "Resident memory of this worker").set_function(
+    lambda: system_sampler.latest.rss_bytes)
+
 # ==========================================
 # SCHEMAS
 # ==========================================
@@ -31,6 +67,9 @@ class HealthResponse(BaseModel):
     timestamp: datetime
     uptime_seconds: float
 
+class ReadinessResponse(HealthResponse):
+    checks: Dict[str, dict]
+
 class DetailedHealthResponse(BaseModel):
     status: str
     timestamp: datetime
@@ -62,29 +101,35 @@ async def health_check():
     }
 
 
-@router.get("/health/ready", response_model=HealthResponse, tags=["Health"])
-async def readiness_check():
+@router.get("/health/ready", response_model=ReadinessResponse, tags=["Health"])
+async def readiness_check(response: Response):
     """
     Readiness check endpoint
-    Returns 200 only if service is ready to accept traffic
+    Returns 200 only if service is ready to accept traffic, 503 otherwise
 
-    Checks:
-    - Database connectivity
-    - External API availability
-    - Critical dependencies
+    Checks (on the app's pooled clients):
+    - Database: SELECT 1 and connection pool saturation
+    - Redis: PING and connection pool saturation
+    - Temporal: describe namespace
+
+    A check must fail READINESS_FALL times in a row to take the instance
+    out of rotation, and pass READINESS_RISE times to bring it back.
 
     Used by:
     - Kubernetes readiness probes
     - Load balancer health checks
     """
-    # TODO: Add database connectivity check
-    # TODO: Check Temporal connectivity
-    # TODO: Check Redis connectivity (if used)
+    checks = await run_checks(READINESS_CHECKS)
+    ready = all(check["ready"] for check in checks.values() if check["critical"])
+
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
 
     return {
-        "status": "ready",
+        "status": "ready" if ready else "not_ready",
         "timestamp": datetime.utcnow(),
         "uptime_seconds": time.time() - STARTUP_TIME,
+        "checks": checks,
     }
 
 
@@ -119,20 +164,11 @@ async def detailed_health():
     - Troubleshooting
     - Status pages
     """
-    # System metrics
-    cpu_percent = psutil.cpu_percent(interval=0.1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
-
-    # Service checks
-    services = {
-        "database": await check_database(),
-        "temporal": await check_temporal(),
-        "redis": await check_redis(),
-        "openai": await check_external_api("openai"),
-        "elevenlabs": await check_external_api("elevenlabs"),
-        "stripe": await check_external_api("stripe"),
-    }
+    # System metrics (cached by the background sampler)
+    system = system_sampler.latest
+
+    # Service checks (concurrent, timeout-bounded, cached)
+    services = await run_checks(DEPENDENCY_CHECKS)
 
     # Overall status
     all_services_healthy = all(
@@ -149,86 +185,143 @@ async def detailed_health():
         "environment": os.getenv("ENVIRONMENT", "development"),
         "services": services,
         "system": {
-            "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_mb": memory.available / (1024 * 1024),
-            "disk_percent": disk.percent,
-            "disk_free_gb": disk.free / (1024 * 1024 * 1024),
+            "cpu_percent": system.cpu_percent,
+            "memory_percent": system.memory_percent,
+            "memory_available_mb": system.memory_available_bytes / (1024 * 1024),
+            "disk_percent": system.disk_percent,
+            "disk_free_gb": system.disk_free_bytes / (1024 * 1024 * 1024),
+            "open_fds": system.open_fds,
+            "rss_mb": system.rss_bytes / (1024 * 1024),
+            "sampled_at": datetime.utcfromtimestamp(system.timestamp),
         }
     }
 
 
+@router.get("/health/system/history", tags=["Health"])
+async def system_history(seconds: int = Query(300, ge=1, le=86400)):
+    """
+    Recent system metric samples for short-term trends
+
+    Args:
+        seconds: How far back to look (limited by SYSTEM_METRICS_HISTORY)
+    """
+    samples = system_sampler.history(seconds)
+    return {
+        "interval_seconds": system_sampler.interval,
+        "samples": [sample.to_dict() for sample in samples],
+    }
+
+
 # ==========================================
 # SERVICE HEALTH CHECKS
 # ==========================================
 
 async def check_database() -> dict:
-    """Check database connectivity"""
+    """Check database connectivity and pool saturation"""
+    db_engine = database.engine
+    if db_engine is None:
+        return {
+            "status": "unhealthy",
+            "message": "Database engine not initialized",
+        }
+
+    # A saturated pool would make the probe itself queue for a connection
+    pool = pool_status(db_engine)
+    if pool and pool["saturation"] >= READINESS_POOL_SATURATION:
+        return {
+            "status": "degraded",
+            "message": f"Connection pool {pool['saturation']:.0%} saturated",
+            "pool": pool,
+        }
+
     try:
-        # TODO: Add actual database connection check
-        # from sqlalchemy import text
-        # async with db_session() as session:
-        #     await session.execute(text("SELECT 1"))
+        async with db_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
 
         return {
             "status": "healthy",
-            "critical": True,
             "message": "Database connected",
-            "response_time_ms": None,  # TODO: Measure actual response time
+            "pool": pool,
         }
     except Exception as e:
         return {
             "status": "unhealthy",
-            "critical": True,
             "message": f"Database error: {str(e)}",
-            "response_time_ms": None,
+            "pool": pool,
         }
 
 
 async def check_temporal() -> dict:
-    """Check Temporal connectivity"""
+    """Check Temporal connectivity (describe namespace)"""
     try:
-        # TODO: Add actual Temporal connection check
-        # from temporalio.client import Client
-        # client = await Client.connect(...)
-        # await client.list_workflows(...)
+        client = await get_temporal_client()
+        await client.workflow_service.describe_namespace(
+            DescribeNamespaceRequest(namespace=client.namespace)
+        )
 
         return {
             "status": "healthy",
-            "critical": True,
-            "message": "Temporal connected",
-            "response_time_ms": None,
+            "message": f"Temporal namespace {client.namespace} reachable",
         }
     except Exception as e:
         return {
             "status": "unhealthy",
-            "critical": True,
             "message": f"Temporal error: {str(e)}",
-            "response_time_ms": None,
         }
 
 
 async def check_redis() -> dict:
-    """Check Redis connectivity"""
+    """Check Redis connectivity (the rate limiter's pooled client)"""
+    client = getattr(rate_limiter_module.rate_limiter, "redis", None)
+    if client is None:
+        return {
+            "status": "healthy",
+            "message": "Redis not configured (in-memory rate limiting)",
+        }
+
+    pool = redis_pool_status(client)
+    if pool and pool["saturation"] >= READINESS_POOL_SATURATION:
+        return {
+            "status": "degraded",
+            "message": f"Connection pool {pool['saturation']:.0%} saturated",
+            "pool": pool,
+        }
+
     try:
-        # TODO: Add actual Redis connection check
-        # redis_client.ping()
+        if isinstance(client, AsyncRedis):
+            await client.ping()
+        else:
+            # Sync client: don't block the event loop
+            await asyncio.to_thread(client.ping)
 
         return {
             "status": "healthy",
-            "critical": False,  # Not critical if using in-memory fallback
             "message": "Redis connected",
-            "response_time_ms": None,
+            "pool": pool,
         }
     except Exception as e:
         return {
             "status": "unhealthy",
-            "critical": False,
             "message": f"Redis error: {str(e)}",
-            "response_time_ms": None,
+            "pool": pool,
         }
 
 
+def redis_pool_status(client) -> Optional[dict]:
+    """In-use connections of a redis-py connection pool"""
+    pool = getattr(client, "connection_pool", None)
+    max_connections = getattr(pool, "max_connections", None)
+    in_use = getattr(pool, "_in_use_connections", None)
+    if not max_connections or in_use is None or max_connections >= 2 ** 31:
+        return None
+
+    return {
+        "checked_out": len(in_use),
+        "capacity": max_connections,
+        "saturation": len(in_use) / max_connections,
+    }
+
+
 async def check_external_api(service_name: str) -> dict:
     """Check external API availability"""
     # Basic check - just verify API keys are set
@@ -263,6 +356,47 @@ async def check_external_api(service_name: str) -> dict:
     }
 
 
+# Timeout and result TTL apply to every check
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+HEALTH_CHECK_TTL = float(os.getenv("HEALTH_CHECK_TTL", "10"))
+
+
+def _cached(check, critical: bool) -> CachedCheck:
+    return CachedCheck(check, critical=critical, timeout=HEALTH_CHECK_TIMEOUT, ttl=HEALTH_CHECK_TTL)
+
+
+DEPENDENCY_CHECKS: Dict[str, CachedCheck] = {
+    "database": _cached(check_database, critical=True),
+    "temporal": _cached(check_temporal, critical=True),
+    "redis": _cached(check_redis, critical=False),  # Not critical if using in-memory fallback
+    "openai": _cached(partial(check_external_api, "openai"), critical=False),
+    "elevenlabs": _cached(partial(check_external_api, "elevenlabs"), critical=False),
+    "stripe": _cached(partial(check_external_api, "stripe"), critical=False),
+}
+
+
+def _readiness(check, critical: bool) -> CachedCheck:
+    return CachedCheck(
+        check,
+        critical=critical,
+        timeout=READINESS_TIMEOUT,
+        ttl=READINESS_TTL,
+        rise=READINESS_RISE,
+        fall=READINESS_FALL,
+    )
+
+
+READINESS_CHECKS: Dict[str, CachedCheck] = {
+    "database": _readiness(check_database, critical=True),
+    "redis": _readiness(check_redis, critical=True),  # Healthy when not configured
+    "temporal": _readiness(check_temporal, critical=True),
+}
+
+# Pool saturation (0-1), also used by readiness
+registry.gauge("app_db_pool_saturation", "Share of database pool connections checked out", multiprocess_mode="max").set_function(
+    lambda: (pool_status() or {}).get("saturation", 0.0))
+
+
 # ==========================================
 # METRICS ENDPOINT (Prometheus compatible)
 # ==========================================
@@ -274,30 +408,9 @@ async def metrics():
 
     Returns metrics in Prometheus text format
     Can be scraped by Prometheus/Grafana
+    Aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set
     """
-    uptime = time.time() - STARTUP_TIME
-    cpu_percent = psutil.cpu_percent(interval=0.1)
-    memory = psutil.virtual_memory()
-
-    metrics_text = f"""
-# HELP app_uptime_seconds Application uptime in seconds
-# TYPE app_uptime_seconds gauge
-app_uptime_seconds {uptime}
-
-# HELP app_cpu_usage_percent CPU usage percentage
-# TYPE app_cpu_usage_percent gauge
-app_cpu_usage_percent {cpu_percent}
-
-# HELP app_memory_usage_percent Memory usage percentage
-# TYPE app_memory_usage_percent gauge
-app_memory_usage_percent {memory.percent}
-
-# HELP app_memory_available_bytes Available memory in bytes
-# TYPE app_memory_available_bytes gauge
-app_memory_available_bytes {memory.available}
-"""
-
-    return metrics_text.strip()
+    return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
 
 
 # ==========================================
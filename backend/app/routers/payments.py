@@ -5,9 +5,15 @@ Revenue sharing between platform and content creators
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 from ..auth import get_current_active_user, TokenData
+from ..database import get_session
+from ..models import PaymentStatus
+from ..pagination import Page, decode_cursor, paginate
+from ..validation import validate_pagination
+from .. import repositories
 import os
 
 router = APIRouter()
@@ -41,6 +47,14 @@ class PaymentResponse(BaseModel):
     creator_amount: int
     created_at: datetime
 
+    class Config:
+        from_attributes = True
+
+class TransactionPage(Page[PaymentResponse]):
+    total: Optional[int]
+    skip: int
+    limit: int
+
 class RevenueShareResponse(BaseModel):
     total_revenue: int
     platform_fee: int
@@ -72,24 +86,26 @@ async def create_connect_account(
 
 @router.get("/connect/status")
 async def get_connect_status(
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Check Stripe Connect onboarding status for current user
     """
-    # TODO: Query database for user's stripe_account_id
+    user = await repositories.get_user(session, current_user.user_id)
     # TODO: Check account status with Stripe API
 
     return {
-        "connected": False,
-        "onboarding_complete": False,
+        "connected": bool(user and user.stripe_account_id),
+        "onboarding_complete": bool(user and user.stripe_onboarded),
         "payouts_enabled": False
     }
 
 @router.post("/charge", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
 async def create_charge(
     payment: PaymentCreateRequest,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Create a payment charge (for testing revenue sharing)
@@ -119,19 +135,24 @@ async def create_charge(
             detail="Revenue share calculation error"
         )
 
-    # TODO: Create Stripe PaymentIntent
+    # TODO: Create Stripe PaymentIntent (recorded as pending until then)
     # TODO: Transfer creator_amount to connected account
-    # TODO: Save payment to database
-
-    return {
-        "id": f"payment-{datetime.utcnow().timestamp()}",
-        "amount": payment.amount,
-        "currency": payment.currency,
-        "status": "succeeded",
-        "platform_fee": platform_fee,
-        "creator_amount": creator_amount,
-        "created_at": datetime.utcnow()
-    }
+    await repositories.ensure_user(session, current_user.user_id, current_user.email, current_user.role)
+    payment_id = repositories.new_id()
+    created = await repositories.create_payment(
+        session,
+        id=payment_id,
+        user_id=current_user.user_id,
+        amount=payment.amount,
+        stripe_payment_intent_id=f"pending_{payment_id}",
+        currency=payment.currency,
+        status=PaymentStatus.PENDING,
+        platform_fee=platform_fee,
+        creator_amount=creator_amount,
+        description=payment.description,
+    )
+    await session.commit()
+    return created
 
 @router.get("/revenue-share/calculate")
 async def calculate_revenue_share(
@@ -152,24 +173,36 @@ async def calculate_revenue_share(
         "platform_fee_percent": PLATFORM_FEE_PERCENT
     }
 
-@router.get("/transactions")
+@router.get("/transactions", response_model=TransactionPage)
 async def list_transactions(
     current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     """
-    List payment transactions for the current user
-    """
-    # TODO: Query database for user's payments
-    # TODO: Include both charges and transfers
+    List payment transactions for the current user, newest first
 
-    return {
-        "transactions": [],
-        "total": 0,
-        "skip": skip,
-        "limit": limit
-    }
+    Pass `next_cursor` back as `cursor` to get the next page. Cursor pages
+    cost the same at any depth and skip the total count (returned as null).
+    """
+    # TODO: Include transfers once Stripe Connect payouts are recorded
+    skip, limit = validate_pagination(skip, limit)
+    after = decode_cursor(cursor) if cursor else None
+
+    rows, total = await repositories.list_payments(
+        session, current_user.user_id, skip=skip, limit=limit + 1, after=after, count=after is None
+    )
+    payments, next_cursor = paginate(rows, limit)
+
+    return TransactionPage(
+        items=[PaymentResponse.model_validate(p) for p in payments],
+        next_cursor=next_cursor,
+        total=total,
+        skip=skip,
+        limit=limit
+    )
 
 @router.post("/webhook/stripe", include_in_schema=False)
 async def stripe_webhook(request: Request):
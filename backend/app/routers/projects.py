@@ -5,12 +5,23 @@ Create, read, update, delete projects
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from ..auth import get_current_active_user, TokenData
+from ..database import get_session
+from ..models import Project, ProjectStatus
+from ..pagination import Page, decode_cursor, paginate
+from ..validation import MAX_SCRIPT_LENGTH, validate_pagination
+from .. import repositories
+from .workflows import release_workflow_slot
 
 router = APIRouter()
 
+# Script candidates accepted per ingestion request
+MAX_SCRIPT_BATCH = 1000
+
 # ==========================================
 # SCHEMAS
 # ==========================================
@@ -33,116 +44,218 @@ class ProjectResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        from_attributes = True
+
 class ProjectUpdate(BaseModel):
     title: Optional[str] = None
     status: Optional[str] = None
     target_duration: Optional[int] = None
 
+class ScriptCandidate(BaseModel):
+    id: Optional[str] = None
+    content: str
+    word_count: int
+    estimated_duration: int
+    score: float = 0.0
+    reasoning_path: str = "creative"
+    visual_cues: Optional[list] = None
+
+class ScriptBatchCreate(BaseModel):
+    candidates: List[ScriptCandidate]
+    project_status: Optional[ProjectStatus] = ProjectStatus.AWAITING_SCRIPT_APPROVAL
+
+class ScriptBatchResponse(BaseModel):
+    project_id: str
+    inserted: int
+    script_ids: List[str]
+    status: str
+
+# ==========================================
+# HELPERS
+# ==========================================
+
+async def get_owned_project(session: AsyncSession, project_id: str, current_user: TokenData) -> Project:
+    """
+    Load a project the current user may access (admins may access any)
+
+    Raises:
+        HTTPException: 404 if the project does not exist or is not the user's
+    """
+    owner_id = None if current_user.role == "admin" else current_user.user_id
+    project = await repositories.get_project(session, project_id, owner_id=owner_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return project
+
 # ==========================================
 # ENDPOINTS
 # ==========================================
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("/", response_model=Page[ProjectResponse])
 async def list_projects(
     current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[ProjectStatus] = None
 ):
     """
-    List all projects for the current user
+    List all projects for the current user, newest first
+
+    Pass `next_cursor` back as `cursor` to get the next page (constant cost
+    at any depth); skip/limit offsets still work.
+    Optionally filtered by `status`.
     """
-    # TODO: Query database for projects
-    # For now, return mock data
-    return [
-        {
-            "id": "project-1",
-            "owner_id": current_user.user_id,
-            "title": "Sample Project",
-            "niche_id": "technology",
-            "channel_id": "channel-123",
-            "status": "draft",
-            "target_duration": 60,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-    ]
+    skip, limit = validate_pagination(skip, limit)
+    after = decode_cursor(cursor) if cursor else None
+
+    rows = await repositories.list_projects(
+        session, current_user.user_id, skip=skip, limit=limit + 1, after=after, status=status
+    )
+    projects, next_cursor = paginate(rows, limit)
+    return Page(items=projects, next_cursor=next_cursor)
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: ProjectCreate,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Create a new project
     """
-    # TODO: Create project in database
-    # For now, return mock data
-    return {
-        "id": f"project-{datetime.utcnow().timestamp()}",
-        "owner_id": current_user.user_id,
-        "title": project.title,
-        "niche_id": project.niche_id,
-        "channel_id": project.channel_id,
-        "status": "draft",
-        "target_duration": project.target_duration,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
-    }
+    await repositories.ensure_user(session, current_user.user_id, current_user.email, current_user.role)
+    created = await repositories.create_project(
+        session,
+        owner_id=current_user.user_id,
+        title=project.title,
+        niche_id=project.niche_id,
+        channel_id=project.channel_id,
+        target_duration=project.target_duration,
+        voice_clone_id=project.voice_clone_id,
+    )
+    await session.commit()
+    return created
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Get a specific project by ID
     """
-    # TODO: Query database for project
-    # TODO: Verify ownership
-    return {
-        "id": project_id,
-        "owner_id": current_user.user_id,
-        "title": "Sample Project",
-        "niche_id": "technology",
-        "channel_id": "channel-123",
-        "status": "draft",
-        "target_duration": 60,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
-    }
+    return await get_owned_project(session, project_id, current_user)
 
 @router.patch("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: str,
     updates: ProjectUpdate,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Update a project
+
+    Moving it to published, failed or cancelled finishes its workflow and
+    frees the owner's workflow concurrency slot.
     """
-    # TODO: Update project in database
-    # TODO: Verify ownership
-    return {
-        "id": project_id,
-        "owner_id": current_user.user_id,
-        "title": updates.title or "Sample Project",
-        "niche_id": "technology",
-        "channel_id": "channel-123",
-        "status": updates.status or "draft",
-        "target_duration": updates.target_duration or 60,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
-    }
+    project = await get_owned_project(session, project_id, current_user)
+
+    new_status = None
+    if updates.status is not None:
+        try:
+            new_status = ProjectStatus(updates.status)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {updates.status}"
+            )
+
+    project = await repositories.update_project(
+        session,
+        project,
+        title=updates.title,
+        status=new_status,
+        target_duration=updates.target_duration,
+    )
+    await session.commit()
+
+    if new_status is not None:
+        await release_workflow_slot(project)
+    return project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Delete a project
     """
-    # TODO: Delete project from database
-    # TODO: Verify ownership
+    project = await get_owned_project(session, project_id, current_user)
     # TODO: Cancel any running Temporal workflows
+    await repositories.delete_project(session, project)
+    await session.commit()
     return None
+
+@router.post("/{project_id}/scripts", response_model=ScriptBatchResponse, status_code=status.HTTP_201_CREATED)
+async def ingest_scripts(
+    project_id: str,
+    batch: ScriptBatchCreate,
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Store a generation round of script candidates (beam search output)
+
+    All candidates are inserted with one statement and the project moves to
+    `project_status` (awaiting script approval by default) in the same
+    transaction; on any error nothing is stored.
+    """
+    if not batch.candidates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No script candidates"
+        )
+    if len(batch.candidates) > MAX_SCRIPT_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many script candidates (maximum {MAX_SCRIPT_BATCH})"
+        )
+    if any(len(candidate.content) > MAX_SCRIPT_LENGTH for candidate in batch.candidates):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Script too long (maximum {MAX_SCRIPT_LENGTH} characters)"
+        )
+
+    project = await get_owned_project(session, project_id, current_user)
+
+    try:
+        script_ids = await repositories.bulk_create_scripts(
+            session,
+            project.id,
+            [candidate.model_dump() for candidate in batch.candidates],
+            project_status=batch.project_status,
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Script candidate IDs already exist"
+        )
+
+    return {
+        "project_id": project.id,
+        "inserted": len(script_ids),
+        "script_ids": script_ids,
+        "status": project.status.value,
+    }
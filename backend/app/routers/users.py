@@ -5,9 +5,15 @@ Handles avatar upload, profile updates, and user settings
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 from ..auth import get_current_active_user, TokenData, UserResponse
+from ..database import get_session
+from ..models import User
+from .. import repositories
+import asyncio
 import os
 import uuid
 from pathlib import Path
@@ -41,56 +47,101 @@ class UserProfileResponse(BaseModel):
     created_at: datetime
     last_login_at: Optional[datetime] = None
 
+    class Config:
+        from_attributes = True
+
+# ==========================================
+# HELPERS
+# ==========================================
+
+async def get_current_db_user(session: AsyncSession, current_user: TokenData) -> User:
+    """
+    Load the authenticated user's record (created on first use)
+
+    Raises:
+        HTTPException: 404 if the token's user has no record and none can be
+            created (its email belongs to another user)
+    """
+    user = await repositories.get_user(session, current_user.user_id)
+    if user is None:
+        await repositories.ensure_user(session, current_user.user_id, current_user.email, current_user.role)
+        await session.commit()
+        user = await repositories.get_user(session, current_user.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+def _avatar_path(avatar_url: Optional[str]) -> Optional[Path]:
+    """Local file behind an avatar URL we issued, if any"""
+    prefix = "/uploads/avatars/"
+    if not avatar_url or not avatar_url.startswith(prefix):
+        return None
+    return UPLOAD_DIR / Path(avatar_url[len(prefix):]).name
+
+def _save_upload(source, destination: Path) -> None:
+    with destination.open("wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
 # ==========================================
 # ENDPOINTS
 # ==========================================
 
 @router.get("/me", response_model=UserProfileResponse)
 async def get_current_user_profile(
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Get current user's profile
     """
-    # TODO: Query database for full user profile
-    # Mock response for now
-    return {
-        "id": current_user.user_id,
-        "email": current_user.email,
-        "full_name": "Demo User",
-        "role": current_user.role or "client",
-        "avatar_url": None,
-        "is_active": True,
-        "created_at": datetime.utcnow(),
-        "last_login_at": None
-    }
+    return await get_current_db_user(session, current_user)
 
 @router.put("/me", response_model=UserProfileResponse)
 async def update_user_profile(
     profile: UserProfileUpdate,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Update current user's profile
     """
-    # TODO: Update database with new profile data
+    user = await get_current_db_user(session, current_user)
+
     # Validate email uniqueness if email is being changed
-    # Mock response for now
-    return {
-        "id": current_user.user_id,
-        "email": profile.email or current_user.email,
-        "full_name": profile.full_name or "Demo User",
-        "role": current_user.role or "client",
-        "avatar_url": None,
-        "is_active": True,
-        "created_at": datetime.utcnow(),
-        "last_login_at": None
-    }
+    if profile.email and profile.email != user.email:
+        if await repositories.get_user_by_email(session, profile.email) is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Email already in use"
+            )
+
+    try:
+        user = await repositories.update_user(
+            session,
+            user,
+            email=profile.email,
+            full_name=profile.full_name,
+            updated_at=datetime.utcnow(),
+        )
+        await session.commit()
+    except IntegrityError:
+        # Another request took the email after the check above
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already in use"
+        )
+    return user
 
 @router.post("/me/avatar", status_code=status.HTTP_201_CREATED)
 async def upload_avatar(
     file: UploadFile = File(...),
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Upload user avatar image
@@ -115,21 +166,26 @@ async def upload_avatar(
             detail=f"File too large. Max size: {MAX_AVATAR_SIZE / 1024 / 1024}MB"
         )
 
+    user = await get_current_db_user(session, current_user)
+
     # Generate unique filename
     file_id = str(uuid.uuid4())
     filename = f"{current_user.user_id}_{file_id}{file_ext}"
     file_path = UPLOAD_DIR / filename
 
     try:
-        # Save file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file (off the event loop)
+        await asyncio.to_thread(_save_upload, file.file, file_path)
 
         # Generate URL (in production, use CDN or S3)
         avatar_url = f"/uploads/avatars/{filename}"
 
-        # TODO: Update database with avatar_url
-        # TODO: Delete old avatar file if exists
+        old_path = _avatar_path(user.avatar_url)
+        await repositories.update_user(session, user, avatar_url=avatar_url)
+        await session.commit()
+
+        if old_path is not None and old_path != file_path:
+            old_path.unlink(missing_ok=True)
 
         return {
             "avatar_url": avatar_url,
@@ -148,16 +204,20 @@ async def upload_avatar(
 
 @router.delete("/me/avatar", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_avatar(
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Delete user's avatar
     """
-    # TODO: Query database for current avatar_url
-    # TODO: Delete file from storage
-    # TODO: Update database to set avatar_url to NULL
+    user = await get_current_db_user(session, current_user)
+    old_path = _avatar_path(user.avatar_url)
+
+    user.avatar_url = None
+    await session.commit()
 
-    # Mock response for now
+    if old_path is not None:
+        old_path.unlink(missing_ok=True)
     return None
 
 @router.get("/me/settings")
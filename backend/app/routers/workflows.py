@@ -3,14 +3,34 @@ Temporal workflow management API router
 Start, monitor, and control content generation workflows
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 from ..auth import get_current_active_user, TokenData
+from ..database import get_session
+from ..models import Project, ProjectStatus
+from .. import repositories
+from ..rate_limiter import (
+    check_rate_limit,
+    cost_for_duration,
+    acquire_concurrency_slot,
+    release_concurrency_slot,
+)
 
 router = APIRouter()
 
+# Workflow states that no longer hold a concurrency slot
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "terminated", "timed_out"}
+
+# Project statuses the workflow leaves behind when it finishes
+FINISHED_PROJECT_STATUSES = {
+    ProjectStatus.PUBLISHED: "completed",
+    ProjectStatus.FAILED: "failed",
+    ProjectStatus.CANCELLED: "cancelled",
+}
+
 # ==========================================
 # SCHEMAS
 # ==========================================
@@ -38,6 +58,37 @@ class WorkflowStatusResponse(BaseModel):
     progress_percent: int
     errors: Optional[list] = None
 
+# ==========================================
+# HELPERS
+# ==========================================
+
+async def get_workflow_project(session: AsyncSession, workflow_id: str, current_user: TokenData) -> Project:
+    """
+    Project running a workflow, if the current user may access it
+
+    Raises:
+        HTTPException: 404 if no accessible project runs this workflow
+    """
+    owner_id = None if current_user.role == "admin" else current_user.user_id
+    project = await repositories.get_project_by_workflow(session, workflow_id, owner_id=owner_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow not found"
+        )
+    return project
+
+async def release_workflow_slot(project: Project) -> None:
+    """
+    Free the concurrency slot of a project's workflow once it has finished
+
+    Called when the project moves to a finished status. The slot is held
+    by the owner, who may not be the user making the change (an admin).
+    Safe to call more than once.
+    """
+    if project.temporal_workflow_id and project.status in FINISHED_PROJECT_STATUSES:
+        await release_concurrency_slot("workflows", project.owner_id, project.temporal_workflow_id)
+
 # ==========================================
 # ENDPOINTS
 # ==========================================
@@ -45,18 +96,52 @@ class WorkflowStatusResponse(BaseModel):
 @router.post("/start", response_model=WorkflowResponse, status_code=status.HTTP_201_CREATED)
 async def start_workflow(
     request: WorkflowStartRequest,
-    current_user: TokenData = Depends(get_current_active_user)
+    http_request: Request,
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Start a new content generation workflow
+
+    Rate limited by video minutes (longer videos cost more) and by the
+    number of workflows the user already has running. Starts rejected for
+    another reason do not spend video minutes.
     """
-    # TODO: Initialize Temporal client
-    # TODO: Start contentCreationWorkflow
-    # TODO: Save workflow_id and run_id to database
+    project = await repositories.get_project(session, request.project_id, owner_id=current_user.user_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
 
     workflow_id = f"workflow-{datetime.utcnow().timestamp()}"
     run_id = f"run-{datetime.utcnow().timestamp()}"
 
+    # Released when the project is marked finished (release_workflow_slot)
+    await acquire_concurrency_slot("workflows", current_user.user_id, workflow_id)
+
+    try:
+        # Charge the video-minute budget only once the start can go ahead
+        await check_rate_limit(
+            http_request,
+            user_id=current_user.user_id,
+            user_role=current_user.role,
+            cost=cost_for_duration(request.target_duration),
+        )
+
+        # TODO: Start contentCreationWorkflow on the Temporal client
+        await repositories.update_project(
+            session,
+            project,
+            temporal_workflow_id=workflow_id,
+            temporal_run_id=run_id,
+            status=ProjectStatus.SCRIPT_GENERATION,
+        )
+        await session.commit()
+    except Exception:
+        await release_concurrency_slot("workflows", current_user.user_id, workflow_id)
+        raise
+
     return {
         "workflow_id": workflow_id,
         "run_id": run_id,
@@ -68,34 +153,40 @@ async def start_workflow(
 @router.get("/{workflow_id}/status", response_model=WorkflowStatusResponse)
 async def get_workflow_status(
     workflow_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Get the current status of a workflow
     """
+    project = await get_workflow_project(session, workflow_id, current_user)
     # TODO: Query Temporal for workflow status
-    # TODO: Verify ownership
+    workflow_status = FINISHED_PROJECT_STATUSES.get(project.status, "running")
 
     return {
         "workflow_id": workflow_id,
-        "run_id": f"run-{workflow_id}",
-        "status": "running",
-        "current_phase": "script_generation",
-        "progress_percent": 30,
+        "run_id": project.temporal_run_id or f"run-{workflow_id}",
+        "status": workflow_status,
+        "current_phase": project.status.value if project.status else "script_generation",
+        "progress_percent": 100 if workflow_status in TERMINAL_STATUSES else 30,
         "errors": None
     }
 
 @router.post("/{workflow_id}/cancel", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_workflow(
     workflow_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Cancel a running workflow
     """
+    project = await get_workflow_project(session, workflow_id, current_user)
     # TODO: Send cancel signal to Temporal workflow
-    # TODO: Verify ownership
-    # TODO: Update project status in database
+
+    await repositories.update_project(session, project, status=ProjectStatus.CANCELLED)
+    await session.commit()
+    await release_workflow_slot(project)
 
     return None
 
@@ -103,14 +194,24 @@ async def cancel_workflow(
 async def approve_script(
     workflow_id: str,
     script_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Approve a script during workflow execution
     Sends a signal to the waiting Temporal workflow
     """
+    project = await get_workflow_project(session, workflow_id, current_user)
+    script = await repositories.get_script(session, script_id, project_id=project.id)
+    if script is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Script not found"
+        )
+
+    await repositories.approve_script(session, script)
+    await session.commit()
     # TODO: Send approval signal to Temporal workflow
-    # TODO: Verify ownership
 
     return {
         "status": "approved",
@@ -125,14 +226,15 @@ async def approve_qc(
     title: str,
     description: str,
     tags: list,
-    current_user: TokenData = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_active_user),
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Approve final QC during workflow execution
     Sends a signal to the waiting Temporal workflow
     """
+    await get_workflow_project(session, workflow_id, current_user)
     # TODO: Send QC approval signal to Temporal workflow
-    # TODO: Verify ownership
 
     return {
         "status": "approved",
@@ -0,0 +1,288 @@
+"""
+Shared-memory rate limiter for multi-worker deployments
+
+All uvicorn workers on one host map the same file (under /dev/shm by
+default) holding a fixed-size hash table of sliding window counters, so
+they enforce a single budget without a network round trip.
+
+Each geometry (slots, buckets per window) gets its own file, named after
+it: a worker started with a different configuration (e.g. during a
+rolling restart) creates a new table instead of resizing one that older
+workers still have mapped. Files of retired geometries are left behind
+until the host's /dev/shm is cleared.
+
+Layout:
+- 64-byte header (magic, version, geometry)
+- Slots grouped in stripes of SLOTS_PER_STRIPE; an identifier hashes to
+  one stripe and may use any slot in it. Each stripe has its own
+  fcntl byte-range lock, so workers only contend on the same stripe.
+
+Slot layout (little-endian):
+    key (Q) | window (I) | total (I) | last_seen (d) | head (q) | first (q) | counts (I * buckets)
+
+A slot is free when empty or when its window has fully passed. When a
+stripe is full, the least recently used slot is taken over.
+"""
+
+from typing import Callable, Tuple
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+MAGIC = b"FARL"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sIIII")       # magic, version, slots, buckets, slots per stripe
+HEADER_SIZE = 64
+_SLOT = struct.Struct("<QIIdqq")         # key, window, total, last_seen, head, first
+SLOT_HEADER_SIZE = _SLOT.size            # 40 bytes, keeps counts 4-byte aligned
+
+SLOTS_PER_STRIPE = 8
+NO_BUCKET = -1
+
+
+def default_shm_path() -> str:
+    """Shared file location: tmpfs when available"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "faceless-rate-limit")
+
+
+def geometry_path(prefix: str, slots: int, buckets: int) -> str:
+    """Table file for one geometry"""
+    return f"{prefix}-v{VERSION}-{slots}x{buckets}x{SLOTS_PER_STRIPE}"
+
+
+class SharedMemoryRateLimiter:
+    """
+    Host-wide sliding window rate limiter backed by an mmap'd hash table
+    Same bucketed algorithm and (is_allowed, info) contract as
+    InMemoryRateLimiter.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        slots: int = 16_384,
+        buckets_per_window: int = 30,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open (or create) the shared table
+
+        Args:
+            path: Shared file path prefix (defaults to /dev/shm/faceless-rate-limit);
+                the geometry is appended to it
+            slots: Number of identifier slots (memory cap), rounded up to a stripe
+            buckets_per_window: Window resolution
+            clock: Time source, overridable for tests
+        """
+        self.stripes = max(1, -(-slots // SLOTS_PER_STRIPE))
+        self.slots = self.stripes * SLOTS_PER_STRIPE
+        self.buckets = buckets_per_window
+        self.clock = clock
+        self.path = geometry_path(path or default_shm_path(), self.slots, self.buckets)
+
+        self.slot_size = SLOT_HEADER_SIZE + 4 * self.buckets
+        self.stripe_size = self.slot_size * SLOTS_PER_STRIPE
+        self.size = HEADER_SIZE + self.stripe_size * self.stripes
+
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._initialize()
+        except Exception:
+            os.close(self.fd)
+            raise
+        self.mm = mmap.mmap(self.fd, self.size)
+        self.counts = memoryview(self.mm).cast("I")
+
+        # fcntl locks are per process; this serialises threads within one
+        self._thread_lock = threading.Lock()
+
+    def _initialize(self) -> None:
+        """
+        Size and label a new table file
+
+        An existing table is never resized: other workers may have it
+        mapped, and shrinking a mapped file makes their accesses fault.
+
+        Raises:
+            ValueError: If the file holds something other than this table
+        """
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            expected = _HEADER.pack(MAGIC, VERSION, self.slots, self.buckets, SLOTS_PER_STRIPE)
+            if os.fstat(self.fd).st_size == 0:
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, expected, 0)
+            elif os.fstat(self.fd).st_size != self.size or os.pread(self.fd, _HEADER.size, 0) != expected:
+                raise ValueError(f"{self.path} is not a rate limit table with this geometry")
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+
+    def close(self) -> None:
+        """Unmap the table (the file is left for other workers)"""
+        self.counts.release()
+        self.mm.close()
+        os.close(self.fd)
+
+    def is_allowed(self, identifier: str, limit: int, window: int, cost: int = 1) -> Tuple[bool, dict]:
+        """
+        Check if request is allowed
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            limit: Maximum requests allowed in window
+            window: Time window in seconds
+            cost: Budget units this request consumes
+
+        Returns:
+            (is_allowed, rate_limit_info)
+        """
+        current_time = self.clock()
+        buckets = self.buckets
+        bucket_width = window / buckets
+        now_bucket = int(current_time // bucket_width)
+
+        key, stripe_offset = self._locate(identifier, window)
+
+        with self._thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.stripe_size, stripe_offset)
+            try:
+                offset = self._find_slot(stripe_offset, key, window, current_time, now_bucket)
+                _, _, total, _, head, first = _SLOT.unpack_from(self.mm, offset)
+                base = (offset + SLOT_HEADER_SIZE) // 4
+                counts = self.counts
+
+                # Expire buckets that have slid out of the window
+                elapsed = now_bucket - head
+                if elapsed >= buckets:
+                    self.mm[offset + SLOT_HEADER_SIZE:offset + self.slot_size] = bytes(4 * buckets)
+                    total = 0
+                    first = NO_BUCKET
+                    head = now_bucket
+                elif elapsed > 0:
+                    for bucket in range(head + 1, now_bucket + 1):
+                        index = base + bucket % buckets
+                        total -= counts[index]
+                        counts[index] = 0
+                    if first != NO_BUCKET and first <= now_bucket - buckets:
+                        first = NO_BUCKET
+                        for bucket in range(now_bucket - buckets + 1, now_bucket + 1):
+                            if counts[base + bucket % buckets]:
+                                first = bucket
+                                break
+                    head = now_bucket
+
+                total_requests = total
+                is_allowed = total_requests + cost <= limit
+                if is_allowed:
+                    counts[base + head % buckets] += cost
+                    total += cost
+                    if first == NO_BUCKET:
+                        first = head
+
+                _SLOT.pack_into(self.mm, offset, key, window, total, current_time, head, first)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.stripe_size, stripe_offset)
+
+        # Calculate time until reset
+        if first != NO_BUCKET:
+            reset_time = first * bucket_width + window
+            retry_after = max(0, int(reset_time - current_time))
+        else:
+            reset_time = current_time + window
+            retry_after = 0
+
+        rate_limit_info = {
+            "limit": limit,
+            "remaining": max(0, limit - total_requests - (cost if is_allowed else 0)),
+            "reset": int(reset_time),
+            "retry_after": retry_after if not is_allowed else None,
+        }
+
+        return is_allowed, rate_limit_info
+
+    def refund(self, identifier: str, window: int, cost: int = 1) -> None:
+        """
+        Give back budget an allowed request consumed (newest buckets first)
+
+        Args:
+            identifier: Unique identifier (user ID or IP)
+            window: Time window in seconds
+            cost: Budget units to return
+        """
+        buckets = self.buckets
+        key, stripe_offset = self._locate(identifier, window)
+
+        with self._thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.stripe_size, stripe_offset)
+            try:
+                for i in range(SLOTS_PER_STRIPE):
+                    offset = stripe_offset + i * self.slot_size
+                    slot_key, _, total, last_seen, head, first = _SLOT.unpack_from(self.mm, offset)
+                    if slot_key == key:
+                        break
+                else:
+                    return
+
+                base = (offset + SLOT_HEADER_SIZE) // 4
+                counts = self.counts
+                bucket = head
+                while cost > 0 and first != NO_BUCKET and bucket >= first:
+                    index = base + bucket % buckets
+                    taken = min(cost, counts[index])
+                    counts[index] -= taken
+                    total -= taken
+                    cost -= taken
+                    bucket -= 1
+                if total == 0:
+                    first = NO_BUCKET
+
+                _SLOT.pack_into(self.mm, offset, key, window, total, last_seen, head, first)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.stripe_size, stripe_offset)
+
+    def _locate(self, identifier: str, window: int) -> Tuple[int, int]:
+        """(slot key, stripe offset) for an identifier and window"""
+        digest = hashlib.blake2b(f"{window}:{identifier}".encode(), digest_size=8).digest()
+        key = int.from_bytes(digest, "little") or 1
+        return key, HEADER_SIZE + key % self.stripes * self.stripe_size
+
+    def _find_slot(self, stripe_offset: int, key: int, window: int, current_time: float, now_bucket: int) -> int:
+        """
+        Offset of the slot for `key` within a stripe, claiming one if needed
+        Caller must hold the stripe lock.
+        """
+        victim = None
+        victim_seen = float("inf")
+
+        for i in range(SLOTS_PER_STRIPE):
+            offset = stripe_offset + i * self.slot_size
+            slot_key, slot_window, _, last_seen, _, _ = _SLOT.unpack_from(self.mm, offset)
+            if slot_key == key:
+                return offset
+
+            # Empty or expired slots sort before any live one
+            if slot_key == 0 or last_seen + slot_window <= current_time:
+                last_seen = -1.0
+            if last_seen < victim_seen:
+                victim, victim_seen = offset, last_seen
+
+        self.mm[victim + SLOT_HEADER_SIZE:victim + self.slot_size] = bytes(4 * self.buckets)
+        _SLOT.pack_into(self.mm, victim, key, window, 0, current_time, now_bucket, NO_BUCKET)
+        return victim
+
+    def __len__(self) -> int:
+        """Number of live identifiers (scans the table; for diagnostics)"""
+        current_time = self.clock()
+        live = 0
+        for i in range(self.slots):
+            slot_key, slot_window, _, last_seen, _, _ = _SLOT.unpack_from(self.mm, HEADER_SIZE + i * self.slot_size)
+            if slot_key and last_seen + slot_window > current_time:
+                live += 1
+        return live
@@ -0,0 +1,139 @@
+"""
+Background system metrics sampler
+
+psutil calls such as cpu_percent(interval=0.1) block the caller, so they
+must not run inside request handlers. A daemon thread samples host and
+process metrics on a fixed interval; endpoints read the latest snapshot
+and a short ring buffer of history without touching psutil.
+"""
+
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+class SystemSnapshot(NamedTuple):
+    """One sample of host and process metrics"""
+
+    timestamp: float                # Unix time of the sample
+    cpu_percent: float              # Host CPU since the previous sample
+    memory_percent: float
+    memory_available_bytes: int
+    disk_percent: float
+    disk_free_bytes: int
+    open_fds: int                   # This process (handles on Windows)
+    rss_bytes: int                  # This process
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class SystemMetricsSampler:
+    """
+    Samples system metrics in a background thread
+
+    CPU usage is measured between consecutive samples, so it reflects the
+    whole interval instead of a 100 ms window.
+    """
+
+    def __init__(self, interval: float = 5.0, history: int = 120, disk_path: str = "/"):
+        """
+        Args:
+            interval: Seconds between samples
+            history: Number of samples kept for trend queries
+            disk_path: Filesystem to report usage for
+        """
+        self.interval = interval
+        self.disk_path = disk_path
+        self._history: Deque[SystemSnapshot] = deque(maxlen=history)
+        self._latest: Optional[SystemSnapshot] = None
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> SystemSnapshot:
+        """Take one sample now and record it"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        process = self._process
+        open_fds = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+
+        snapshot = SystemSnapshot(
+            timestamp=time.time(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=memory.percent,
+            memory_available_bytes=memory.available,
+            disk_percent=disk.percent,
+            disk_free_bytes=disk.free,
+            open_fds=open_fds,
+            rss_bytes=process.memory_info().rss,
+        )
+
+        # deque.append and attribute assignment are atomic, readers need no lock
+        self._history.append(snapshot)
+        self._latest = snapshot
+        return snapshot
+
+    @property
+    def latest(self) -> SystemSnapshot:
+        """Most recent snapshot (sampled on demand if the sampler never ran)"""
+        snapshot = self._latest
+        if snapshot is None:
+            snapshot = self.sample()
+        return snapshot
+
+    def history(self, seconds: Optional[float] = None) -> List[SystemSnapshot]:
+        """
+        Recorded snapshots, oldest first
+
+        Args:
+            seconds: Only return samples from the last N seconds
+
+        Returns:
+            List of snapshots
+        """
+        snapshots = list(self._history)
+        if seconds is not None:
+            cutoff = time.time() - seconds
+            snapshots = [snapshot for snapshot in snapshots if snapshot.timestamp >= cutoff]
+        return snapshots
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        # Also primes cpu_percent so the next sample covers one interval
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="system-metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"System metrics sample failed: {str(e)}")
+
+
+# Global sampler instance (started in the app lifespan)
+system_sampler = SystemMetricsSampler(
+    interval=float(os.getenv("SYSTEM_METRICS_INTERVAL", "5")),
+    history=int(os.getenv("SYSTEM_METRICS_HISTORY", "120")),
+)
@@ -0,0 +1,74 @@
+"""
+Temporal client
+
+One shared client per worker, connected lazily on first use. Supports
+local dev servers and Temporal Cloud (mTLS), configured the same way as
+the TypeScript workers (see TEMPORAL-SETUP-GUIDE.md).
+"""
+
+from typing import Optional
+import asyncio
+import os
+
+from temporalio.client import Client, TLSConfig
+
+TEMPORAL_ADDRESS = os.getenv("TEMPORAL_ADDRESS", "localhost:7233")
+TEMPORAL_NAMESPACE = os.getenv("TEMPORAL_NAMESPACE", "default")
+
+_client: Optional[Client] = None
+_connect_lock: Optional[asyncio.Lock] = None
+
+
+def _tls_config() -> Optional[TLSConfig]:
+    """mTLS config for Temporal Cloud, None for local servers"""
+    if os.getenv("TEMPORAL_CLOUD", "false").lower() != "true":
+        return None
+
+    with open(os.getenv("TEMPORAL_CLIENT_CERT_PATH", "./certs/client.pem"), "rb") as f:
+        client_cert = f.read()
+    with open(os.getenv("TEMPORAL_CLIENT_KEY_PATH", "./certs/client-key.pem"), "rb") as f:
+        client_private_key = f.read()
+
+    return TLSConfig(client_cert=client_cert, client_private_key=client_private_key)
+
+
+async def get_temporal_client() -> Client:
+    """
+    Shared Temporal client, connecting on first call
+
+    Returns:
+        Connected client
+
+    Raises:
+        RuntimeError: If the server cannot be reached
+    """
+    global _client, _connect_lock
+
+    if _client is not None:
+        return _client
+
+    if _connect_lock is None:
+        _connect_lock = asyncio.Lock()
+
+    async with _connect_lock:
+        if _client is None:
+            _client = await Client.connect(
+                TEMPORAL_ADDRESS,
+                namespace=TEMPORAL_NAMESPACE,
+                tls=_tls_config() or False,
+            )
+
+    return _client
+
+
+def get_connected_client() -> Optional[Client]:
+    """Shared client if already connected (never connects)"""
+    return _client
+
+
+def close_temporal_client() -> None:
+    """Drop the shared client (the connection closes with it)"""
+    global _client, _connect_lock
+
+    _client = None
+    _connect_lock = None
@@ -0,0 +1,212 @@
+"""
+Trace sampling policy for Sentry
+
+Rules are keyed and matched like rate limit rules (the same RouteTrie):
+"<METHOD> <path>", where METHOD may be "*" and path segments may be
+literals, "{param}" or a trailing "*" (which also matches the prefix
+itself). The most specific matching rule wins.
+
+Rule options:
+- rate: Probability a trace is kept (0-1)
+- slow_ms: Latency above which a trace counts as slow (tail mode)
+
+Modes (TRACE_SAMPLING_MODE):
+- head: traces_sampler decides up front using the route's rate
+- tail: every request is traced in-process; before_send_transaction ships
+  only slow or errored traces, plus a `rate` share of the rest
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import json
+import os
+import random
+
+from .metrics import registry
+from .rate_limit_rules import RouteTrie
+
+DEFAULT_TRACE_RULES: Dict[str, dict] = {
+    # Probes and scrapes: never traced unless slow/errored in tail mode
+    "* /health": {"rate": 0.0},
+    "* /api/health/*": {"rate": 0.0},
+    "GET /api/metrics": {"rate": 0.0},
+    # Rare, expensive and business-critical
+    "POST /api/workflows/start": {"rate": 1.0, "slow_ms": 5000},
+    "* /api/payments/*": {"rate": 0.5, "slow_ms": 2000},
+}
+
+# Span statuses that mean the request failed server-side
+ERROR_STATUSES = frozenset({
+    "internal_error", "unknown_error", "unknown", "unavailable",
+    "deadline_exceeded", "data_loss", "aborted",
+})
+
+TRACE_DECISIONS = registry.counter(
+    "app_trace_sampling_decisions_total",
+    "Trace sampling decisions",
+    ("mode", "decision"),
+)
+
+
+# ==========================================
+# RULES
+# ==========================================
+
+class TraceRule:
+    """A compiled sampling rule"""
+
+    __slots__ = ("key", "rate", "slow_ms")
+
+    def __init__(self, key: str, rate: float, slow_ms: float):
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Trace sampling rate must be between 0 and 1 in rule {key!r}")
+
+        self.key = key
+        self.rate = rate
+        self.slow_ms = slow_ms
+
+
+# ==========================================
+# SAMPLER
+# ==========================================
+
+class TraceSampler:
+    """Per-route head sampling and buffered tail sampling"""
+
+    def __init__(
+        self,
+        rules: Dict[str, dict],
+        default_rate: float,
+        default_slow_ms: float = 1000.0,
+        mode: str = "head",
+        rand: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            rules: Rules by "<METHOD> <path>" key
+            default_rate: Rate for requests no rule matches
+            default_slow_ms: Slow threshold for rules without slow_ms
+            mode: "head" or "tail"
+            rand: Random source, overridable for tests
+        """
+        if mode not in ("head", "tail"):
+            raise ValueError(f"Invalid trace sampling mode: {mode}")
+
+        self.mode = mode
+        self.default_rate = default_rate
+        self.default_slow_ms = default_slow_ms
+        self.rand = rand
+        self.rules = RouteTrie("trace sampling")
+        for key, config in rules.items():
+            rate = float(config.get("rate", default_rate))
+            self.rules.add(key, TraceRule(key, rate, float(config.get("slow_ms", default_slow_ms))))
+
+    def rule_for(self, method: str, path: str) -> Optional[TraceRule]:
+        """
+        Most specific rule for a request
+
+        Args:
+            method: HTTP method
+            path: Raw path or route template
+
+        Returns:
+            Matching rule or None
+        """
+        matched = self.rules.match(method, path, template="{" in path)
+        return matched[0] if matched else None
+
+    def __call__(self, sampling_context: dict) -> float:
+        """sentry_sdk traces_sampler"""
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            # Keep distributed traces whole
+            return 1.0 if parent_sampled else 0.0
+
+        if self.mode == "tail":
+            # Record everything; before_send_transaction decides
+            return 1.0
+
+        scope = sampling_context.get("asgi_scope") or {}
+        method = scope.get("method")
+        path = scope.get("path")
+        if not method or not path:
+            return self.default_rate
+
+        rule = self.rule_for(method, path)
+        return self.default_rate if rule is None else rule.rate
+
+    def before_send_transaction(self, event: dict, hint: dict) -> Optional[dict]:
+        """sentry_sdk before_send_transaction: tail sampling decision"""
+        if self.mode != "tail":
+            return event
+
+        method = (event.get("request") or {}).get("method") or "*"
+        rule = self.rule_for(method.upper(), event.get("transaction") or "/")
+        slow_ms = self.default_slow_ms if rule is None else rule.slow_ms
+        rate = self.default_rate if rule is None else rule.rate
+
+        trace = (event.get("contexts") or {}).get("trace") or {}
+        duration_ms = _duration_ms(event)
+
+        if trace.get("status") in ERROR_STATUSES:
+            decision = "error"
+        elif duration_ms is not None and duration_ms > slow_ms:
+            decision = "slow"
+        elif rate > 0 and self.rand() < rate:
+            decision = "sampled"
+        else:
+            TRACE_DECISIONS.labels("tail", "dropped").inc()
+            return None
+
+        TRACE_DECISIONS.labels("tail", decision).inc()
+        event.setdefault("tags", {})["sampling.reason"] = decision
+        return event
+
+
+def _timestamp(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _duration_ms(event: dict) -> Optional[float]:
+    start = _timestamp(event.get("start_timestamp"))
+    end = _timestamp(event.get("timestamp"))
+    if start is None or end is None:
+        return None
+    return (end - start) * 1000
+
+
+def trace_sampler_from_env(environment: str) -> TraceSampler:
+    """
+    Build the sampler from TRACE_SAMPLING_* settings
+
+    Args:
+        environment: Environment name (development samples everything by default)
+
+    Returns:
+        Configured sampler
+    """
+    default_rate = float(os.getenv("TRACES_SAMPLE_RATE", "1.0" if environment == "development" else "0.1"))
+
+    rules = dict(DEFAULT_TRACE_RULES)
+    overrides = os.getenv("TRACE_SAMPLING_RULES")
+    if overrides:
+        parsed = json.loads(overrides)
+        if not isinstance(parsed, dict):
+            raise ValueError("TRACE_SAMPLING_RULES must be a JSON object")
+        rules.update(parsed)
+
+    return TraceSampler(
+        rules,
+        default_rate=default_rate,
+        default_slow_ms=float(os.getenv("TRACE_SLOW_MS", "1000")),
+        mode=os.getenv("TRACE_SAMPLING_MODE", "head"),
+    )
@@ -0,0 +1,102 @@
+"""
+Analytics time series benchmark
+
+Ingests hourly samples for a set of projects in batches (samples plus
+rollup upserts), then times a 30-day daily series per owner and a 48-hour
+hourly series per project as history grows. Query time should stay flat:
+it reads rollup rows for the requested range only.
+
+Uses a temporary SQLite database with the app's schema.
+
+Run with: cd backend && python benchmarks/bench_analytics.py
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+import app.database as database_module
+from app import repositories
+from app.models import Base
+
+PROJECTS = 20
+BATCH = 1000
+HISTORY_DAYS = (30, 90, 180, 365)
+REPEAT = 50
+
+
+def samples_for_day(day: datetime) -> list:
+    return [
+        {
+            "project_id": f"p{project}",
+            "owner_id": "owner",
+            "recorded_at": day + timedelta(hours=hour, minutes=5),
+            "views": 10 + hour,
+            "watch_time_hours": 0.5,
+            "impressions": 200,
+            "clicks": 9,
+            "estimated_revenue": 0.02,
+        }
+        for project in range(PROJECTS)
+        for hour in range(24)
+    ]
+
+
+async def timed(coro_factory) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await coro_factory()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+async def main(url: str) -> None:
+    database_module.init_database(url)
+    factory = database_module.session_factory
+
+    first_day = datetime(2024, 1, 1)
+    ingested_days = 0
+    ingest_seconds = 0.0
+    ingested = 0
+
+    print(f"{'history days':>12} {'samples':>9} {'ingest/s':>10} {'owner 30d ms':>13} {'project 48h ms':>15}")
+    for history in HISTORY_DAYS:
+        pending = []
+        while ingested_days < history:
+            pending += samples_for_day(first_day + timedelta(days=ingested_days))
+            ingested_days += 1
+        for offset in range(0, len(pending), BATCH):
+            start = time.perf_counter()
+            async with factory() as session:
+                ingested += await repositories.ingest_analytics_samples(session, pending[offset:offset + BATCH])
+                await session.commit()
+            ingest_seconds += time.perf_counter() - start
+
+        last = first_day + timedelta(days=ingested_days)
+        async with factory() as session:
+            owner_ms = await timed(lambda: repositories.analytics_series(
+                session, "day", last - timedelta(days=30), last, owner_id="owner"
+            ))
+            project_ms = await timed(lambda: repositories.analytics_series(
+                session, "hour", last - timedelta(hours=48), last, project_id="p0"
+            ))
+        print(f"{history:>12} {ingested:>9} {ingested / ingest_seconds:>10.0f} {owner_ms:>13.2f} {project_ms:>15.2f}")
+
+    await database_module.close_database()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        asyncio.run(main(url))
@@ -0,0 +1,49 @@
+"""
+Metrics hot path microbenchmark
+
+Measures per-call cost of the updates MetricsMiddleware makes on every
+request (labelled counter increment and histogram observation), and the
+cost of rendering a scrape with many series.
+
+Run with: cd backend && python benchmarks/bench_metrics.py
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.metrics import MetricsRegistry
+
+CALLS = 200_000
+
+
+def bench(function) -> float:
+    """Return mean nanoseconds per call"""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        function()
+    elapsed = time.perf_counter() - start
+    return elapsed / CALLS * 1_000_000_000
+
+
+if __name__ == "__main__":
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("method", "route", "status"))
+    latency = registry.histogram("latency_seconds", "Latency", ("method", "route"))
+
+    print(f"{'operation':>24} {'ns/call':>10}")
+    print(f"{'counter.labels().inc()':>24} {bench(lambda: requests.labels('GET', '/api/projects', '200').inc()):>10.0f}")
+    print(f"{'histogram.observe()':>24} {bench(lambda: latency.labels('GET', '/api/projects').observe(0.042)):>10.0f}")
+
+    for route in range(200):
+        for status in ("200", "404", "500"):
+            requests.labels("GET", f"/api/route/{route}", status).inc()
+            latency.labels("GET", f"/api/route/{route}").observe(0.01)
+
+    start = time.perf_counter()
+    text = registry.render()
+    elapsed = time.perf_counter() - start
+    print(f"\nrender {text.count(chr(10))} lines: {elapsed * 1000:.2f} ms")
@@ -0,0 +1,71 @@
+"""
+Monitoring overhead microbenchmark
+
+Measures the per-call overhead @monitor_performance and @monitor_errors
+add to sync and async functions while Sentry is off (SENTRY_DSN unset).
+@monitor_performance includes the always-on local span timing.
+Exits non-zero if any wrapper adds a microsecond or more.
+
+Run with: cd backend && python benchmarks/bench_monitoring.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.monitoring import init_sentry, is_enabled, monitor_errors, monitor_performance
+
+CALLS = 500_000
+BUDGET_NS = 1000
+
+
+def plain(x):
+    return x
+
+
+async def plain_async(x):
+    return x
+
+
+def bench_sync(func) -> float:
+    """Return mean nanoseconds per call"""
+    start = time.perf_counter()
+    for i in range(CALLS):
+        func(i)
+    return (time.perf_counter() - start) / CALLS * 1_000_000_000
+
+
+async def bench_async(func) -> float:
+    """Return mean nanoseconds per awaited call"""
+    start = time.perf_counter()
+    for i in range(CALLS):
+        await func(i)
+    return (time.perf_counter() - start) / CALLS * 1_000_000_000
+
+
+if __name__ == "__main__":
+    os.environ.pop("SENTRY_DSN", None)
+    init_sentry()
+    assert not is_enabled()
+
+    sync_base = bench_sync(plain)
+    async_base = asyncio.run(bench_async(plain_async))
+    results = {
+        "monitor_performance (sync)": bench_sync(monitor_performance("bench")(plain)) - sync_base,
+        "monitor_errors (sync)": bench_sync(monitor_errors()(plain)) - sync_base,
+        "monitor_performance (async)": asyncio.run(bench_async(monitor_performance("bench")(plain_async))) - async_base,
+        "monitor_errors (async)": asyncio.run(bench_async(monitor_errors()(plain_async))) - async_base,
+    }
+
+    print(f"baseline: sync {sync_base:.0f} ns, async {async_base:.0f} ns")
+    print(f"{'wrapper':>30} {'overhead ns':>12}")
+    for name, overhead in results.items():
+        print(f"{name:>30} {overhead:>12.0f}")
+
+    if max(results.values()) >= BUDGET_NS:
+        print(f"FAIL: overhead exceeds {BUDGET_NS} ns")
+        sys.exit(1)
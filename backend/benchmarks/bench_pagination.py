@@ -0,0 +1,87 @@
+"""
+Offset vs keyset pagination benchmark
+
+Fetches one page of a user's projects at increasing depths with OFFSET and
+with a (created_at, id) cursor. Offset cost grows with depth (skipped rows
+are still read); keyset cost stays flat.
+
+Uses a temporary SQLite database with the app's schema and indexes.
+
+Run with: cd backend && python benchmarks/bench_pagination.py
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+
+import app.database as database_module
+from app import repositories
+from app.models import Base, Project, ProjectStatus, User
+
+ROWS = 100_000
+PAGE = 50
+DEPTHS = (0, 1_000, 10_000, 50_000, 99_000)
+REPEAT = 20
+
+
+def seed(url: str) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    base = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": "owner", "email": "owner@example.com", "hashed_password": "x", "full_name": "Owner"}])
+        connection.execute(insert(Project), [
+            {
+                "id": f"p{index:06d}",
+                "owner_id": "owner",
+                "title": f"Project {index}",
+                "niche_id": "tech",
+                "status": ProjectStatus.DRAFT,
+                "created_at": base + timedelta(seconds=index),
+                "updated_at": base,
+            }
+            for index in range(ROWS)
+        ])
+    engine.dispose()
+
+
+async def timed(coro_factory) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        await coro_factory()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+async def main(url: str) -> None:
+    database_module.init_database(url)
+    factory = database_module.session_factory
+
+    async with factory() as session:
+        ordered = await repositories.list_projects(session, "owner", limit=ROWS)
+        keys = [(project.created_at, project.id) for project in ordered]
+
+        print(f"{'depth':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for depth in DEPTHS:
+            after = keys[depth - 1] if depth else None
+            offset_ms = await timed(lambda: repositories.list_projects(session, "owner", skip=depth, limit=PAGE))
+            keyset_ms = await timed(lambda: repositories.list_projects(session, "owner", limit=PAGE, after=after))
+            print(f"{depth:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+    await database_module.close_database()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        print(f"Seeding {ROWS} projects...")
+        seed(url)
+        asyncio.run(main(url))
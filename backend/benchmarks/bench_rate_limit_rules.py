@@ -0,0 +1,77 @@
+"""
+Rate limit rule engine benchmark
+
+Measures rule lookup cost as the number of rules grows, for route
+templates (memoised) and raw paths (trie walk), against the naive
+approach of testing every rule's pattern in turn.
+
+Run with: cd backend && python benchmarks/bench_rate_limit_rules.py
+"""
+
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rate_limit_rules import RuleSet
+
+RULE_COUNTS = [10, 100, 500, 1_000]
+CALLS = 20_000
+METHODS = ["GET", "POST", "PATCH", "DELETE"]
+
+
+def make_rules(count: int) -> dict:
+    """Synthetic rules spread over resources with parameterised sub-routes"""
+    rules = {"anonymous": {"requests": 100, "window": 3600}}
+    for i in range(count - 1):
+        method = METHODS[i % len(METHODS)]
+        resource = f"resource{i // 8}"
+        if i % 2:
+            path = f"/api/{resource}/{{item_id}}/action{i % 8}"
+        else:
+            path = f"/api/{resource}/list{i % 8}"
+        rules[f"{method} {path}"] = {"requests": 10, "window": 3600}
+    return rules
+
+
+def linear_matcher(rules: dict):
+    """Baseline: one compiled regex per rule, tested in order"""
+    patterns = []
+    for key in rules:
+        method, _, path = key.partition(" ")
+        if path:
+            regex = re.sub(r"\{[^/]+\}", "[^/]+", path)
+            patterns.append((method, re.compile(f"^{regex}/?$"), key))
+
+    def match(method: str, path: str):
+        return [key for rule_method, regex, key in patterns if rule_method == method and regex.match(path)]
+
+    return match
+
+
+def bench(match, method: str, path: str) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        match(method, path)
+    return (time.perf_counter() - start) / CALLS * 1_000_000
+
+
+if __name__ == "__main__":
+    print(f"{'rules':>6} {'template us':>12} {'raw path us':>12} {'linear us':>10}")
+    for count in RULE_COUNTS:
+        rules = make_rules(count)
+        rule_set = RuleSet(rules)
+        linear = linear_matcher(rules)
+
+        # Target the last resource so the linear scan does its worst case
+        resource = f"resource{(count - 2) // 8}"
+        template = f"/api/{resource}/{{item_id}}/action1"
+        raw_path = f"/api/{resource}/abc123/action1"
+
+        template_us = bench(lambda m, p: rule_set.match(m, p, template=True), "POST", template)
+        raw_us = bench(rule_set.match, "POST", raw_path)
+        linear_us = bench(linear, "POST", raw_path)
+        print(f"{count:>6} {template_us:>12.2f} {raw_us:>12.2f} {linear_us:>10.2f}")
@@ -0,0 +1,66 @@
+"""
+Rate limiter microbenchmark
+
+Measures per-call cost of InMemoryRateLimiter.is_allowed and
+SharedMemoryRateLimiter.is_allowed with the window already full, for
+increasing limits. Cost should stay flat as limits grow.
+
+Run with: cd backend && python benchmarks/bench_rate_limiter.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rate_limiter import InMemoryRateLimiter
+from app.shared_rate_limiter import SharedMemoryRateLimiter
+
+LIMITS = [100, 1_000, 10_000, 100_000]
+CALLS = 50_000
+WINDOW = 3600
+
+
+def bench_limit(limiter, limit: int) -> float:
+    """Return mean microseconds per is_allowed call for a given limit"""
+    # Fill the window so every measured call sees `limit` recorded requests
+    for _ in range(limit):
+        limiter.is_allowed("user:bench", limit, WINDOW)
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        limiter.is_allowed("user:bench", limit, WINDOW)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / CALLS * 1_000_000
+
+
+def bench_identifiers(count: int, max_identifiers: int) -> float:
+    """Return mean microseconds per call when cycling through many identifiers"""
+    limiter = InMemoryRateLimiter(max_identifiers=max_identifiers)
+
+    start = time.perf_counter()
+    for i in range(count):
+        limiter.is_allowed(f"ip:{i}", 100, WINDOW)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / count * 1_000_000
+
+
+if __name__ == "__main__":
+    print(f"{'limit':>10} {'memory us':>10} {'shared us':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for limit in LIMITS:
+            shared = SharedMemoryRateLimiter(path=os.path.join(directory, f"bench-{limit}"))
+            memory_us = bench_limit(InMemoryRateLimiter(), limit)
+            shared_us = bench_limit(shared, limit)
+            shared.close()
+            print(f"{limit:>10} {memory_us:>10.2f} {shared_us:>10.2f}")
+
+    print()
+    print(f"{'identifiers':>12} {'cap':>8} {'us/call':>10}")
+    for count in (10_000, 200_000):
+        print(f"{count:>12} {10_000:>8} {bench_identifiers(count, 10_000):>10.2f}")
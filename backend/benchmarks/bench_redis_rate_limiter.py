@@ -0,0 +1,94 @@
+"""
+Redis rate limiter benchmark
+
+Compares the previous five-command RedisRateLimiter sequence against the
+single EVALSHA script: Redis round trips per check and p50/p99 latency.
+
+Uses REDIS_URL if set, otherwise an in-process fakeredis server (round trip
+counts are exact either way; latencies are only meaningful against a real
+Redis server).
+
+Run with: cd backend && REDIS_URL=redis://localhost:6379 python benchmarks/bench_redis_rate_limiter.py
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rate_limiter import RedisRateLimiter
+
+CALLS = 5_000
+LIMIT = 1_000
+WINDOW = 3600
+
+
+def get_client():
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        import redis
+        return redis.from_url(redis_url, decode_responses=True)
+
+    import fakeredis
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def legacy_is_allowed(client, identifier: str, limit: int, window: int):
+    """The pre-script implementation: up to five separate Redis calls"""
+    key = f"rate_limit:{identifier}"
+    current_time = time.time()
+
+    client.zremrangebyscore(key, 0, current_time - window)
+    request_count = client.zcard(key)
+    is_allowed = request_count < limit
+    if is_allowed:
+        client.zadd(key, {str(current_time): current_time})
+        client.expire(key, window)
+    client.zrange(key, 0, 0, withscores=True)
+
+    return is_allowed
+
+
+def count_round_trips(client):
+    """Wrap execute_command and return a list that records each command"""
+    commands = []
+    original = client.execute_command
+
+    def counting_execute(*args, **kwargs):
+        commands.append(args[0])
+        return original(*args, **kwargs)
+
+    client.execute_command = counting_execute
+    return commands
+
+
+def run(name: str, check) -> None:
+    latencies = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        check()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1_000_000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1_000_000
+    print(f"{name:>8} {p50:>10.1f} {p99:>10.1f}", end="")
+
+
+if __name__ == "__main__":
+    client = get_client()
+    client.delete("rate_limit:bench:legacy", "rate_limit:bench:script")
+    commands = count_round_trips(client)
+    limiter = RedisRateLimiter(client=client)
+
+    print(f"{'impl':>8} {'p50 us':>10} {'p99 us':>10} {'trips/call':>12}")
+
+    commands.clear()
+    run("legacy", lambda: legacy_is_allowed(client, "bench:legacy", LIMIT, WINDOW))
+    print(f" {len(commands) / CALLS:>12.2f}")
+
+    commands.clear()
+    run("script", lambda: limiter.is_allowed("bench:script", LIMIT, WINDOW))
+    print(f" {len(commands) / CALLS:>12.2f}")
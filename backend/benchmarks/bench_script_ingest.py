@@ -0,0 +1,99 @@
+"""
+Script candidate ingestion benchmark
+
+Persists one generation round of candidates per batch size, either one ORM
+object at a time (repositories.create_script, a flush per row) or with
+repositories.bulk_create_scripts (one executemany INSERT). Both include the
+project status update and commit.
+
+Uses a temporary SQLite database; on PostgreSQL the gap is wider because
+every per-row flush is a network round trip.
+
+Run with: cd backend && python benchmarks/bench_script_ingest.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+import app.database as database_module
+from app import repositories
+from app.models import Base, ProjectStatus
+
+BATCH_SIZES = (10, 50, 100, 500, 1000)
+ROUNDS = 5
+CONTENT = "Hook. " + "Narration sentence for the video. " * 40
+
+
+def candidates(count: int) -> list:
+    return [
+        {
+            "content": CONTENT,
+            "word_count": 240,
+            "estimated_duration": 95,
+            "score": index / count,
+            "visual_cues": [{"at": 0, "cue": "b-roll"}, {"at": 30, "cue": "chart"}],
+        }
+        for index in range(count)
+    ]
+
+
+async def one_at_a_time(session, project, batch: list) -> None:
+    for candidate in batch:
+        await repositories.create_script(session, project.id, reasoning_path="creative", **candidate)
+    await repositories.update_project(session, project, status=ProjectStatus.AWAITING_SCRIPT_APPROVAL)
+    await session.commit()
+
+
+async def bulk(session, project, batch: list) -> None:
+    await repositories.bulk_create_scripts(
+        session, project.id, batch, project_status=ProjectStatus.AWAITING_SCRIPT_APPROVAL
+    )
+    await session.commit()
+
+
+async def timed(factory, project_id: str, method, batch: list) -> float:
+    """Mean milliseconds per round"""
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        async with factory() as session:
+            project = await repositories.get_project(session, project_id)
+            start = time.perf_counter()
+            await method(session, project, batch)
+            elapsed += time.perf_counter() - start
+    return elapsed / ROUNDS * 1000
+
+
+async def main(url: str) -> None:
+    database_module.init_database(url)
+    factory = database_module.session_factory
+
+    async with factory() as session:
+        owner = await repositories.create_user(session, "owner@example.com", "hash", "Owner")
+        project = await repositories.create_project(session, owner.id, "Bench", "tech")
+        await session.commit()
+
+    print(f"{'candidates':>10} {'one-by-one ms':>14} {'bulk ms':>10} {'speedup':>8}")
+    for size in BATCH_SIZES:
+        batch = candidates(size)
+        slow = await timed(factory, project.id, one_at_a_time, batch)
+        fast = await timed(factory, project.id, bulk, batch)
+        print(f"{size:>10} {slow:>14.2f} {fast:>10.2f} {slow / fast:>7.1f}x")
+
+    await database_module.close_database()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        asyncio.run(main(url))
@@ -0,0 +1,199 @@
+"""
+Analytics time series tests (SQLite stand-in via aiosqlite)
+Run with: cd backend && pytest test_analytics.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import IntegrityError
+
+import app.database as database_module
+from app import repositories
+from app.main import app
+from app.models import AnalyticsDaily, AnalyticsHourly, AnalyticsSample, Base
+
+
+@pytest.fixture
+def db(tmp_path):
+    url = f"sqlite:///{tmp_path}/test.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    database_module.init_database(url)
+    yield database_module.session_factory
+    database_module.engine = None
+    database_module.session_factory = None
+
+
+def auth_headers(user_id, role="client"):
+    from app.auth import create_access_token
+    token = create_access_token({"sub": user_id, "email": f"{user_id}@example.com", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==========================================
+# BUCKETS AND PARTITIONS
+# ==========================================
+
+def test_buckets_and_partitions():
+    moment = datetime(2024, 12, 31, 23, 45, 10, 5)
+    assert repositories.analytics_bucket(moment, "hour") == datetime(2024, 12, 31, 23)
+    assert repositories.analytics_bucket(moment, "day") == datetime(2024, 12, 31)
+    assert repositories.sample_partition(moment) == (
+        "analytics_samples_y2024m12", datetime(2024, 12, 1), datetime(2025, 1, 1)
+    )
+
+    aware = datetime(2025, 1, 1, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert repositories.analytics_bucket(aware, "hour") == datetime(2024, 12, 31, 23)
+
+
+# ==========================================
+# REPOSITORIES
+# ==========================================
+
+@pytest.mark.asyncio
+async def test_ingest_maintains_rollups(db):
+    base = datetime(2024, 3, 1, 10, 0)
+    samples = [
+        # Two samples in the 10:00 hour, one at 11:00, one the next day
+        {"id": "s1", "project_id": "p1", "owner_id": "u1", "recorded_at": base + timedelta(minutes=15),
+         "views": 100, "impressions": 1000, "clicks": 50, "watch_time_hours": 2.5, "estimated_revenue": 0.4},
+        {"id": "s2", "project_id": "p1", "owner_id": "u1", "recorded_at": base + timedelta(minutes=45),
+         "views": 20, "impressions": 1000, "clicks": 10},
+        {"id": "s3", "project_id": "p1", "owner_id": "u1", "recorded_at": base + timedelta(hours=1), "views": 5},
+        {"id": "s4", "project_id": "p2", "owner_id": "u1", "recorded_at": base + timedelta(days=1), "views": 7},
+    ]
+    async with db() as session:
+        assert await repositories.ingest_analytics_samples(session, samples) == 4
+        await session.commit()
+
+    # Retried batch (plus one new sample) only adds the new sample
+    async with db() as session:
+        extra = {"id": "s5", "project_id": "p1", "owner_id": "u1", "recorded_at": base + timedelta(minutes=50), "views": 1}
+        assert await repositories.ingest_analytics_samples(session, samples + [extra]) == 1
+        await session.commit()
+
+    async with db() as session:
+        assert len((await session.execute(select(AnalyticsSample))).all()) == 5
+
+        hourly = await repositories.analytics_series(
+            session, "hour", base, base + timedelta(hours=2), project_id="p1"
+        )
+        assert [(point["bucket"], point["views"]) for point in hourly] == [
+            (base, 121), (base + timedelta(hours=1), 5)
+        ]
+        assert hourly[0]["ctr"] == pytest.approx(60 / 2000)
+        assert hourly[0]["watch_time_hours"] == pytest.approx(2.5)
+        assert hourly[1]["ctr"] == 0.0
+
+        daily = await repositories.analytics_series(
+            session, "day", datetime(2024, 3, 1), datetime(2024, 3, 3), owner_id="u1"
+        )
+        assert [(point["bucket"], point["views"]) for point in daily] == [
+            (datetime(2024, 3, 1), 126), (datetime(2024, 3, 2), 7)
+        ]
+        rollup = await session.get(AnalyticsDaily, ("p1", datetime(2024, 3, 1)))
+        assert rollup.samples == 4
+
+
+@pytest.mark.asyncio
+async def test_duplicates_within_batch_count_once(db):
+    sample = {"id": "s1", "project_id": "p1", "owner_id": "u1", "recorded_at": datetime(2024, 3, 1, 10, 15), "views": 10}
+    aware = dict(sample, recorded_at=datetime(2024, 3, 1, 12, 15, tzinfo=timezone(timedelta(hours=2))), views=99)
+    async with db() as session:
+        assert await repositories.ingest_analytics_samples(session, [sample, sample, aware]) == 1
+        await session.commit()
+
+    async with db() as session:
+        assert len((await session.execute(select(AnalyticsSample))).all()) == 1
+        for model, bucket in ((AnalyticsHourly, datetime(2024, 3, 1, 10)), (AnalyticsDaily, datetime(2024, 3, 1))):
+            rollup = await session.get(model, ("p1", bucket))
+            assert (rollup.samples, rollup.views) == (1, 10)
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_forgets_partitions(db, monkeypatch):
+    monkeypatch.setattr(repositories, "_sample_partitions", {"analytics_samples_y2024m03", "analytics_samples_y2024m04"})
+
+    # Stands in for PostgreSQL rejecting rows whose partition was dropped
+    bad = {"id": "s1", "project_id": None, "owner_id": "u1", "recorded_at": datetime(2024, 3, 5)}
+    async with db() as session:
+        with pytest.raises(IntegrityError):
+            await repositories.ingest_analytics_samples(session, [bad])
+
+    assert repositories._sample_partitions == {"analytics_samples_y2024m04"}
+
+
+@pytest.mark.asyncio
+async def test_series_reads_rollup_index(db):
+    statements = []
+    event.listen(
+        database_module.engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    )
+    async with db() as session:
+        for model, filters in ((AnalyticsHourly, {"project_id": "p1"}), (AnalyticsDaily, {"owner_id": "u1"})):
+            granularity = "hour" if model is AnalyticsHourly else "day"
+            await repositories.analytics_series(session, granularity, datetime(2024, 1, 1), datetime(2024, 2, 1), **filters)
+
+    engine = create_engine(database_module.engine.url.set(drivername="sqlite"))
+    with engine.connect() as connection:
+        for (statement, parameters), index in zip(
+            statements, ("sqlite_autoindex_analytics_hourly_1", "ix_analytics_daily_owner_id_bucket")
+        ):
+            plan = " | ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            assert index in plan and "SEARCH" in plan, plan
+    engine.dispose()
+
+
+# ==========================================
+# API
+# ==========================================
+
+def test_analytics_api(db):
+    client = TestClient(app)
+    owner = auth_headers("user-a")
+    project = client.post("/api/projects/", json={"title": "My video", "niche_id": "tech"}, headers=owner).json()
+
+    now = datetime.utcnow().replace(minute=30, second=0, microsecond=0)
+    samples = [
+        {"id": f"sync-{i}", "project_id": project["id"], "recorded_at": (now - timedelta(hours=i)).isoformat(),
+         "views": 10, "impressions": 100, "clicks": 4, "estimated_revenue": 0.05}
+        for i in range(3)
+    ]
+    response = client.post("/api/analytics/samples", json={"samples": samples}, headers=owner)
+    assert response.status_code == 201
+    assert response.json() == {"received": 3, "inserted": 3}
+    assert client.post("/api/analytics/samples", json={"samples": samples}, headers=owner).json()["inserted"] == 0
+
+    series = client.get(
+        f"/api/analytics/projects/{project['id']}", params={"granularity": "hour"}, headers=owner
+    ).json()
+    assert [point["views"] for point in series["points"]] == [10, 10, 10]
+    assert series["points"][0]["ctr"] == pytest.approx(0.04)
+
+    totals = client.get("/api/analytics/owners/me", params={"granularity": "day"}, headers=owner).json()
+    assert sum(point["views"] for point in totals["points"]) == 30
+
+    # Access control and validation
+    other = auth_headers("user-b")
+    assert client.post("/api/analytics/samples", json={"samples": samples}, headers=other).status_code == 404
+    assert client.get(f"/api/analytics/projects/{project['id']}", headers=other).status_code == 404
+    assert client.get("/api/analytics/owners/user-a", headers=other).status_code == 403
+    assert client.get("/api/analytics/owners/user-a", headers=auth_headers("admin-1", "admin")).status_code == 200
+    assert client.post("/api/analytics/samples", json={"samples": []}, headers=owner).status_code == 400
+    assert client.get("/api/analytics/owners/me", params={"granularity": "week"}, headers=owner).status_code == 400
+    assert client.get(
+        "/api/analytics/owners/me",
+        params={"granularity": "hour", "start": "2020-01-01T00:00:00", "end": "2024-01-01T00:00:00"},
+        headers=owner,
+    ).status_code == 400
+
+    # Deleting the project removes its time series
+    assert client.delete(f"/api/projects/{project['id']}", headers=owner).status_code == 204
+    totals = client.get("/api/analytics/owners/me", params={"granularity": "day"}, headers=owner).json()
+    assert totals["points"] == []
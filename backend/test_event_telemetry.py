@@ -0,0 +1,112 @@
+"""
+Event telemetry tests
+Run with: cd backend && pytest test_event_telemetry.py
+"""
+
+import logging
+
+import app.monitoring as monitoring
+from app.event_telemetry import AnomalyGate, EventAggregator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_gate_rate_limits_per_key_and_reports_suppressed():
+    clock = FakeClock()
+    gate = AnomalyGate(limit=2, window=60, clock=clock)
+
+    assert gate.allow("a") == 0
+    assert gate.allow("a") == 0
+    assert gate.allow("a") is None
+    assert gate.allow("a") is None
+    assert gate.allow("b") == 0
+
+    clock.now = 61
+    assert gate.allow("a") == 2
+    assert gate.allow("a") == 0
+
+
+def test_gate_evicts_least_recently_seen_keys():
+    gate = AnomalyGate(max_keys=2)
+    for key in ("a", "b", "c"):
+        gate.allow(key)
+
+    assert not gate.seen("a")
+    assert gate.seen("b") and gate.seen("c")
+
+
+def test_only_failures_and_new_error_types_are_anomalies():
+    aggregator = EventAggregator(AnomalyGate(limit=1, window=60))
+
+    assert aggregator.record("workflow", "completed", "completed") is None
+    assert aggregator.record("workflow", "failed", "failed") == 0
+    assert aggregator.record("workflow", "failed", "failed") is None
+    assert aggregator.record("workflow", "retried", "running", error_type="Timeout") == 0
+    assert aggregator.record("workflow", "retried", "running", error_type="Timeout") is None
+
+    summary = aggregator.summary()
+    assert summary["counts"] == {
+        "workflow.completed.completed": 1,
+        "workflow.failed.failed": 2,
+        "workflow.retried.running": 2,
+    }
+    assert aggregator.summary()["counts"] == {}
+
+
+def test_summary_is_logged(caplog):
+    aggregator = EventAggregator()
+    aggregator.record("payment", "charge", "succeeded")
+
+    with caplog.at_level(logging.INFO, logger="app.event_telemetry"):
+        aggregator.emit_summary()
+        aggregator.emit_summary()
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].counts == {"payment.charge.succeeded": 1}
+
+
+class FakeSentry:
+    def __init__(self):
+        self.messages = []
+
+    def capture_message(self, message, **kwargs):
+        self.messages.append((message, kwargs["level"]))
+
+    def set_context(self, name, context):
+        pass
+
+    def set_tag(self, key, value):
+        pass
+
+
+def test_tracking_forwards_only_anomalies(monkeypatch):
+    sentry = FakeSentry()
+    monkeypatch.setattr(monitoring, "_sentry", sentry)
+    monkeypatch.setattr(monitoring, "event_aggregator", EventAggregator())
+
+    for i in range(100):
+        monitoring.track_workflow_event(f"wf-{i}", "completed", status="completed")
+        monitoring.track_payment_event(f"pi-{i}", "charge", 1999, "u-1", "succeeded")
+    for i in range(10):
+        monitoring.track_payment_event(f"pi-f{i}", "charge", 1999, "u-1", "failed", error_type="card_declined")
+
+    assert sentry.messages == [("Payment charge: $19.99 - failed", "warning")]
+    assert "app_domain_events_total" in monitoring.registry.render()
+
+
+def test_admin_event_counts():
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": "admin-1", "email": "a@b.co", "role": "admin"})
+    response = TestClient(app).get("/api/admin/events", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert isinstance(response.json()["counts"], dict)
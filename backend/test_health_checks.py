@@ -0,0 +1,128 @@
+"""
+Dependency health check runner tests
+Run with: cd backend && pytest test_health_checks.py
+"""
+
+import asyncio
+
+import pytest
+
+from app.health_checks import CachedCheck, run_checks
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_check(delay: float = 0.0, status: str = "healthy"):
+    calls = []
+
+    async def check():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"status": status, "message": "ok"}
+
+    return check, calls
+
+
+@pytest.mark.asyncio
+async def test_result_is_cached_for_ttl():
+    clock = FakeClock()
+    check, calls = make_check()
+    cached = CachedCheck(check, critical=True, ttl=10, clock=clock)
+
+    first = await cached.run()
+    await cached.run()
+    assert len(calls) == 1
+    assert first["critical"] is True
+    assert first["response_time_ms"] >= 0
+
+    clock.now += 11
+    await cached.run()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_probe():
+    check, calls = make_check(delay=0.05)
+    cached = CachedCheck(check)
+
+    results = await asyncio.gather(*(cached.run() for _ in range(10)))
+
+    assert len(calls) == 1
+    assert all(result["status"] == "healthy" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_timeout_reports_unhealthy():
+    check, _ = make_check(delay=10)
+    cached = CachedCheck(check, timeout=0.05)
+
+    result = await cached.run()
+
+    assert result["status"] == "unhealthy"
+    assert "timed out" in result["message"]
+    assert 40 <= result["response_time_ms"] < 1000
+
+
+@pytest.mark.asyncio
+async def test_exception_reports_unhealthy():
+    async def broken():
+        raise ConnectionError("refused")
+
+    result = await CachedCheck(broken).run()
+
+    assert result["status"] == "unhealthy"
+    assert "refused" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_checks_run_concurrently():
+    checks = {f"service{i}": CachedCheck(make_check(delay=0.1)[0]) for i in range(5)}
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await run_checks(checks)
+
+    assert loop.time() - start < 0.3
+    assert list(results) == list(checks)
+    assert all(result["response_time_ms"] >= 90 for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_probe():
+    check, calls = make_check(delay=0.05)
+    cached = CachedCheck(check)
+
+    caller = asyncio.ensure_future(cached.run())
+    await asyncio.sleep(0.01)
+    caller.cancel()
+
+    result = await cached.run()
+    assert result["status"] == "healthy"
+    assert len(calls) == 1
+
+
+# ==========================================
+# HYSTERESIS
+# ==========================================
+
+@pytest.mark.asyncio
+async def test_readiness_hysteresis():
+    clock = FakeClock()
+    outcomes = iter(["healthy", "unhealthy", "unhealthy", "healthy", "unhealthy", "unhealthy", "unhealthy", "healthy", "healthy"])
+
+    async def flaky():
+        return {"status": next(outcomes), "message": ""}
+
+    cached = CachedCheck(flaky, ttl=1, rise=2, fall=3, clock=clock)
+    ready = []
+    for _ in range(9):
+        ready.append((await cached.run())["ready"])
+        clock.now += 2
+
+    assert ready == [True, True, True, True, True, True, False, False, True]
@@ -0,0 +1,96 @@
+"""
+Load shedding tests
+Run with: cd backend && pytest test_load_shedding.py
+"""
+
+from starlette.requests import Request
+
+import app.load_shedding as load_shedding_module
+from app.load_shedding import LOAD_SHED_REQUESTS, LoadShedder, classify_request
+from app.loop_monitor import LoopLagMonitor
+
+
+def make_request(method: str = "GET", path: str = "/api/projects", token: str = None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": headers,
+        "client": ("10.0.0.1", 12345),
+    })
+
+
+def test_classify_request():
+    assert classify_request(make_request("POST", "/api/payments/checkout", token="t")) == "critical"
+    assert classify_request(make_request("POST", "/api/payments/webhook/stripe")) == "critical"
+    assert classify_request(make_request("GET", "/api/health/ready")) == "critical"
+    assert classify_request(make_request("GET", "/health")) == "critical"
+
+    assert classify_request(make_request("GET", "/api/health/detailed")) == "low"
+    assert classify_request(make_request("GET", "/api/projects/", token="t")) == "low"
+    assert classify_request(make_request("GET", "/api/workflows/wf-1/status")) == "low"
+
+    assert classify_request(make_request("GET", "/api/workflows/wf-1/status", token="t")) == "normal"
+    assert classify_request(make_request("POST", "/api/projects", token="t")) == "normal"
+
+
+def test_shedder_levels():
+    monitor = LoopLagMonitor()
+    shedder = LoadShedder(monitor, lag_low=0.1, lag_high=0.5, inflight_low=10, inflight_high=20)
+    shed_before = {p: LOAD_SHED_REQUESTS.labels(p).get() for p in ("critical", "normal", "low")}
+
+    assert shedder.level == 0
+    assert not shedder.should_shed("low")
+
+    monitor.record(0.2)
+    assert shedder.level == 1
+    assert shedder.should_shed("low")
+    assert not shedder.should_shed("normal")
+    assert not shedder.should_shed("critical")
+
+    monitor.record(0.6)
+    assert shedder.level == 2
+    assert shedder.should_shed("normal")
+    assert not shedder.should_shed("critical")
+
+    shed = {p: LOAD_SHED_REQUESTS.labels(p).get() - shed_before[p] for p in shed_before}
+    assert shed == {"critical": 0, "normal": 1, "low": 1}
+
+
+def test_shedder_in_flight_threshold():
+    shedder = LoadShedder(LoopLagMonitor(), inflight_low=10, inflight_high=20)
+
+    shedder.in_flight = 10
+    assert shedder.level == 1
+    shedder.in_flight = 20
+    assert shedder.level == 2
+
+
+def test_middleware_sheds_low_priority(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    monitor = LoopLagMonitor()
+    shedder = LoadShedder(monitor, lag_low=0.1, lag_high=0.5)
+    monkeypatch.setattr(load_shedding_module, "load_shedder", shedder)
+    client = TestClient(app)
+    shed_before = LOAD_SHED_REQUESTS.labels("low").get()
+
+    assert client.get("/api/health/detailed").status_code == 200
+
+    monitor.record(0.2)
+    response = client.get("/api/health/detailed")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert response.json()["error"] == "overloaded"
+
+    # Probes and checkout traffic stay up even under severe overload
+    monitor.record(1.0)
+    assert client.get("/api/health/live").status_code == 200
+    assert client.post("/api/payments/webhook/stripe").status_code != 503
+    assert client.get("/api/health/detailed").headers["Retry-After"] == "4"
+
+    assert LOAD_SHED_REQUESTS.labels("low").get() - shed_before == 2
+    assert shedder.in_flight == 0
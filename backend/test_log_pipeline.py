@@ -0,0 +1,165 @@
+"""
+Logging pipeline tests
+Run with: cd backend && pytest test_log_pipeline.py
+"""
+
+import io
+import json
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+import app.monitoring as monitoring
+from app.log_pipeline import LOG_RECORDS_DROPPED, BoundedQueueHandler, LogPipeline
+
+
+@pytest.fixture
+def test_logger():
+    logger = logging.getLogger("test-log-pipeline")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers = []
+    logger.propagate = True
+
+
+def make_record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_records_written_as_json_lines(test_logger):
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream=stream, batch_size=2, flush_interval=0.01)
+    pipeline.start(test_logger)
+    try:
+        test_logger.info("user %s signed in", "u-1", extra={"route": "/api/users"})
+        test_logger.warning("slow query")
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            test_logger.exception("request failed")
+        assert pipeline.flush()
+    finally:
+        pipeline.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == ["user u-1 signed in", "slow query", "request failed"]
+    assert lines[0]["route"] == "/api/users"
+    assert lines[1]["level"] == "WARNING"
+    assert "ValueError: bad input" in lines[2]["exception"]
+
+
+def test_stop_flushes_and_restores_handlers(test_logger):
+    previous = logging.NullHandler()
+    test_logger.addHandler(previous)
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream=stream, flush_interval=0.01)
+
+    pipeline.start(test_logger)
+    assert test_logger.handlers == [pipeline.handler]
+    for i in range(100):
+        test_logger.info(f"record {i}")
+    pipeline.stop()
+
+    assert len(stream.getvalue().splitlines()) == 100
+    assert test_logger.handlers == [previous]
+    assert not pipeline.running
+
+
+def test_stop_survives_dropped_sentinel(test_logger):
+    writing = threading.Event()
+    release = threading.Event()
+
+    class SlowStream(io.StringIO):
+        def write(self, text):
+            writing.set()
+            release.wait(5)
+            return super().write(text)
+
+    stream = SlowStream()
+    pipeline = LogPipeline(stream=stream, queue_size=1, flush_interval=0.01)
+    pipeline.start(test_logger)
+
+    test_logger.info("a")
+    assert writing.wait(5)
+    stopper = threading.Thread(target=pipeline.stop, args=(5.0,))
+    started = time.monotonic()
+    stopper.start()
+    while pipeline.queue.qsize() == 0:
+        time.sleep(0.001)
+
+    # The queue is full with the stop sentinel, which drop_oldest discards
+    test_logger.info("b")
+    release.set()
+    stopper.join()
+
+    assert time.monotonic() - started < 2
+    assert not pipeline.running
+    assert [json.loads(line)["message"] for line in stream.getvalue().splitlines()] == ["a", "b"]
+
+
+def test_drop_oldest_keeps_newest_records():
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy="drop_oldest")
+    dropped = LOG_RECORDS_DROPPED.labels().get()
+
+    for message in ("a", "b", "c"):
+        handler.emit(make_record(message))
+
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["b", "c"]
+    assert LOG_RECORDS_DROPPED.labels().get() == dropped + 1
+
+
+def test_block_policy_drops_after_timeout():
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, policy="block", block_timeout=0.01)
+    dropped = LOG_RECORDS_DROPPED.labels().get()
+
+    handler.emit(make_record("kept"))
+    handler.emit(make_record("dropped"))
+
+    assert log_queue.get_nowait().getMessage() == "kept"
+    assert LOG_RECORDS_DROPPED.labels().get() == dropped + 1
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(log_queue, policy="unbounded")
+
+
+def test_structured_logger_forwards_off_request_path(monkeypatch, test_logger):
+    sent = []
+
+    class FakeSentry:
+        def capture_message(self, message, **kwargs):
+            sent.append(("message", message, kwargs["level"], kwargs["contexts"]["log"]))
+
+        def capture_exception(self, exception, **kwargs):
+            sent.append(("exception", type(exception).__name__))
+
+        def set_context(self, name, context):
+            raise AssertionError("Sentry called on the request path")
+
+    monkeypatch.setattr(monitoring, "_sentry", FakeSentry())
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream=stream, flush_interval=0.01)
+    pipeline.forward = monitoring._forward_log_record
+    monkeypatch.setattr(monitoring, "log_pipeline", pipeline)
+
+    pipeline.start(test_logger)
+    try:
+        logger = monitoring.StructuredLogger(test_logger.name)
+        logger.info("started")
+        logger.warning("slow request", route="/api/projects")
+        logger.error("payment failed", exception=RuntimeError("card declined"))
+        assert pipeline.flush()
+    finally:
+        pipeline.stop()
+
+    assert sent == [
+        ("message", "slow request", "warning", {"route": "/api/projects"}),
+        ("exception", "RuntimeError"),
+    ]
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert "sentry_level" not in lines[1]
+    assert "RuntimeError: card declined" in lines[2]["exception"]
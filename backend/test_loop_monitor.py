@@ -0,0 +1,92 @@
+"""
+Event loop monitor tests
+Run with: cd backend && pytest test_loop_monitor.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.loop_monitor import LOOP_LAG, SLOW_CALLBACKS, LoopLagMonitor
+
+
+def test_lag_decays_after_spike():
+    monitor = LoopLagMonitor(decay=0.5)
+    monitor.record(0.4)
+    monitor.record(0.0)
+    assert monitor.lag == pytest.approx(0.2)
+    assert monitor.last_lag == 0.0
+    assert monitor.max_lag == 0.4
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_measures_blocking():
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+
+    time.sleep(0.1)   # Block the loop
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert monitor.max_lag >= 0.05
+
+
+# ==========================================
+# SLOW CALLBACKS
+# ==========================================
+
+def blocking_hash():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_captures_blocking_stack():
+    monitor = LoopLagMonitor(interval=0.01, slow_callback=0.05)
+    slow_before = SLOW_CALLBACKS.labels().get()
+    samples_before = sum(LOOP_LAG.labels().get()[0])
+    monitor.start()
+    await asyncio.sleep(0.03)
+
+    async def login_handler():
+        blocking_hash()   # Blocks the loop
+
+    await asyncio.get_running_loop().create_task(login_handler(), name="login")
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    captures = monitor.recent_slow_callbacks()
+    assert len(captures) == 1
+    stall = captures[0]
+    assert stall["task"] == "login"
+    assert stall["coroutine"].endswith("login_handler")
+    assert "in blocking_hash" in stall["stack"][-1]
+    assert stall["duration_ms"] >= 250
+    assert SLOW_CALLBACKS.labels().get() == slow_before + 1
+    assert sum(LOOP_LAG.labels().get()[0]) > samples_before
+
+
+@pytest.mark.asyncio
+async def test_watchdog_disabled_with_zero_threshold():
+    monitor = LoopLagMonitor(interval=0.01, slow_callback=0)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert monitor.recent_slow_callbacks() == []
+    assert monitor.max_lag >= 0.05
+
+
+def test_admin_loop_endpoint():
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": "admin-1", "email": "a@b.co", "role": "admin"})
+    response = TestClient(app).get("/api/admin/loop", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert isinstance(response.json()["slow_callbacks"], list)
@@ -0,0 +1,87 @@
+"""
+Memory diagnostics tests
+Run with: cd backend && pytest test_memory_diagnostics.py
+"""
+
+import tracemalloc
+
+import pytest
+
+from app.memory_diagnostics import SnapshotStore, process_memory, start_tracing, stop_tracing
+
+
+@pytest.fixture
+def tracing():
+    was_tracing = tracemalloc.is_tracing()
+    start_tracing()
+    yield
+    if not was_tracing:
+        stop_tracing()
+
+
+def test_process_memory_reports_rss_and_gc():
+    stats = process_memory()
+
+    assert stats["rss_bytes"] > 0
+    assert [g["generation"] for g in stats["gc"]["generations"]] == [0, 1, 2]
+    assert "collections" in stats["gc"]["generations"][0]
+
+
+def test_diff_finds_growing_line(tracing):
+    store = SnapshotStore()
+    base = store.take()["id"]
+
+    leak = [bytearray(1024) for _ in range(1000)]   # Leaking line
+    target = store.take()["id"]
+
+    top = store.diff(base, target, limit=5)
+    assert top[0]["file"] == __file__
+    assert top[0]["size_diff_bytes"] >= 1000 * 1024
+    assert top[0]["count_diff"] >= 1000
+    assert store.top(target, limit=50)
+    del leak
+
+
+def test_store_keeps_recent_snapshots(tracing):
+    store = SnapshotStore(max_snapshots=2)
+    ids = [store.take()["id"] for _ in range(3)]
+
+    assert [snapshot["id"] for snapshot in store.list()] == ids[1:]
+    with pytest.raises(KeyError):
+        store.get(ids[0])
+
+
+def test_snapshot_requires_tracing():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc enabled for the whole run")
+    with pytest.raises(RuntimeError):
+        SnapshotStore().take()
+
+
+def test_admin_memory_endpoints():
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    client = TestClient(app)
+    token = create_access_token({"sub": "admin-1", "email": "a@b.co", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+    was_tracing = tracemalloc.is_tracing()
+
+    assert client.get("/api/admin/memory", headers=headers).json()["rss_bytes"] > 0
+    try:
+        assert client.post("/api/admin/memory/tracemalloc/start", headers=headers).status_code == 200
+        base = client.post("/api/admin/memory/snapshots", headers=headers).json()["id"]
+        target = client.post("/api/admin/memory/snapshots", headers=headers).json()["id"]
+
+        response = client.get(f"/api/admin/memory/diff?base={base}&target={target}&limit=3", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()["diff"]) <= 3
+        assert client.get(f"/api/admin/memory/snapshots/{target}", headers=headers).status_code == 200
+        assert client.get("/api/admin/memory/snapshots/9999", headers=headers).status_code == 404
+    finally:
+        if not was_tracing:
+            assert client.post("/api/admin/memory/tracemalloc/stop", headers=headers).status_code == 200
+
+    if not was_tracing:
+        assert client.post("/api/admin/memory/snapshots", headers=headers).status_code == 409
@@ -0,0 +1,174 @@
+"""
+Metrics registry tests
+Run with: cd backend && pytest test_metrics.py
+"""
+
+import os
+
+import pytest
+
+from app.metrics import CONTENT_TYPE_LATEST, MetricsRegistry, hdr_index, hdr_quantiles, hdr_value, render_metrics
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    requests.labels("/a").inc()
+    requests.labels("/a").inc(2)
+    requests.labels('/b"\n').inc()
+    gauge = registry.gauge("temperature", "Temperature")
+    gauge.set(21.5)
+
+    text = registry.render()
+
+    assert "# HELP requests_total Requests\n# TYPE requests_total counter\n" in text
+    assert 'requests_total{route="/a"} 3\n' in text
+    assert 'requests_total{route="/b\\"\\n"} 1\n' in text
+    assert "# TYPE temperature gauge\ntemperature 21.5\n" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("/a").observe(value)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2\n' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3\n' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4\n' in text
+    assert 'latency_seconds_sum{route="/a"} 3.65\n' in text
+    assert 'latency_seconds_count{route="/a"} 4\n' in text
+
+
+def test_registry_returns_existing_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("hits_total", "Hits") is registry.counter("hits_total", "Hits")
+    with pytest.raises(ValueError):
+        registry.gauge("hits_total", "Hits")
+    with pytest.raises(ValueError):
+        registry.counter("by_route_total", "Hits", ("route",)).labels()
+
+
+def test_multiprocess_aggregation(tmp_path):
+    directory = str(tmp_path)
+    dead_pid = 2 ** 22 + 12345   # Above the default pid_max, never alive
+
+    workers = [MetricsRegistry(directory, pid=os.getpid()), MetricsRegistry(directory, pid=dead_pid)]
+    for value, worker in enumerate(workers, start=1):
+        worker.counter("jobs_total", "Jobs", ("kind",)).labels("render").inc(value)
+        worker.histogram("job_seconds", "Job time", buckets=(1.0,)).observe(value)
+        worker.gauge("queue_depth", "Queue depth").set(value * 10)
+        worker.gauge("in_progress", "In progress", multiprocess_mode="sum").set(value)
+    workers[1].write_snapshot()
+
+    text = workers[0].render()
+
+    # Counters and histograms keep counts from exited workers
+    assert 'jobs_total{kind="render"} 3\n' in text
+    assert 'job_seconds_bucket{le="1"} 1\n' in text
+    assert "job_seconds_count 2\n" in text
+    # Gauges only come from live workers
+    assert f'queue_depth{{pid="{os.getpid()}"}} 10\n' in text
+    assert str(dead_pid) not in text
+    assert "in_progress 1\n" in text
+
+
+def test_middleware_records_route_template():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    client.get("/api/health/live")
+    client.get("/api/projects/p-123")
+    client.get("/does-not-exist")
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    text = response.text
+    assert 'app_http_requests_total{method="GET",route="/api/health/live",status="200"}' in text
+    assert 'app_http_requests_total{method="GET",route="/api/projects/{project_id}",status="401"}' in text
+    assert 'app_http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'app_http_request_duration_seconds_bucket{method="GET",route="/api/health/live",le="+Inf"}' in text
+    assert "app_uptime_seconds " in text
+
+
+def test_render_metrics_empty():
+    assert render_metrics({}) == "\n"
+
+
+# ==========================================
+# LATENCY SUMMARIES
+# ==========================================
+
+def test_hdr_buckets_have_bounded_error():
+    for microseconds in list(range(0, 5000)) + [10 ** 6, 3 * 10 ** 9]:
+        midpoint = hdr_value(hdr_index(microseconds))
+        assert abs(midpoint - microseconds) <= max(1, microseconds / 64)
+
+
+def test_summary_quantiles_and_exposition():
+    registry = MetricsRegistry()
+    summary = registry.summary("op_seconds", "Op", ("name",))
+    for ms in range(1, 1001):
+        summary.labels("render").observe(ms / 1000)
+
+    p50, p99 = hdr_quantiles(summary.labels("render").get()["counts"], (0.5, 0.99))
+    assert p50 == pytest.approx(0.5, rel=0.02)
+    assert p99 == pytest.approx(0.99, rel=0.02)
+
+    text = registry.render()
+    assert "# TYPE op_seconds summary\n" in text
+    assert 'op_seconds{name="render",quantile="0.5"} 0.5' in text
+    assert 'op_seconds_count{name="render"} 1000\n' in text
+
+
+def test_summary_buffers_raw_observations():
+    from app.metrics import LATENCY_BUFFER
+
+    value = MetricsRegistry().summary("op_seconds", "Op").labels()
+    buffer = value.buffer
+    for _ in range(LATENCY_BUFFER + 10):
+        value.observe_ns(2_000_000)
+
+    # Full buffers are bucketed in place; the rest waits for a snapshot
+    assert value.buffer is buffer and len(buffer) == 10
+    snapshot = value.get()
+    assert buffer == []
+    assert snapshot["counts"] == [[hdr_index(2000), LATENCY_BUFFER + 10]]
+    assert snapshot["max"] == 0.002
+    assert snapshot["sum"] == pytest.approx(0.002 * (LATENCY_BUFFER + 10))
+
+
+def test_registry_fold_buckets_direct_appends():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc()
+    value = registry.summary("op_seconds", "Op", ("name",)).labels("render")
+    # As @monitor_performance records: appended without the fill check
+    value.buffer.extend([1_000_000] * 5)
+
+    registry.fold()
+    assert value.buffer == []
+    assert value.counts == {hdr_index(1000): 5}
+
+
+def test_summary_merges_across_workers(tmp_path):
+    directory = str(tmp_path)
+    fast = MetricsRegistry(directory, pid=os.getpid())
+    slow = MetricsRegistry(directory, pid=2 ** 22 + 12345)
+    for _ in range(90):
+        fast.summary("op_seconds", "Op").observe(0.001)
+    for _ in range(10):
+        slow.summary("op_seconds", "Op").observe(1.0)
+    slow.write_snapshot()
+
+    merged = fast.collect_all()["op_seconds"]["values"][0][1]
+
+    assert sum(count for _, count in merged["counts"]) == 100
+    assert merged["max"] == 1.0
+    p50, p99 = hdr_quantiles(merged["counts"], (0.5, 0.99))
+    assert p50 == pytest.approx(0.001, rel=0.02)
+    assert p99 == pytest.approx(1.0, rel=0.02)
@@ -0,0 +1,144 @@
+"""
+Monitoring helper tests
+Run with: cd backend && pytest test_monitoring.py
+"""
+
+import contextlib
+import logging
+
+import pytest
+
+import app.monitoring as monitoring
+
+
+class FakeSentry:
+    def __init__(self):
+        self.calls = []
+
+    def start_span(self, **kwargs):
+        self.calls.append(("span", kwargs["description"], kwargs["op"]))
+        return contextlib.nullcontext()
+
+    def capture_message(self, message, **kwargs):
+        self.calls.append(("message", message))
+
+    def capture_exception(self, exception, **kwargs):
+        self.calls.append(("exception", type(exception).__name__))
+
+    def set_context(self, name, context):
+        self.calls.append(("context", name))
+
+    def set_tag(self, key, value):
+        self.calls.append(("tag", key, value))
+
+
+@pytest.fixture
+def sentry(monkeypatch):
+    fake = FakeSentry()
+    monkeypatch.setattr(monitoring, "_sentry", fake)
+    return fake
+
+
+def test_disabled_without_dsn(monkeypatch):
+    monkeypatch.delenv("SENTRY_DSN", raising=False)
+    monitoring.init_sentry()
+
+    assert not monitoring.is_enabled()
+    assert monitoring.start_span("x") is None
+    monitoring.set_tag("a", "b")
+    monitoring.set_context("c", {})
+
+
+def test_disabled_capture_falls_back_to_logging(monkeypatch, caplog):
+    monkeypatch.setattr(monitoring, "_sentry", None)
+    with caplog.at_level(logging.WARNING, logger=monitoring.logger.name):
+        monitoring.capture_message("disk almost full", level="warning")
+
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert caplog.records[-1].getMessage() == "disk almost full"
+
+
+def test_decorators_pass_through_when_disabled(monkeypatch):
+    monkeypatch.setattr(monitoring, "_sentry", None)
+
+    @monitoring.monitor_performance("db.query")
+    def add(a, b=1):
+        return a + b
+
+    @monitoring.monitor_errors(reraise=False)
+    def broken():
+        raise ValueError("boom")
+
+    assert add(1, b=2) == 3
+    assert add.__name__ == "add"
+    assert broken() is None
+
+
+@pytest.mark.asyncio
+async def test_decorators_use_sentry_when_enabled(sentry):
+    @monitoring.monitor_performance("db.query")
+    async def fetch():
+        return "row"
+
+    @monitoring.monitor_errors(reraise=True)
+    async def broken():
+        raise KeyError("missing")
+
+    assert await fetch() == "row"
+    with pytest.raises(KeyError):
+        await broken()
+
+    assert sentry.calls == [("span", "fetch", "db.query"), ("exception", "KeyError")]
+
+
+def test_structured_logger_sends_only_when_enabled(sentry, monkeypatch):
+    logger = monitoring.StructuredLogger("test")
+    logger.warning("slow request", route="/api/projects")
+    assert sentry.calls == [("context", "log"), ("message", "slow request")]
+
+    monkeypatch.setattr(monitoring, "_sentry", None)
+    logger.warning("slow request")
+    assert len(sentry.calls) == 2
+
+
+# ==========================================
+# LOCAL SPAN AGGREGATION
+# ==========================================
+
+def test_every_call_is_aggregated(monkeypatch):
+    monkeypatch.setattr(monitoring, "_sentry", None)
+
+    @monitoring.monitor_performance("test.aggregate")
+    def work(fail=False):
+        if fail:
+            raise RuntimeError("failed")
+        return "done"
+
+    for _ in range(5):
+        work()
+    with pytest.raises(RuntimeError):
+        work(fail=True)
+
+    stats = {(s["operation"], s["function"]): s for s in monitoring.get_span_stats()}
+    stat = stats[("test.aggregate", work.__qualname__)]
+    assert stat["count"] == 6
+    assert 0 <= stat["p50_ms"] <= stat["p99_ms"] <= stat["max_ms"] * 1.02 + 0.001
+
+
+def test_admin_span_endpoint():
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    client = TestClient(app)
+
+    def headers(role):
+        token = create_access_token({"sub": f"{role}-1", "email": "a@b.co", "role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/admin/spans", headers=headers("client")).status_code == 403
+
+    response = client.get("/api/admin/spans", headers=headers("admin"))
+    assert response.status_code == 200
+    assert isinstance(response.json()["spans"], list)
+    assert "app_span_duration_seconds" in client.get("/api/metrics").text
@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination tests
+Run with: cd backend && pytest test_pagination.py
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import app.database as database_module
+from app import repositories
+from app.main import app
+from app.models import Base
+from app.pagination import decode_cursor, encode_cursor, paginate
+
+
+@pytest.fixture
+def db(tmp_path):
+    url = f"sqlite:///{tmp_path}/test.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    database_module.init_database(url)
+    yield database_module.session_factory
+    database_module.engine = None
+    database_module.session_factory = None
+
+
+def auth_headers(user_id, role="client"):
+    from app.auth import create_access_token
+    token = create_access_token({"sub": user_id, "email": f"{user_id}@example.com", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==========================================
+# CURSORS
+# ==========================================
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, "abc-123")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "abc-123")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor(datetime(2024, 1, 1), "x")[:-3], "WzEsMl0"])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_paginate_sets_cursor_only_when_more_rows():
+    rows = [SimpleNamespace(id=str(i), created_at=datetime(2024, 1, 1) - timedelta(days=i)) for i in range(3)]
+
+    page, next_cursor = paginate(rows, 2)
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, "1")
+
+    assert paginate(rows, 3) == (rows, None)
+    assert paginate([], 3) == ([], None)
+
+
+# ==========================================
+# REPOSITORIES
+# ==========================================
+
+@pytest.mark.asyncio
+async def test_keyset_pages_match_offset_pages(db):
+    async with db() as session:
+        owner = await repositories.create_user(session, "a@example.com", "hash", "Owner")
+        base = datetime(2024, 1, 1)
+        for index in range(23):
+            # Pairs share a timestamp so the id tie-breaker matters
+            await repositories.create_project(session, owner.id, f"P{index}", "tech", created_at=base + timedelta(hours=index // 2))
+            await repositories.create_payment(session, owner.id, 100 + index, f"pi_{index}", created_at=base + timedelta(hours=index // 2))
+        await session.commit()
+
+    async with db() as session:
+        by_offset = await repositories.list_projects(session, owner.id, limit=100)
+
+        walked, after = [], None
+        while True:
+            rows = await repositories.list_projects(session, owner.id, limit=5 + 1, after=after)
+            page, next_cursor = paginate(rows, 5)
+            walked.extend(page)
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+        assert [p.id for p in walked] == [p.id for p in by_offset]
+
+        payments, total = await repositories.list_payments(session, owner.id, limit=100)
+        assert total == 23
+        tail, total = await repositories.list_payments(
+            session, owner.id, limit=100, after=(payments[9].created_at, payments[9].id), count=False
+        )
+        assert total is None
+        assert [p.id for p in tail] == [p.id for p in payments[10:]]
+
+
+# ==========================================
+# API
+# ==========================================
+
+def test_cursor_pagination_api(db):
+    client = TestClient(app)
+    headers = auth_headers("owner-1")
+
+    created = []
+    for index in range(5):
+        response = client.post("/api/projects/", json={"title": f"P{index}", "niche_id": "tech"}, headers=headers)
+        assert response.status_code == 201
+        created.append(response.json()["id"])
+
+    first = client.get("/api/projects/", params={"limit": 2}, headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()["items"]) == 2
+    cursor = first.json()["next_cursor"]
+
+    seen = [p["id"] for p in first.json()["items"]]
+    while cursor:
+        page = client.get("/api/projects/", params={"limit": 2, "cursor": cursor}, headers=headers).json()
+        seen += [p["id"] for p in page["items"]]
+        cursor = page["next_cursor"]
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
+
+    assert client.get("/api/projects/", params={"cursor": "garbage"}, headers=headers).status_code == 400
+    assert client.get("/api/projects/", params={"limit": 0}, headers=headers).status_code == 400
+
+    transactions = client.get("/api/payments/transactions", params={"limit": 1}, headers=headers).json()
+    assert transactions["items"] == []
+    assert transactions["next_cursor"] is None
+    assert transactions["total"] == 0
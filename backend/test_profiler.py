@@ -0,0 +1,94 @@
+"""
+Sampling profiler tests
+Run with: cd backend && pytest test_profiler.py
+"""
+
+import sys
+import threading
+
+import pytest
+
+import app.profiler as profiler
+from app.metrics import active_requests
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_sampler_finds_busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,), name="spinner")
+    thread.start()
+    try:
+        result = profiler.StackSampler(interval=0.005).run(0.3)
+    finally:
+        stop.set()
+        thread.join()
+
+    spinner = {stack: count for stack, count in result["stacks"].items() if stack.startswith("thread:spinner;")}
+    assert spinner
+    assert any(stack.split(";")[-1].startswith("spin (test_profiler.py:") for stack in spinner)
+    assert result["samples"] > 10
+    assert 0 <= result["overhead"] < 1
+    assert profiler.route_totals(result["stacks"])["thread:spinner"] == sum(spinner.values())
+
+
+def test_stacks_are_attributed_to_routes():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    captured = {}
+
+    async def spin_route(x: str):
+        captured["stack"] = profiler.collapse_stack(sys._getframe(), "MainThread")
+        return {"x": x}
+
+    # Goes through the full middleware stack, where rate_limit_middleware
+    # runs the handler in a separate task
+    app.add_api_route("/api/zz-spin/{x}", spin_route, methods=["GET"])
+    try:
+        assert TestClient(app).get("/api/zz-spin/1").status_code == 200
+    finally:
+        app.router.routes.pop()
+
+    root, *frames = captured["stack"].split(";")
+    assert root == "GET /api/zz-spin/{x}"
+    assert frames[-1].startswith("spin_route (test_profiler.py:")
+    assert not active_requests
+
+
+def test_single_session():
+    with profiler._session_lock:
+        with pytest.raises(profiler.ProfilerBusyError):
+            profiler.profile(0.01)
+
+
+def test_render_collapsed():
+    text = profiler.render_collapsed({"a;b": 1, "a;c": 3})
+    assert text == "a;c 3\na;b 1\n"
+
+
+def test_admin_profile_endpoint():
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    client = TestClient(app)
+    token = create_access_token({"sub": "admin-1", "email": "a@b.co", "role": "admin"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/api/admin/profile?seconds=0.1&format=json", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["samples"] > 0
+    assert isinstance(response.json()["routes"], dict)
+
+    response = client.post("/api/admin/profile?seconds=0.1", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    assert client.post("/api/admin/profile?seconds=120", headers=headers).status_code == 422
+
+    with profiler._session_lock:
+        assert client.post("/api/admin/profile?seconds=0.1", headers=headers).status_code == 409
@@ -0,0 +1,738 @@
+"""
+Rate limiter tests
+Run with: cd backend && pytest test_rate_limiter.py
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import app.rate_limiter as rate_limiter_module
+from app.rate_limit_rules import RuleSet
+from app.shared_rate_limiter import SharedMemoryRateLimiter, geometry_path
+from app.rate_limiter import (
+    AsyncRedisConcurrencyLimiter,
+    AsyncRedisRateLimiter,
+    ConcurrencyLimiter,
+    InMemoryRateLimiter,
+    LeasedRateLimiter,
+    RedisRateLimiter,
+    check_rate_limit,
+    reload_rate_limits,
+)
+
+
+def make_request(method: str = "GET", path: str = "/api/projects", client_ip: str = "10.0.0.1") -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+        "client": (client_ip, 12345),
+    })
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ==========================================
+# IN-MEMORY RATE LIMITER
+# ==========================================
+
+def test_in_memory_allows_up_to_limit():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+
+    results = [limiter.is_allowed("user:1", limit=3, window=60) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [info["remaining"] for _, info in results] == [2, 1, 0, 0]
+    assert results[-1][1]["retry_after"] == 60
+    assert results[0][1]["retry_after"] is None
+
+
+def test_in_memory_window_slides():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+
+    limiter.is_allowed("user:1", limit=2, window=60)
+    clock.now += 30
+    limiter.is_allowed("user:1", limit=2, window=60)
+    assert limiter.is_allowed("user:1", limit=2, window=60)[0] is False
+
+    # First request expires, second is still inside the window
+    clock.now += 31
+    allowed, info = limiter.is_allowed("user:1", limit=2, window=60)
+    assert allowed is True
+    assert limiter.is_allowed("user:1", limit=2, window=60)[0] is False
+
+    clock.now += 120
+    assert limiter.is_allowed("user:1", limit=2, window=60)[0] is True
+
+
+def test_in_memory_evicts_lru_identifiers_at_cap():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(max_identifiers=3, clock=clock)
+
+    for i in range(10):
+        limiter.is_allowed(f"ip:{i}", limit=10, window=60)
+
+    assert len(limiter) == 3
+
+
+def test_in_memory_drops_idle_identifiers():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+
+    limiter.is_allowed("ip:a", limit=10, window=60)
+    limiter.is_allowed("ip:b", limit=10, window=60)
+    clock.now += 61
+    limiter.is_allowed("ip:c", limit=10, window=60)
+
+    assert len(limiter) == 1
+
+
+# ==========================================
+# REDIS RATE LIMITER
+# ==========================================
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_redis_allows_up_to_limit(redis_client):
+    limiter = RedisRateLimiter(client=redis_client)
+
+    results = [limiter.is_allowed("user:1", limit=3, window=60) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [info["remaining"] for _, info in results] == [2, 1, 0, 0]
+    assert 0 < results[-1][1]["retry_after"] <= 60
+    assert redis_client.zcard("rate_limit:user:1") == 3
+    assert 0 < redis_client.ttl("rate_limit:user:1") <= 60
+
+
+def test_redis_single_round_trip(redis_client):
+    limiter = RedisRateLimiter(client=redis_client)
+    limiter.is_allowed("user:1", limit=3, window=60)
+
+    commands = []
+    original = redis_client.execute_command
+
+    def counting_execute(*args, **kwargs):
+        commands.append(args[0])
+        return original(*args, **kwargs)
+
+    redis_client.execute_command = counting_execute
+    limiter.is_allowed("user:1", limit=3, window=60)
+
+    assert commands == ["EVALSHA"]
+
+
+def test_redis_reloads_script_on_noscript(redis_client):
+    limiter = RedisRateLimiter(client=redis_client)
+    limiter.is_allowed("user:1", limit=3, window=60)
+
+    redis_client.script_flush()
+    allowed, info = limiter.is_allowed("user:1", limit=3, window=60)
+
+    assert allowed is True
+    assert info["remaining"] == 1
+
+
+# ==========================================
+# ASYNC REDIS RATE LIMITER
+# ==========================================
+
+class SlowScriptClient:
+    """Stand-in redis.asyncio client whose script call takes one simulated round trip"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def register_script(self, script):
+        async def run_script(keys, args):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.latency)
+            self.in_flight -= 1
+            return [1, 0, ""]
+
+        return run_script
+
+
+@pytest.mark.asyncio
+async def test_async_redis_allows_up_to_limit():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    limiter = AsyncRedisRateLimiter(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+    results = [await limiter.is_allowed("user:1", limit=3, window=60) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [info["remaining"] for _, info in results] == [2, 1, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_does_not_serialize_on_async_backend(monkeypatch):
+    client = SlowScriptClient(latency=0.05)
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", AsyncRedisRateLimiter(client=client))
+
+    start = time.perf_counter()
+    infos = await asyncio.gather(*(
+        check_rate_limit(make_request(client_ip=f"10.0.{i // 256}.{i % 256}"))
+        for i in range(1000)
+    ))
+    elapsed = time.perf_counter() - start
+
+    # 1,000 serialized round trips would take 50s
+    assert len(infos) == 1000
+    assert client.max_in_flight == 1000
+    assert elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_with_in_memory_backend(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+
+    request = make_request()
+    info = await check_rate_limit(request)
+
+    assert info["limit"] == 100
+    assert request.state.rate_limit_info is info
+
+
+# ==========================================
+# LEASED RATE LIMITER
+# ==========================================
+
+@pytest.fixture
+def redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeServer()
+
+
+def make_leased(redis_server, **kwargs) -> LeasedRateLimiter:
+    import fakeredis
+    client = fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+    return LeasedRateLimiter(client=client, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_leased_serves_from_local_lease(redis_server):
+    limiter = make_leased(redis_server, lease_fraction=0.1, max_lease=100)
+    await limiter.is_allowed("user:warmup", limit=1000, window=60)  # loads the script
+    commands = []
+    original = limiter.redis.execute_command
+
+    async def counting_execute(*args, **kwargs):
+        commands.append(args[0])
+        return await original(*args, **kwargs)
+
+    limiter.redis.execute_command = counting_execute
+
+    results = [await limiter.is_allowed("user:1", limit=1000, window=60) for _ in range(50)]
+
+    assert all(allowed for allowed, _ in results)
+    assert commands == ["EVALSHA"]
+    # Headers match what a per-request check would report
+    assert [info["remaining"] for _, info in results] == list(range(999, 949, -1))
+
+
+@pytest.mark.asyncio
+async def test_leased_never_exceeds_shared_limit(redis_server):
+    workers = [make_leased(redis_server, lease_fraction=0.5) for _ in range(3)]
+
+    admitted = 0
+    for _ in range(30):
+        for worker in workers:
+            allowed, _ = await worker.is_allowed("user:1", limit=20, window=60)
+            admitted += allowed
+
+    assert 15 <= admitted <= 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("burst", [300, 1000, 1200])
+async def test_leased_concurrent_burst_uses_whole_budget(redis_server, burst):
+    limiter = make_leased(redis_server, lease_fraction=0.1, max_lease=100)
+
+    results = await asyncio.gather(*(limiter.is_allowed("user:1", limit=1000, window=3600) for _ in range(burst)))
+
+    allowed = [info for ok, info in results if ok]
+    denied = [info for ok, info in results if not ok]
+    assert len(allowed) == min(burst, 1000)
+    # Denials only once the window is really exhausted
+    assert all(info["remaining"] == 0 and info["retry_after"] > 0 for info in denied)
+    await limiter.close()
+
+
+@pytest.mark.asyncio
+async def test_leased_refund_returns_token_to_lease(redis_server):
+    limiter = make_leased(redis_server, lease_fraction=0.1, max_lease=100)
+
+    assert (await limiter.is_allowed("user:1", limit=1000, window=60))[1]["remaining"] == 999
+    await limiter.refund("user:1", window=60)
+    assert (await limiter.is_allowed("user:1", limit=1000, window=60))[1]["remaining"] == 999
+
+    # Weighted requests are charged and refunded in Redis
+    assert (await limiter.is_allowed("user:1", limit=1000, window=60, cost=10))[0] is True
+    await limiter.refund("user:1", window=60, cost=10)
+    assert await limiter.redis.get("rate_limit:user:1:total") == "100"
+    await limiter.close()
+
+
+@pytest.mark.asyncio
+async def test_leased_returns_unused_tokens_on_expiry(redis_server):
+    limiter = make_leased(redis_server, lease_fraction=0.5, lease_ttl=0.05)
+
+    await limiter.is_allowed("user:1", limit=20, window=60)
+    assert await limiter.redis.get("rate_limit:user:1:total") == "10"
+
+    await asyncio.sleep(0.06)
+    await limiter.is_allowed("user:1", limit=20, window=60)
+    await asyncio.gather(*limiter.tasks)
+
+    # Second lease took 5 of the 10 left, then the first shrank to the 1 token spent
+    assert await limiter.redis.get("rate_limit:user:1:total") == "6"
+    await limiter.close()
+    assert await limiter.redis.get("rate_limit:user:1:total") == "2"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["redis", "leased", "reddis"])
+async def test_init_rate_limiter_rejects_misconfigured_backend(monkeypatch, backend):
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", backend)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+    with pytest.raises(ValueError):
+        await rate_limiter_module.init_rate_limiter()
+
+
+# ==========================================
+# RULE ENGINE
+# ==========================================
+
+RULES = {
+    "anonymous": {"requests": 100, "window": 3600},
+    "authenticated": {"requests": 1000, "window": 3600},
+    "POST /api/projects": {"requests": 10, "window": 3600},
+    "POST /api/workflows/{workflow_id}/approve-script": {"requests": 5, "window": 60},
+    "* /api/payments/*": {"requests": 500, "window": 60, "scope": "global"},
+}
+
+
+def test_rules_match_templates_and_raw_paths():
+    rules = RuleSet(RULES)
+
+    by_template = rules.match("POST", "/api/workflows/{workflow_id}/approve-script", template=True)
+    by_path = rules.match("POST", "/api/workflows/wf-123/approve-script")
+    assert [rule.key for rule in by_template] == ["POST /api/workflows/{workflow_id}/approve-script"]
+    assert by_path == by_template
+
+    assert [rule.key for rule in rules.match("POST", "/api/projects/", template=True)] == ["POST /api/projects"]
+    assert rules.match("GET", "/api/projects/", template=True) == ()
+    assert [rule.key for rule in rules.match("GET", "/api/payments/transactions")] == ["* /api/payments/*"]
+    assert rules.for_role("unknown").key == "anonymous"
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_stacks_route_and_role_limits(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_rules", RuleSet(RULES))
+
+    path = "/api/workflows/wf-1/approve-script"
+    for _ in range(5):
+        info = await check_rate_limit(make_request("POST", path), user_id="1", user_role="authenticated")
+    # Route limit is the most restrictive, so it drives the headers
+    assert info["limit"] == 5
+    assert info["remaining"] == 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        await check_rate_limit(make_request("POST", path), user_id="1", user_role="authenticated")
+    assert exc_info.value.status_code == 429
+
+    # The role budget is still available for other routes
+    info = await check_rate_limit(make_request("GET", "/api/projects"), user_id="1", user_role="authenticated")
+    assert info["limit"] == 1000
+    assert info["remaining"] == 994
+
+
+@pytest.mark.asyncio
+async def test_role_rejection_does_not_spend_route_budget(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_rules", RuleSet(dict(RULES, authenticated={"requests": 1, "window": 3600})))
+
+    path = "/api/workflows/wf-1/approve-script"
+    await check_rate_limit(make_request("GET", "/api/projects"), user_id="1", user_role="authenticated")
+    # The route rule allows these, the exhausted role rule rejects them
+    for _ in range(5):
+        with pytest.raises(HTTPException) as exc_info:
+            await check_rate_limit(make_request("POST", path), user_id="1", user_role="authenticated")
+        assert exc_info.value.detail["limit"] == 1
+
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_rules", RuleSet(RULES))
+    info = await check_rate_limit(make_request("POST", path), user_id="1", user_role="authenticated")
+    assert info["limit"] == 5
+    assert info["remaining"] == 4
+
+
+@pytest.mark.asyncio
+async def test_global_scope_shares_one_budget(monkeypatch):
+    rules = dict(RULES, **{"* /api/payments/*": {"requests": 2, "window": 60, "scope": "global"}})
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_rules", RuleSet(rules))
+
+    await check_rate_limit(make_request("GET", "/api/payments/transactions", client_ip="1.1.1.1"))
+    await check_rate_limit(make_request("GET", "/api/payments/transactions", client_ip="2.2.2.2"))
+    with pytest.raises(HTTPException) as exc_info:
+        await check_rate_limit(make_request("GET", "/api/payments/transactions", client_ip="3.3.3.3"))
+    assert exc_info.value.status_code == 429
+
+
+def test_reload_rate_limits_swaps_rule_set(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_rules", RuleSet(RULES))
+
+    reload_rate_limits(dict(RULES, **{"DELETE /api/projects/{project_id}": {"requests": 3, "window": 60}}))
+
+    matched = rate_limiter_module.rate_limit_rules.match("DELETE", "/api/projects/{project_id}", template=True)
+    assert [rule.requests for rule in matched] == [3]
+
+
+# ==========================================
+# SHARED-MEMORY RATE LIMITER
+# ==========================================
+
+def _shared_worker(path: str, calls: int, results) -> None:
+    limiter = SharedMemoryRateLimiter(path=path, slots=64)
+    admitted = sum(limiter.is_allowed("user:1", limit=100, window=60)[0] for _ in range(calls))
+    results.put(admitted)
+    limiter.close()
+
+
+def test_shared_memory_enforces_one_budget_across_processes(tmp_path):
+    path = str(tmp_path / "rate-limit")
+    SharedMemoryRateLimiter(path=path, slots=64).close()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_shared_worker, args=(path, 60, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert sum(results.get(timeout=5) for _ in workers) == 100
+
+
+def test_shared_memory_geometry_change_uses_new_file(tmp_path):
+    prefix = str(tmp_path / "rate-limit")
+    old = SharedMemoryRateLimiter(path=prefix, slots=64)
+    assert old.is_allowed("user:1", limit=1, window=60)[0] is True
+
+    # A worker with another geometry leaves the mapped table alone
+    new = SharedMemoryRateLimiter(path=prefix, slots=128, buckets_per_window=10)
+    assert new.path != old.path
+    assert os.path.getsize(old.path) == old.size
+    assert old.is_allowed("user:1", limit=1, window=60)[0] is False
+    assert new.is_allowed("user:1", limit=1, window=60)[0] is True
+    new.close()
+    old.close()
+
+    # A file that is not a table is left untouched
+    with open(geometry_path(prefix, 64, 30), "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        SharedMemoryRateLimiter(path=prefix, slots=64)
+
+
+def test_shared_memory_refund(tmp_path):
+    clock = FakeClock()
+    limiter = SharedMemoryRateLimiter(path=str(tmp_path / "rl"), slots=8, clock=clock)
+    try:
+        limiter.is_allowed("user:1", limit=10, window=60, cost=4)
+        clock.now += 5
+        limiter.is_allowed("user:1", limit=10, window=60, cost=3)
+        limiter.refund("user:1", window=60, cost=5)
+        limiter.refund("user:2", window=60)
+
+        assert limiter.is_allowed("user:1", limit=10, window=60, cost=9)[0] is False
+        allowed, info = limiter.is_allowed("user:1", limit=10, window=60, cost=8)
+        assert allowed is True
+        assert info["remaining"] == 0
+    finally:
+        limiter.close()
+
+
+def test_shared_memory_window_and_slot_reuse(tmp_path):
+    clock = FakeClock()
+    limiter = SharedMemoryRateLimiter(path=str(tmp_path / "rate-limit"), slots=8, clock=clock)
+
+    results = [limiter.is_allowed("user:1", limit=2, window=60) for _ in range(3)]
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert results[-1][1]["retry_after"] == 60
+
+    # A full stripe takes over the least recently used slot
+    for i in range(20):
+        limiter.is_allowed(f"ip:{i}", limit=10, window=60)
+    assert len(limiter) == 8
+
+    clock.now += 61
+    assert limiter.is_allowed("user:1", limit=2, window=60)[0] is True
+    assert len(limiter) == 1
+    limiter.close()
+
+
+# ==========================================
+# WEIGHTED AND CONCURRENCY LIMITS
+# ==========================================
+
+def test_in_memory_weighted_cost():
+    limiter = InMemoryRateLimiter(clock=FakeClock())
+
+    allowed, info = limiter.is_allowed("user:1", limit=10, window=60, cost=6)
+    assert allowed is True
+    assert info["remaining"] == 4
+
+    allowed, info = limiter.is_allowed("user:1", limit=10, window=60, cost=5)
+    assert allowed is False
+    assert info["remaining"] == 4
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=4)[0] is True
+
+
+def test_redis_weighted_cost(redis_client):
+    limiter = RedisRateLimiter(client=redis_client)
+
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=6)[0] is True
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=5)[0] is False
+    assert redis_client.get("rate_limit:user:1:total") == "6"
+
+
+def test_in_memory_refund_takes_back_newest_buckets():
+    clock = FakeClock()
+    limiter = InMemoryRateLimiter(clock=clock)
+
+    limiter.is_allowed("user:1", limit=10, window=60, cost=4)
+    clock.now += 5
+    limiter.is_allowed("user:1", limit=10, window=60, cost=3)
+    limiter.refund("user:1", window=60, cost=5)
+    limiter.refund("user:2", window=60)
+
+    allowed, info = limiter.is_allowed("user:1", limit=10, window=60, cost=8)
+    assert allowed is True
+    assert info["remaining"] == 0
+    # The 2 tokens left were charged first, so they expire first
+    clock.now += 56
+    assert limiter.is_allowed("user:1", limit=10, window=60)[1]["remaining"] == 1
+
+
+def test_redis_refund_takes_back_newest_tokens(redis_client):
+    limiter = RedisRateLimiter(client=redis_client)
+
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=4)[0] is True
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=3)[0] is True
+    limiter.refund("user:1", window=60, cost=5)
+    assert redis_client.get("rate_limit:user:1:total") == "2"
+    assert [member.rsplit(":", 1)[1] for member in redis_client.zrange("rate_limit:user:1", 0, -1)] == ["2"]
+    assert limiter.is_allowed("user:1", limit=10, window=60, cost=8)[0] is True
+
+
+def test_redis_denied_after_expiry_keeps_total_ttl(redis_client, monkeypatch):
+    limiter = RedisRateLimiter(client=redis_client)
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, "time", lambda: now[0])
+
+    assert limiter.is_allowed("user:1", limit=120, window=3600, cost=30)[0] is True
+    now[0] = 2000.0
+    assert limiter.is_allowed("user:1", limit=120, window=3600, cost=60)[0] is True
+
+    # The first entry expires, then the request is denied
+    now[0] = 4700.0
+    allowed, info = limiter.is_allowed("user:1", limit=120, window=3600, cost=90)
+    assert allowed is False
+    assert info["remaining"] == 60
+    assert redis_client.get("rate_limit:user:1:total") == "60"
+    assert redis_client.ttl("rate_limit:user:1:total") > 0
+
+    # A leftover total without its sorted set is ignored
+    redis_client.delete("rate_limit:user:1")
+    now[0] = 9000.0
+    allowed, info = limiter.is_allowed("user:1", limit=120, window=3600, cost=90)
+    assert allowed is True
+    assert info["remaining"] == 30
+
+
+def test_redis_release_of_missing_total_creates_no_key(redis_client):
+    release = redis_client.register_script(rate_limiter_module.RELEASE_SCRIPT)
+    redis_client.zadd("rate_limit:user:1", {"1.0:abc:5": 1.0})
+
+    assert release(keys=["rate_limit:user:1", "rate_limit:user:1:total"], args=["1.0:abc:5", 3]) == 3
+    assert redis_client.exists("rate_limit:user:1:total") == 0
+
+
+def test_concurrency_limiter_acquire_release_and_ttl():
+    clock = FakeClock()
+    limiter = ConcurrencyLimiter(clock=clock)
+
+    assert limiter.acquire("workflows:user:1", "wf-1", limit=2, ttl=60)[0] is True
+    assert limiter.acquire("workflows:user:1", "wf-2", limit=2, ttl=60)[0] is True
+    # Re-acquiring a held slot is idempotent
+    assert limiter.acquire("workflows:user:1", "wf-2", limit=2, ttl=60)[0] is True
+    acquired, info = limiter.acquire("workflows:user:1", "wf-3", limit=2, ttl=60)
+    assert acquired is False
+    assert info["in_flight"] == 2
+
+    assert limiter.release("workflows:user:1", "wf-1") is True
+    assert limiter.release("workflows:user:1", "wf-1") is False
+    assert limiter.acquire("workflows:user:1", "wf-3", limit=2, ttl=60)[0] is True
+
+    # Leaked slots are reclaimed after their TTL
+    clock.now += 61
+    assert limiter.acquire("workflows:user:1", "wf-4", limit=2, ttl=60)[1]["in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_concurrency_limiter():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    limiter = AsyncRedisConcurrencyLimiter(fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+    assert (await limiter.acquire("workflows:user:1", "wf-1", limit=1, ttl=60))[0] is True
+    assert (await limiter.acquire("workflows:user:1", "wf-2", limit=1, ttl=60))[0] is False
+    assert await limiter.release("workflows:user:1", "wf-1") is True
+    assert (await limiter.acquire("workflows:user:1", "wf-2", limit=1, ttl=60))[0] is True
+
+
+@pytest.fixture
+def workflow_client(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    import app.database as database_module
+    from app.auth import create_access_token
+    from app.main import app
+    from app.models import Base, Project
+
+    # Workflows start on projects the user owns
+    url = f"sqlite:///{tmp_path}/test.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        session.add_all([Project(id=f"p{i}", owner_id="user-1", title="t", niche_id="tech") for i in range(1, 5)])
+        session.commit()
+    sync_engine.dispose()
+    monkeypatch.setattr(database_module, "session_factory", None)
+    monkeypatch.setattr(database_module, "engine", None)
+    database_module.init_database(url)
+
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(rate_limiter_module, "concurrency_limiter", ConcurrencyLimiter())
+    token = create_access_token({"sub": "user-1", "email": "a@b.co", "role": "client"})
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client, url
+
+
+WORKFLOW_BODY = {
+    "project_id": "p1",
+    "video_idea_id": "v1",
+    "niche_id": "tech",
+    "channel_id": "c1",
+    "voice_clone_id": "vc1",
+    "target_duration": 1800,
+}
+
+
+def test_workflow_start_weighted_and_concurrency_limits(workflow_client):
+    client, _ = workflow_client
+    body = WORKFLOW_BODY
+
+    started = []
+    for project_id in ("p1", "p2", "p3"):
+        response = client.post("/api/workflows/start", json=dict(body, project_id=project_id))
+        assert response.status_code == 201
+        started.append(response.json()["workflow_id"])
+    # 3 x 30 video minutes of the 120-minute hourly budget
+    assert response.headers["X-RateLimit-Remaining"] == "30"
+
+    response = client.post("/api/workflows/start", json=dict(body, project_id="p4", target_duration=60))
+    assert response.status_code == 429
+    assert response.json()["detail"]["error"] == "concurrency_limit_exceeded"
+
+    # Rejected starts spend no video minutes
+    assert client.post("/api/workflows/start", json=dict(body, project_id="missing")).status_code == 404
+
+    assert client.post(f"/api/workflows/{started[0]}/cancel").status_code == 204
+    response = client.post("/api/workflows/start", json=dict(body, target_duration=1860))
+    assert response.status_code == 429
+    assert response.json()["detail"]["error"] == "rate_limit_exceeded"
+
+    # ...and release the slot they acquired
+    response = client.post("/api/workflows/start", json=dict(body, project_id="p4", target_duration=1800))
+    assert response.status_code == 201
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_workflow_completion_releases_concurrency_slot(workflow_client):
+    client, _ = workflow_client
+    body = dict(WORKFLOW_BODY, target_duration=600)
+
+    started = []
+    for project_id in ("p1", "p2", "p3"):
+        response = client.post("/api/workflows/start", json=dict(body, project_id=project_id))
+        assert response.status_code == 201
+        started.append(response.json()["workflow_id"])
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 429
+
+    # Reading the status does not free a slot
+    assert client.get(f"/api/workflows/{started[0]}/status").json()["status"] == "running"
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 429
+
+    # A progress update keeps the slot; recording the outcome frees it
+    assert client.patch("/api/projects/p1", json={"status": "video_assembly"}).status_code == 200
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 429
+    for project_id, outcome in (("p1", "published"), ("p2", "published"), ("p3", "failed")):
+        assert client.patch(f"/api/projects/{project_id}", json={"status": outcome}).status_code == 200
+
+    statuses = [client.get(f"/api/workflows/{workflow_id}/status").json()["status"] for workflow_id in started]
+    assert statuses == ["completed", "completed", "failed"]
+
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 201
+
+
+def test_admin_cancel_releases_owner_slot(workflow_client):
+    from app.auth import create_access_token
+
+    client, _ = workflow_client
+    body = dict(WORKFLOW_BODY, target_duration=600)
+
+    started = [
+        client.post("/api/workflows/start", json=dict(body, project_id=project_id)).json()["workflow_id"]
+        for project_id in ("p1", "p2", "p3")
+    ]
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 429
+
+    admin_token = create_access_token({"sub": "admin-1", "email": "admin@b.co", "role": "admin"})
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    assert client.post(f"/api/workflows/{started[0]}/cancel", headers=admin).status_code == 204
+    assert client.get(f"/api/workflows/{started[0]}/status", headers=admin).json()["status"] == "cancelled"
+
+    assert client.post("/api/workflows/start", json=dict(body, project_id="p4")).status_code == 201
@@ -0,0 +1,118 @@
+"""
+Readiness probe tests
+Run with: cd backend && pytest test_readiness.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.database as database_module
+import app.rate_limiter as rate_limiter_module
+import app.routers.health as health_module
+from app.health_checks import CachedCheck
+from app.rate_limiter import AsyncRedisRateLimiter, InMemoryRateLimiter
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch):
+    monkeypatch.setattr(database_module, "engine", None)
+    engine = database_module.init_database("sqlite:///:memory:")
+    yield engine
+    database_module.engine = None
+
+
+def test_async_database_url():
+    assert database_module.async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert database_module.async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert database_module.async_database_url("postgresql+asyncpg://db/app") == "postgresql+asyncpg://db/app"
+
+
+def test_postgres_pool_status():
+    engine = database_module.init_database("postgresql://u:p@localhost:1/app")
+    try:
+        status = database_module.pool_status(engine)
+        assert status["capacity"] == database_module.DB_POOL_SIZE + database_module.DB_MAX_OVERFLOW
+        assert status["saturation"] == 0.0
+    finally:
+        database_module.engine = None
+
+
+@pytest.mark.asyncio
+async def test_check_database_select_one(sqlite_engine):
+    result = await health_module.check_database()
+    assert result["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_check_database_reports_saturated_pool(sqlite_engine, monkeypatch):
+    monkeypatch.setattr(health_module, "pool_status", lambda engine: {"checked_out": 29, "capacity": 30, "saturation": 29 / 30})
+
+    result = await health_module.check_database()
+
+    assert result["status"] == "degraded"
+    assert "97%" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_check_database_without_engine(monkeypatch):
+    monkeypatch.setattr(database_module, "engine", None)
+    assert (await health_module.check_database())["status"] == "unhealthy"
+
+
+@pytest.mark.asyncio
+async def test_check_redis_pings_rate_limiter_client(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    limiter = AsyncRedisRateLimiter(client=fakeredis.aioredis.FakeRedis())
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", limiter)
+    assert (await health_module.check_redis())["message"] == "Redis connected"
+
+    monkeypatch.setattr(rate_limiter_module, "rate_limiter", InMemoryRateLimiter())
+    assert (await health_module.check_redis())["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_check_temporal_describes_namespace(monkeypatch):
+    requests = []
+
+    async def describe_namespace(request):
+        requests.append(request.namespace)
+
+    client = SimpleNamespace(namespace="prod", workflow_service=SimpleNamespace(describe_namespace=describe_namespace))
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(health_module, "get_temporal_client", get_client)
+    result = await health_module.check_temporal()
+
+    assert result["status"] == "healthy"
+    assert requests == ["prod"]
+
+
+def test_readiness_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    state = {"status": "healthy"}
+
+    async def check():
+        return {"status": state["status"], "message": ""}
+
+    checks = {
+        "database": CachedCheck(check, critical=True, ttl=0, fall=2),
+        "optional": CachedCheck(check, critical=False, ttl=0),
+    }
+    monkeypatch.setattr(health_module, "READINESS_CHECKS", checks)
+    client = TestClient(app)
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["checks"]["database"]["ready"] is True
+
+    # One failure is absorbed by the hysteresis window, the second flips readiness
+    state["status"] = "unhealthy"
+    assert client.get("/api/health/ready").status_code == 200
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
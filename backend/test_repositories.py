@@ -0,0 +1,315 @@
+"""
+Data access layer tests (SQLite stand-in via aiosqlite)
+Run with: cd backend && pytest test_repositories.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+
+import app.database as database_module
+from app import repositories
+from app.models import Base, ProjectStatus
+
+
+@pytest.fixture
+def db(tmp_path):
+    url = f"sqlite:///{tmp_path}/test.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    database_module.init_database(url)
+    yield database_module.session_factory
+    database_module.engine = None
+    database_module.session_factory = None
+
+
+def auth_headers(user_id, role="client"):
+    from app.auth import create_access_token
+    token = create_access_token({"sub": user_id, "email": f"{user_id}@example.com", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ==========================================
+# REPOSITORIES
+# ==========================================
+
+@pytest.mark.asyncio
+async def test_project_and_script_repositories(db):
+    async with db() as session:
+        owner = await repositories.create_user(session, "a@example.com", "hash", "Owner A")
+        other = await repositories.create_user(session, "b@example.com", "hash", "Owner B")
+        base = datetime(2024, 1, 1)
+        for day in range(5):
+            await repositories.create_project(session, owner.id, f"P{day}", "tech", created_at=base + timedelta(days=day))
+        await repositories.create_project(session, other.id, "Other", "tech")
+        await session.commit()
+
+    async with db() as session:
+        projects = await repositories.list_projects(session, owner.id, skip=1, limit=2)
+        assert [p.title for p in projects] == ["P3", "P2"]
+        project = projects[0]
+        assert project.status == ProjectStatus.DRAFT
+        assert await repositories.get_project(session, project.id, owner_id=other.id) is None
+
+        weak = await repositories.create_script(session, project.id, "short", 1, 5, "creative", score=0.2)
+        strong = await repositories.create_script(session, project.id, "long", 2, 9, "analytical", score=0.9)
+        assert [s.id for s in await repositories.list_scripts(session, project.id)] == [strong.id, weak.id]
+
+        await repositories.approve_script(session, strong)
+        await session.commit()
+
+    async with db() as session:
+        project = await repositories.get_project(session, project.id)
+        assert project.script_id == strong.id
+
+        await repositories.upsert_analytics(session, project.id, views=10)
+        analytics = await repositories.upsert_analytics(session, project.id, views=25, ctr=0.05)
+        assert (analytics.views, analytics.ctr) == (25, 0.05)
+
+        await repositories.delete_project(session, project)
+        await session.commit()
+        assert await repositories.list_scripts(session, project.id) == []
+        assert await repositories.get_analytics(session, project.id) is None
+
+
+@pytest.mark.asyncio
+async def test_payment_repository(db):
+    async with db() as session:
+        user = await repositories.create_user(session, "pay@example.com", "hash", "Payer")
+        for i in range(3):
+            await repositories.create_payment(session, user.id, 100 * (i + 1), f"pi_{i}", payment_metadata={"n": i})
+        await session.commit()
+    async with db() as session:
+        payments, total = await repositories.list_payments(session, user.id, limit=2)
+        assert total == 3
+        assert len(payments) == 2
+        payment = await repositories.get_payment_by_intent(session, "pi_1")
+        assert (payment.amount, payment.payment_metadata) == (200, {"n": 1})
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_scripts(db):
+    async with db() as session:
+        owner = await repositories.create_user(session, "a@example.com", "hash", "Owner")
+        project = await repositories.create_project(session, owner.id, "P", "tech")
+        await session.commit()
+
+    candidates = [
+        {"content": f"Script {i}", "word_count": 100 + i, "estimated_duration": 40, "score": i / 10, "visual_cues": [{"at": 0}]}
+        for i in range(5)
+    ]
+    statements = []
+    event.listen(
+        database_module.engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    async with db() as session:
+        ids = await repositories.bulk_create_scripts(
+            session, project.id, candidates, project_status=ProjectStatus.AWAITING_SCRIPT_APPROVAL
+        )
+        await session.commit()
+    # One executemany INSERT plus the status UPDATE
+    assert [statement.split()[0] for statement in statements] == ["INSERT", "UPDATE"]
+
+    async with db() as session:
+        scripts = await repositories.list_scripts(session, project.id)
+        assert [s.id for s in scripts] == list(reversed(ids))
+        assert (scripts[0].content, scripts[0].word_count, scripts[0].visual_cues) == ("Script 4", 104, [{"at": 0}])
+        assert scripts[0].reasoning_path == "creative" and scripts[0].is_approved is False
+        assert (await repositories.get_project(session, project.id)).status == ProjectStatus.AWAITING_SCRIPT_APPROVAL
+
+    # A failing batch stores nothing and leaves the project status alone
+    async with db() as session:
+        with pytest.raises(IntegrityError):
+            await repositories.bulk_create_scripts(
+                session, project.id, [{**candidates[0], "id": ids[0]}], project_status=ProjectStatus.FAILED
+            )
+        await session.rollback()
+        assert len(await repositories.list_scripts(session, project.id)) == 5
+        assert (await repositories.get_project(session, project.id)).status == ProjectStatus.AWAITING_SCRIPT_APPROVAL
+
+
+@pytest.mark.asyncio
+async def test_users_from_tokens_and_registration(db, monkeypatch):
+    from fastapi import HTTPException
+    import app.auth as auth
+    from app.models import User, UserRole
+
+    # Hashing itself is passlib's concern
+    monkeypatch.setattr(auth, "get_password_hash", lambda password: f"hashed:{password}")
+
+    async with db() as session:
+        # Foreign keys are enforced, as on PostgreSQL
+        with pytest.raises(IntegrityError):
+            await repositories.create_project(session, "nobody", "Orphan", "tech")
+        await session.rollback()
+
+        await repositories.ensure_user(session, "admin-1", "admin@example.com", "admin")
+        await repositories.ensure_user(session, "admin-1", "changed@example.com", "client")
+        await repositories.ensure_user(session, "user-1", None, "authenticated")
+        await session.commit()
+
+        admin = await repositories.get_user(session, "admin-1")
+        assert (admin.email, admin.full_name, admin.role) == ("admin@example.com", "admin", UserRole.ADMIN)
+        assert (await repositories.get_user(session, "user-1")).role == UserRole.CLIENT
+        await repositories.create_project(session, "admin-1", "Owned", "tech")
+        await session.commit()
+
+        registered = await auth.register_user(session, auth.UserCreate(email="new@example.com", password="pw", full_name="New"))
+        assert registered.role == "client"
+        assert (await session.get(User, registered.id)).hashed_password == "hashed:pw"
+
+        with pytest.raises(HTTPException) as error:
+            await auth.register_user(session, auth.UserCreate(email="new@example.com", password="pw", full_name="Again"))
+        assert error.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_get_session_requires_database():
+    from fastapi import HTTPException
+
+    database_module.session_factory = None
+    with pytest.raises(HTTPException) as error:
+        await anext(database_module.get_session())
+    assert error.value.status_code == 503
+
+
+# ==========================================
+# ROUTERS
+# ==========================================
+
+def test_project_crud_api(db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    owner = auth_headers("user-a")
+
+    response = client.post("/api/projects/", json={"title": "My video", "niche_id": "tech"}, headers=owner)
+    assert response.status_code == 201
+    project = response.json()
+    assert project["owner_id"] == "user-a"
+    assert project["status"] == "draft"
+
+    assert [p["id"] for p in client.get("/api/projects/", headers=owner).json()["items"]] == [project["id"]]
+    assert client.get("/api/projects/", headers=auth_headers("user-b")).json()["items"] == []
+    assert client.get(f"/api/projects/{project['id']}", headers=auth_headers("user-b")).status_code == 404
+    assert client.get(f"/api/projects/{project['id']}", headers=auth_headers("admin-1", "admin")).status_code == 200
+
+    response = client.patch(f"/api/projects/{project['id']}", json={"status": "published"}, headers=owner)
+    assert response.json()["status"] == "published"
+    assert client.patch(f"/api/projects/{project['id']}", json={"status": "bogus"}, headers=owner).status_code == 400
+
+    assert client.delete(f"/api/projects/{project['id']}", headers=owner).status_code == 204
+    assert client.get(f"/api/projects/{project['id']}", headers=owner).status_code == 404
+
+
+def test_script_ingestion_api(db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    owner = auth_headers("user-a")
+    project = client.post("/api/projects/", json={"title": "My video", "niche_id": "tech"}, headers=owner).json()
+    url = f"/api/projects/{project['id']}/scripts"
+    candidates = [
+        {"id": f"beam-{i}", "content": f"Script {i}", "word_count": 120, "estimated_duration": 45, "score": 0.5 + i / 100}
+        for i in range(3)
+    ]
+
+    response = client.post(url, json={"candidates": candidates}, headers=owner)
+    assert response.status_code == 201
+    assert response.json() == {
+        "project_id": project["id"],
+        "inserted": 3,
+        "script_ids": ["beam-0", "beam-1", "beam-2"],
+        "status": "awaiting_script_approval",
+    }
+    assert client.get(f"/api/projects/{project['id']}", headers=owner).json()["status"] == "awaiting_script_approval"
+
+    # Duplicate IDs roll back the whole batch, status included
+    response = client.post(url, json={"candidates": candidates[:1], "project_status": "failed"}, headers=owner)
+    assert response.status_code == 409
+    assert client.get(f"/api/projects/{project['id']}", headers=owner).json()["status"] == "awaiting_script_approval"
+
+    assert client.post(url, json={"candidates": []}, headers=owner).status_code == 400
+    too_many = [{"content": "x", "word_count": 1, "estimated_duration": 1}] * 1001
+    assert client.post(url, json={"candidates": too_many}, headers=owner).status_code == 400
+    assert client.post(url, json={"candidates": candidates}, headers=auth_headers("user-b")).status_code == 404
+
+
+def test_user_payment_and_workflow_api(db):
+    import asyncio
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    async def seed():
+        async with db() as session:
+            await repositories.create_user(session, "taken@example.com", "hash", "Taken", id="user-b")
+            await repositories.create_user(session, "a@example.com", "hash", "User A", id="user-a")
+            project = await repositories.create_project(session, "user-a", "Video", "tech", id="project-1")
+            await repositories.create_script(session, project.id, "text", 1, 5, "creative", id="script-1")
+            await session.commit()
+
+    client = TestClient(app)
+    headers = auth_headers("user-a")
+
+    # Token users without a record get one on first use
+    me = client.get("/api/users/me", headers=auth_headers("user-c")).json()
+    assert (me["id"], me["email"], me["role"]) == ("user-c", "user-c@example.com", "client")
+    asyncio.run(seed())
+
+    from app.auth import create_access_token
+    token = create_access_token({"sub": "user-d", "email": "taken@example.com", "role": "client"})
+    assert client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"}).status_code == 404
+
+    assert client.get("/api/users/me", headers=headers).json()["full_name"] == "User A"
+    assert client.put("/api/users/me", json={"email": "taken@example.com"}, headers=headers).status_code == 409
+    assert client.put("/api/users/me", json={"full_name": "Renamed"}, headers=headers).json()["full_name"] == "Renamed"
+
+    # Email taken between the check and the commit
+    async def not_found(session, email):
+        return None
+
+    original = repositories.get_user_by_email
+    repositories.get_user_by_email = not_found
+    try:
+        assert client.put("/api/users/me", json={"email": "taken@example.com"}, headers=headers).status_code == 409
+    finally:
+        repositories.get_user_by_email = original
+
+    response = client.post("/api/payments/charge", json={"amount": 1000}, headers=headers)
+    assert response.status_code == 201
+    assert (response.json()["platform_fee"], response.json()["status"]) == (300, "pending")
+    transactions = client.get("/api/payments/transactions", headers=headers).json()
+    assert transactions["total"] == 1
+    assert transactions["items"][0]["amount"] == 1000
+
+    start = {
+        "project_id": "project-1", "video_idea_id": "idea", "niche_id": "tech",
+        "channel_id": "c", "voice_clone_id": "v", "target_duration": 60,
+    }
+    assert client.post("/api/workflows/start", json={**start, "project_id": "missing"}, headers=headers).status_code == 404
+    workflow_id = client.post("/api/workflows/start", json=start, headers=headers).json()["workflow_id"]
+
+    status = client.get(f"/api/workflows/{workflow_id}/status", headers=headers).json()
+    assert status["current_phase"] == "script_generation"
+    assert client.get(f"/api/workflows/{workflow_id}/status", headers=auth_headers("user-b")).status_code == 404
+
+    response = client.post(f"/api/workflows/{workflow_id}/approve-script?script_id=script-1", headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/projects/project-1", headers=headers).json()["status"] == "script_generation"
+    assert client.post(f"/api/workflows/{workflow_id}/cancel", headers=headers).status_code == 204
+    assert client.get("/api/projects/project-1", headers=headers).json()["status"] == "cancelled"
+
+
+def test_pool_metrics_exported():
+    from app.metrics import registry
+
+    text = registry.render()
+    for name in ("app_db_pool_size", "app_db_pool_checked_out", "app_db_pool_overflow", "app_db_pool_timeouts_total"):
+        assert f"# TYPE {name} " in text
@@ -0,0 +1,70 @@
+"""
+System metrics sampler tests
+Run with: cd backend && pytest test_system_metrics.py
+"""
+
+import time
+
+import psutil
+
+import app.routers.health as health_module
+from app.system_metrics import SystemMetricsSampler
+
+
+def test_history_is_bounded():
+    sampler = SystemMetricsSampler(history=3)
+    for _ in range(5):
+        sampler.sample()
+
+    history = sampler.history()
+    assert len(history) == 3
+    assert history[-1] is sampler.latest
+    assert [s.timestamp for s in history] == sorted(s.timestamp for s in history)
+    assert sampler.latest.rss_bytes > 0
+    assert sampler.latest.open_fds > 0
+
+
+def test_history_window():
+    sampler = SystemMetricsSampler()
+    old = sampler.sample()._replace(timestamp=time.time() - 600)
+    sampler._history.appendleft(old)
+
+    assert old in sampler.history()
+    assert old not in sampler.history(seconds=60)
+
+
+def test_background_thread_samples():
+    sampler = SystemMetricsSampler(interval=0.01)
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+
+    count = len(sampler.history())
+    assert count >= 3
+    time.sleep(0.05)
+    assert len(sampler.history()) == count
+
+
+def test_endpoints_read_cached_snapshot(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    sampler = SystemMetricsSampler()
+    sampler.sample()
+    monkeypatch.setattr(health_module, "system_sampler", sampler)
+
+    def blocking_cpu_percent(*args, **kwargs):
+        raise AssertionError("psutil called from a request handler")
+
+    monkeypatch.setattr(psutil, "cpu_percent", blocking_cpu_percent)
+    client = TestClient(app)
+
+    response = client.get("/api/health/detailed")
+    assert response.status_code == 200
+    assert response.json()["system"]["cpu_percent"] == sampler.latest.cpu_percent
+
+    assert "app_process_resident_memory_bytes" in client.get("/api/metrics").text
+
+    samples = client.get("/api/health/system/history?seconds=60").json()["samples"]
+    assert len(samples) == 1
+    assert samples[0]["rss_bytes"] == sampler.latest.rss_bytes
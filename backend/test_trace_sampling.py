@@ -0,0 +1,154 @@
+"""
+Trace sampling tests
+Run with: cd backend && pytest test_trace_sampling.py
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.monitoring as monitoring
+from app.trace_sampling import DEFAULT_TRACE_RULES, TraceSampler, trace_sampler_from_env
+
+
+def http_context(method, path, parent_sampled=None):
+    return {"asgi_scope": {"type": "http", "method": method, "path": path}, "parent_sampled": parent_sampled}
+
+
+def transaction(name, method="GET", duration_ms=10, status="ok"):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        "type": "transaction",
+        "transaction": name,
+        "request": {"method": method},
+        "start_timestamp": start,
+        "timestamp": start + timedelta(milliseconds=duration_ms),
+        "contexts": {"trace": {"status": status}},
+    }
+
+
+def test_head_sampling_uses_most_specific_rule():
+    sampler = TraceSampler({
+        **DEFAULT_TRACE_RULES,
+        "GET /api/projects/{project_id}": {"rate": 0.25},
+        "GET /api/projects/archive": {"rate": 0.75},
+    }, default_rate=0.1)
+
+    assert sampler(http_context("GET", "/api/health/ready")) == 0.0
+    assert sampler(http_context("GET", "/api/health")) == 0.0
+    assert sampler(http_context("GET", "/health")) == 0.0
+    assert sampler(http_context("POST", "/api/workflows/start")) == 1.0
+    assert sampler(http_context("GET", "/api/workflows/start")) == 0.1
+    assert sampler(http_context("GET", "/api/projects/p-1")) == 0.25
+    assert sampler(http_context("GET", "/api/projects/archive")) == 0.75
+    assert sampler(http_context("POST", "/api/payments/create-checkout")) == 0.5
+    assert sampler({"transaction_context": {"name": "job"}}) == 0.1
+
+
+def test_rules_resolve_like_rate_limit_rules():
+    from app.rate_limit_rules import RuleSet
+
+    keys = [
+        "* /api/projects/{project_id}",
+        "GET /api/projects/*",
+        "* /api/projects/archive",
+        "POST /api/*",
+    ]
+    sampler = TraceSampler({key: {"rate": 0.5} for key in keys}, default_rate=0.1)
+    limits = RuleSet({"anonymous": {"requests": 1, "window": 1}, **{key: {"requests": 1, "window": 1} for key in keys}})
+
+    for method, path in (
+        ("GET", "/api/projects/p-1"),
+        ("PUT", "/api/projects/p-1"),
+        ("PUT", "/api/projects/archive"),
+        ("POST", "/api/projects/{project_id}"),
+        ("GET", "/api/projects"),
+    ):
+        template = "{" in path
+        assert sampler.rule_for(method, path).key == limits.match(method, path, template=template)[0].key
+
+
+def test_parent_decision_is_kept():
+    sampler = TraceSampler(DEFAULT_TRACE_RULES, default_rate=0.1)
+    assert sampler(http_context("GET", "/api/health", parent_sampled=True)) == 1.0
+    assert sampler(http_context("POST", "/api/workflows/start", parent_sampled=False)) == 0.0
+
+
+def test_invalid_rules_rejected():
+    with pytest.raises(ValueError):
+        TraceSampler({"/api/health": {"rate": 0}}, default_rate=0.1)
+    with pytest.raises(ValueError):
+        TraceSampler({"GET /api/*/x": {"rate": 0}}, default_rate=0.1)
+    with pytest.raises(ValueError):
+        TraceSampler({"GET /api": {"rate": 2}}, default_rate=0.1)
+    with pytest.raises(ValueError):
+        TraceSampler({}, default_rate=0.1, mode="sometimes")
+
+
+def test_tail_sampling_ships_only_slow_or_errored():
+    # rand() == 1.0: no baseline share, only slow/errored traces are kept
+    sampler = TraceSampler(DEFAULT_TRACE_RULES, default_rate=0.0, default_slow_ms=500, mode="tail", rand=lambda: 1.0)
+
+    # Everything is recorded locally
+    assert sampler(http_context("GET", "/api/health/live")) == 1.0
+
+    assert sampler.before_send_transaction(transaction("/api/health/live"), {}) is None
+    assert sampler.before_send_transaction(transaction("/api/projects", duration_ms=499), {}) is None
+
+    slow = sampler.before_send_transaction(transaction("/api/projects", duration_ms=800), {})
+    assert slow["tags"]["sampling.reason"] == "slow"
+
+    # Per-route threshold
+    checkout = transaction("/api/payments/create-checkout", method="POST", duration_ms=1500)
+    assert sampler.before_send_transaction(checkout, {}) is None
+    checkout = transaction("/api/payments/create-checkout", method="POST", duration_ms=2500)
+    assert sampler.before_send_transaction(checkout, {})["tags"]["sampling.reason"] == "slow"
+
+    failed = sampler.before_send_transaction(transaction("/api/health/live", status="internal_error"), {})
+    assert failed["tags"]["sampling.reason"] == "error"
+    assert sampler.before_send_transaction(transaction("/api/projects", status="not_found"), {}) is None
+
+
+def test_tail_sampling_keeps_baseline_share():
+    sampler = TraceSampler({"GET /api/projects": {"rate": 0.5}}, default_rate=0.0, mode="tail", rand=iter([0.4, 0.6]).__next__)
+
+    assert sampler.before_send_transaction(transaction("/api/projects"), {})["tags"]["sampling.reason"] == "sampled"
+    assert sampler.before_send_transaction(transaction("/api/projects"), {}) is None
+
+
+def test_head_mode_sends_every_sampled_transaction():
+    sampler = TraceSampler(DEFAULT_TRACE_RULES, default_rate=0.1)
+    event = transaction("/api/health/live")
+    assert sampler.before_send_transaction(event, {}) is event
+
+
+def test_sampler_from_env(monkeypatch):
+    monkeypatch.setenv("TRACE_SAMPLING_MODE", "tail")
+    monkeypatch.setenv("TRACE_SLOW_MS", "250")
+    monkeypatch.setenv("TRACE_SAMPLING_RULES", '{"GET /api/metrics": {"rate": 0.05}}')
+    monkeypatch.delenv("TRACES_SAMPLE_RATE", raising=False)
+
+    sampler = trace_sampler_from_env("production")
+
+    assert sampler.mode == "tail"
+    assert sampler.default_rate == 0.1
+    assert sampler.rule_for("GET", "/api/metrics").rate == 0.05
+    assert sampler.rule_for("GET", "/api/health").slow_ms == 250
+    assert sampler.rule_for("GET", "/api/users/me") is None
+
+
+def test_init_sentry_installs_sampler(monkeypatch):
+    import sentry_sdk
+
+    captured = {}
+    monkeypatch.setattr(sentry_sdk, "init", lambda **kwargs: captured.update(kwargs))
+    monkeypatch.setattr(monitoring, "_sentry", None)
+    try:
+        monitoring.init_sentry(dsn="https://key@example.invalid/1", environment="production")
+        assert monitoring.is_enabled()
+    finally:
+        monitoring._sentry = None
+
+    assert "traces_sample_rate" not in captured
+    assert captured["traces_sampler"](http_context("GET", "/api/health")) == 0.0
+    assert captured["before_send_transaction"].__self__ is captured["traces_sampler"]